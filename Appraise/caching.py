@@ -0,0 +1,112 @@
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+# pylint: disable=import-error
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+# Returned by cache lookups for missing keys, so that None can be cached.
+_MISSING = object()
+
+
+class CacheKey():
+    """
+    Typed cache key template.
+
+    Keys are built from a name and one value per field type, e.g.
+    CacheKey('campaign:type', int).format(1) == 'campaign:type:1'. Values
+    of other types raise TypeError, so that keys cannot silently diverge,
+    e.g., between 1 and '1'. Entries expire after timeout seconds, or the
+    default timeout of the cache backend if timeout is None.
+    """
+
+    def __init__(self, name, *field_types, timeout=None):
+        self.name = name
+        self.field_types = field_types
+        self.timeout = timeout
+
+    def format(self, *values):
+        """
+        Returns cache key for given field values.
+        """
+        if len(values) != len(self.field_types):
+            raise TypeError('{0} expects {1} values, got {2}'.format(
+              self.name, len(self.field_types), len(values)
+            ))
+
+        for value, field_type in zip(values, self.field_types):
+            # bool is a sub class of int but never a valid ID.
+            if not isinstance(value, field_type) or isinstance(value, bool):
+                raise TypeError('{0} expects {1}, got {2!r}'.format(
+                  self.name, field_type.__name__, value
+                ))
+
+        return ':'.join([self.name] + [str(x) for x in values])
+
+    def get(self, *values, default=None):
+        """
+        Returns cached value for given field values, or default if no
+        value has been cached.
+        """
+        return cache.get(self.format(*values), default)
+
+    def get_or_compute(self, compute, *values):
+        """
+        Returns cached value for given field values, calling compute()
+        and caching its return value if no value has been cached yet.
+        """
+        key = self.format(*values)
+        value = cache.get(key, _MISSING)
+
+        if value is _MISSING:
+            value = compute()
+            self.set(value, *values)
+
+        return value
+
+    def set(self, value, *values):
+        """
+        Caches value for given field values.
+        """
+        if self.timeout is None:
+            cache.set(self.format(*values), value)
+        else:
+            cache.set(self.format(*values), value, self.timeout)
+
+    def delete(self, *values):
+        """
+        Removes cached value for given field values.
+        """
+        cache.delete(self.format(*values))
+
+    def delete_many(self, values_list):
+        """
+        Removes cached values for all field values in given list.
+        """
+        cache.delete_many([self.format(*values) for values in values_list])
+
+
+def invalidate_on_change(sender, cache_key, get_values):
+    """
+    Removes cached values of cache_key whenever instances of sender are
+    saved or deleted.
+
+    get_values(instance) returns a list of field value tuples to remove.
+    Bulk updates do not send model signals and rely on key timeouts or
+    explicit invalidation instead.
+    """
+    # pylint: disable=unused-argument
+    def _changed(sender, instance, **kwargs):
+        cache_key.delete_many(get_values(instance))
+
+    for signal in (post_save, post_delete):
+        signal.connect(
+          _changed,
+          sender=sender,
+          weak=False,
+          dispatch_uid='{0}:{1}:{2}'.format(
+            cache_key.name, sender._meta.label, signal is post_save
+          ),
+        )
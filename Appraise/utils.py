@@ -1,17 +1,70 @@
-"""
-Appraise evaluation framework
-
-See LICENSE for usage details
-"""
-import logging
-
-from Appraise.settings import LOG_HANDLER, LOG_LEVEL
-
-def _get_logger(name):
-    """
-    Initialises and returns named Django logger instance.
-    """
-    named_logger = logging.getLogger(name=name)
-    named_logger.setLevel(LOG_LEVEL)
-    named_logger.addHandler(LOG_HANDLER)
-    return named_logger
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+import logging
+from collections import namedtuple
+from datetime import datetime
+
+from Appraise.settings import LOG_HANDLER, LOG_LEVEL
+
+def _get_logger(name):
+    """
+    Initialises and returns named Django logger instance.
+    """
+    named_logger = logging.getLogger(name=name)
+    named_logger.setLevel(LOG_LEVEL)
+    named_logger.addHandler(LOG_HANDLER)
+    return named_logger
+
+
+class StepDuration(namedtuple('StepDuration', ('label', 'duration'))):
+    """
+    Named wall clock duration of a single step.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return '{0} {1}'.format(self.label, self.duration)
+
+
+class StepTimer():
+    """
+    Records wall clock durations for consecutive steps of a request.
+
+    Call mark(label) at the end of each step; durations() returns the list
+    of StepDuration instances, ending with the total duration.
+    """
+
+    def __init__(self, name, logger=None):
+        self.name = name
+        self.logger = logger
+        self._start = datetime.now()
+        self._last = self._start
+        self._steps = []
+
+    def mark(self, label):
+        """
+        Ends current step, recording its duration under the given label.
+        """
+        now = datetime.now()
+        self._steps.append(StepDuration(label, now - self._last))
+        self._last = now
+
+    def durations(self):
+        """
+        Returns recorded step durations, followed by the total duration.
+        """
+        total = StepDuration('total', self._last - self._start)
+        return self._steps + [total]
+
+    def log(self, level=logging.DEBUG):
+        """
+        Logs recorded step durations to the configured logger.
+        """
+        if self.logger:
+            self.logger.log(
+              level, '%s timings: %s', self.name,
+              ', '.join(str(x) for x in self.durations()),
+            )
@@ -0,0 +1,7 @@
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+
+default_app_config = 'Campaign.apps.CampaignConfig'
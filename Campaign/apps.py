@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CampaignConfig(AppConfig):
     name = 'Campaign'
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel
+        from Campaign.models import connect_cache_signals
+        connect_cache_signals()
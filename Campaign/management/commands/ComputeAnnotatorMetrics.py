@@ -1,11 +1,106 @@
-from collections import OrderedDict, defaultdict
-from json import loads
-
-from django.contrib.auth.models import User
-from django.core.management.base import BaseCommand, CommandError
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
 
 from Campaign.models import Campaign
-from EvalData.models import DirectAssessmentResult, DirectAssessmentTask
+from Campaign.utils import _compute_mannwhitneyu_pvalues
+from EvalData.result_frames import ResultFrame, ResultSnapshot
+
+
+def _sorted_codes(names, codes):
+    """
+    Returns (sorted_names, sorted_codes), recoding codes so that they are
+    ordered by name.
+    """
+    order = np.argsort(names, kind='stable')
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return names[order], ranks[codes]
+
+
+def _load_columns(frame):
+    """
+    Returns (user_keys, users, items, type_names, types, scores) columns
+    for given result frame.
+
+    Users are identified by source-target-user keys and items by their
+    segment and system ID. User and type codes are ordered by name.
+    """
+    keys, users = frame.group_by('sources', 'targets', 'users')
+    user_keys = np.array(['{0}-{1}-{2}'.format(*x) for x in keys], dtype=str)
+    user_keys, users = _sorted_codes(user_keys, users)
+
+    _, items = frame.group_by('segments', 'systems')
+
+    type_names, types = _sorted_codes(
+      frame.vocabularies['types'].astype(str), frame['types']
+    )
+    scores = frame['scores'].astype(np.float64)
+
+    return user_keys, users, items, list(type_names), types, scores
+
+
+def _compute_z_scores(users, scores, user_count):
+    """
+    Returns (z_scores, counts) using mean and sample standard deviation
+    of each user. Users with a single score have standard deviation 1.
+    """
+    counts = np.bincount(users, minlength=user_count)
+    sums = np.bincount(users, weights=scores, minlength=user_count)
+    means = sums / np.maximum(counts, 1)
+
+    deviations = scores - means[users]
+    squares = np.bincount(users, weights=deviations ** 2, minlength=user_count)
+
+    stdevs = np.ones(user_count)
+    _multi = counts > 1
+    stdevs[_multi] = np.sqrt(squares[_multi] / (counts[_multi] - 1))
+    stdevs[stdevs == 0] = 1
+
+    return deviations / stdevs[users], counts
+
+
+def _pair_rows(users, items, types, type_names, selected_types, exact=False):
+    """
+    Returns row indices (first, second) of all user items which have
+    exactly two rows of the selected types. Rows of each pair are ordered
+    by type name, then by row order.
+
+    If exact is True, only pairs with first and second row of the first
+    and second selected type, respectively, are returned.
+    """
+    _codes = [type_names.index(x) if x in type_names else -1 for x in selected_types]
+    rows = np.nonzero(np.isin(types, _codes))[0]
+
+    groups = users[rows].astype(np.int64) * (int(items.max()) + 1) + items[rows]
+    order = np.lexsort((rows, types[rows], groups))
+    rows, groups = rows[order], groups[order]
+
+    _, starts, counts = np.unique(groups, return_index=True, return_counts=True)
+    starts = starts[counts == 2]
+    first, second = rows[starts], rows[starts + 1]
+
+    if exact:
+        _valid = (types[first] == _codes[0]) & (types[second] == _codes[1])
+        first, second = first[_valid], second[_valid]
+
+    return first, second
+
+
+def _group_samples(users, user_count, values, first, second):
+    """
+    Returns mapping user code => (x, y) with values of first and second
+    rows of all pairs for this user. Users without pairs have empty samples.
+    """
+    _users = users[first]
+    order = np.argsort(_users, kind='stable')
+    bounds = np.searchsorted(_users[order], np.arange(user_count + 1))
+    _x, _y = values[first[order]], values[second[order]]
+
+    return {
+      user: (_x[bounds[user]:bounds[user + 1]], _y[bounds[user]:bounds[user + 1]])
+      for user in range(user_count)
+    }
 
 
 # pylint: disable=C0111,C0330,E1101
@@ -25,6 +120,10 @@ class Command(BaseCommand):
           '--exclude-ids', type=str,
           help='User IDs which should be ignored'
         )
+        parser.add_argument(
+          '--snapshot', action='store_true',
+          help='Read annotation data from the campaign result snapshot'
+        )
         parser.add_argument(
           '--export-csv', action='store_true',
           help='Exports CSV data in machine readable format'
@@ -41,40 +140,32 @@ class Command(BaseCommand):
         exclude_ids = [x.lower() for x in options['exclude_ids'].split(',')] \
           if options['exclude_ids'] else []
         export_csv = options['export_csv']
-        chk_threshold = options['chk_threshold']
 
-        user_scores = defaultdict(list)
         if csv_file:
             if not export_csv:
                 _msg = 'Processing annotations in file {0}\n\n'.format(csv_file)
                 self.stdout.write(_msg)
 
-            # Need to load data from CSV file and bring into same
-            # format as would have been produced by the call to
-            # get_system_scores().
-            #
-            # CSV has this format
+            # CSV has the same format as extended get_system_data() rows
             # zhoeng0802,GOOG_WMT2009_Test.chs-enu.txt,678,CHK,zho,eng,76,1511470503.271,1511470509.224
+            frame = ResultFrame.from_csv(
+              csv_file, cache_dir=settings.RESULT_FRAME_CACHE_DIR
+            )
+
+        elif options['snapshot']:
+            snapshot = ResultSnapshot.for_campaign(
+              campaign_name, settings.RESULT_SNAPSHOT_DIR
+            )
+            if not snapshot.chunk_names():
+                if not export_csv:
+                    _msg = 'Failure to identify snapshot {0}'.format(snapshot.path)
+                    self.stdout.write(_msg)
+                return
 
-            import csv
-            with open(csv_file) as input_file:
-                csv_reader = csv.reader(input_file)
-                for csv_line in csv_reader:
-                    _user_id = csv_line[0]
-                    if _user_id.lower() in exclude_ids:
-                        continue
-
-                    _system_id = csv_line[1]
-                    _segment_id = csv_line[2]
-                    _type = csv_line[3]
-                    _src = csv_line[4]
-                    _tgt = csv_line[5]
-                    _score = int(csv_line[6])
-                    _key = '{0}-{1}-{2}'.format(
-                      _src, _tgt, _user_id
-                    )
-
-                    user_scores[_key].append((_segment_id, _system_id, _type,  _score))
+            frame = snapshot.load(
+              item_types=('TGT', 'CHK', 'BAD', 'REF'),
+              expand_multi_sys=False, include_inactive=True
+            )
 
         else:
             # Identify Campaign instance for given name
@@ -85,201 +176,52 @@ class Command(BaseCommand):
                     self.stdout.write(_msg)
                 return
 
-            csv_data = DirectAssessmentResult.get_system_data(campaign.id, extended_csv=True, expand_multi_sys=False, include_inactive=True)
-
-            for csv_line in csv_data:
-                _user_id = csv_line[0]
-                if _user_id.lower() in exclude_ids:
-                    continue
-
-                _system_id = csv_line[1]
-                _segment_id = csv_line[2]
-                _type = csv_line[3]
-                _src = csv_line[4]
-                _tgt = csv_line[5]
-                _score = int(csv_line[6])
-                _key = '{0}-{1}-{2}'.format(
-                  _src, _tgt, _user_id
-                )
-
-                user_scores[_key].append((_segment_id, _system_id, _type,  _score))
-
-        segments_by_user = defaultdict(int)
-        for key, values in user_scores.items():
-            segments_by_user[key] = len(user_scores[key])
-            #for value in values:
-            #    item = (value[0], value[2], value[3])
-            #    if not item in segments_by_user[key]:
-            #        segments_by_user[key].append(item)
-
-        user_means = defaultdict(float)
-        user_stdev = defaultdict(float)
-
-        from math import sqrt
-        for key, values in user_scores.items():
-            _scores = [x[3] for x in values]
-            user_means[key] = sum(_scores) / len(_scores) if len(_scores) else 0
-            user_stdev[key] = sqrt( sum( ( (x - user_means[key]) ** 2 / (len(_scores) - 1) ) for x in _scores ) ) if len(_scores) > 1 else 1
-
-        user_z_scores = defaultdict(list)
-        for key, values in user_scores.items():
-            for value in values:
-                z_score = (value[3] - user_means[key]) / user_stdev[key]
-                user_z_scores[key].append((value[0], value[1], value[2], z_score))
-
-        user_scores = user_z_scores
-
-        metrics = defaultdict(list)
-        for key, values in user_scores.items():
-            _sorted = [(x[3], x[2]) for x in values]
-            _sorted.sort()
-
-            _median = list(sorted(set([x[0] for x in _sorted])))
-            _median_score = _median[len(_median) // 2]
-
-            _scores = defaultdict(list)
-            for x in values:
-                if x[2] not in ('BAD', 'REF'):
-                    continue
-
-                _key = '{0}-{1}'.format(x[0], x[1])
-                _fourScore = x[3] # min(int(x[3]/25.) + 1, 4)
-                _scores[_key].append((_fourScore, x[2]))
-
-            _x = []
-            _y = []
-            _lower_refs = 0
-            _upper_refs = 0
-            for item in _scores.items():
-                # print(item[0])
-                if len(item[1]) == 2:
-                    _data = item[1]
-                    _data.sort(key=lambda x: x[1])
-                    #print(_data)
-                    if _data[0][1] == 'BAD' and _data[1][1] == 'REF':
-                        _x.append(_data[0][0])
-                        _y.append(_data[1][0])
-                    # else:
-                    #     print(_data)
-                continue
-
-                if item[0] > _median_score:
-                    _upper_refs += 1
-                else:
-                    _lower_refs += 1
-
-            # metrics[key].append((_lower_refs, _upper_refs))
-            metrics[key].append(list(zip(_x, _y)))
-
-            _scores = defaultdict(list)
-            for x in values:
-                if x[2] not in ('TGT', 'CHK'):
-                    continue
-
-                _key = '{0}-{1}'.format(x[0], x[1])
-                _fourScore = x[3] # min(int(x[3]/25.) + 1, 4)
-                _scores[_key].append((_fourScore, x[2]))
-
-            _potential = 0
-            _matches = 0
-            _deltas = []
-            _x = []
-            _y = []
-            for item in _scores.items():
-                if len(item[1]) == 2:
-                    _data = item[1]
-                    _data.sort(key=lambda x: x[1])
-                    # print(_data)
-                    _x.append(_data[0][0])
-                    _y.append(_data[1][0])
-
-                    _deltas.append(_data[0][0] - _data[1][0])
-                    continue
-
-                    _potential += 1
-                    # if _data[0][0] == _data[1][0]:
-                    if abs(_data[0][0] - _data[1][0]) < chk_threshold:
-                        _matches += 1
-
-            #metrics[key].append((_matches, _potential))
-            metrics[key].append(list(zip(_x, _y)))
-
-            _scores = defaultdict(list)
-            for x in values:
-                if x[2] not in ('TGT', 'BAD'):
-                    continue
-
-                _key = '{0}-{1}'.format(x[0], x[1])
-                _scores[_key].append((x[3], x[2]))
-
-            deltas = []
-            _x = []
-            _y = []
-            for item in _scores.items():
-                if len(item[1]) == 2:
-                    _data = item[1]
-                    _data.sort(key=lambda x: x[1])
-                    _x.append(_data[0][0])
-                    _y.append(_data[1][0])
-                    deltas.append(_data[0][0] - _data[1][0])
-
-            # metrics[key].append(deltas)
-            metrics[key].append(list(zip(_x, _y)))
-            metrics[key].append(len(value))
-
-        if export_csv:
-            _fields = (
-              'UserID', 'Ref', 'Chk', 'Bad', 'Count'
+            frame = ResultFrame.from_campaign(
+              campaign, cache_dir=settings.RESULT_FRAME_CACHE_DIR,
+              extended_csv=True, expand_multi_sys=False, include_inactive=True
             )
-            _header = ','.join(_fields)
-            print(_header)
-
-        for key in sorted(metrics.keys()):
-            value = metrics[key]
-            metric1 = 0 # value[0][1] - value[0][0]
-            metric2 = 0 # value[1][0] / value[1][1] if value[1][1] else 0
-            metric3 = 0
-            metric4 = segments_by_user[key]
-
-            try:
-                from scipy import stats
 
-                _x = []
-                _y = []
-                _deltas = []
-                for _i in value[0]:
-                    _x.append(_i[0])
-                    _y.append(_i[1])
-                    _deltas.append(_i[0]-_i[1])
+        columns = _load_columns(frame.exclude_users(exclude_ids))
+        user_keys, users, items, type_names, types, scores = columns
+        user_count = len(user_keys)
 
-                t, pvalue = stats.mannwhitneyu(_x, _y, alternative='less')
-                #t, pvalue = stats.wilcoxon(_deltas, correction=True)
-                metric1 = pvalue
+        metrics = []
+        if user_count:
+            z_scores, counts = _compute_z_scores(users, scores, user_count)
 
-                _x = []
-                _y = []
-                for _i in value[1]:
-                    _x.append(_i[0])
-                    _y.append(_i[1])
+            # BAD items should score lower than their REF counterparts.
+            first, second = _pair_rows(users, items, types, type_names, ('BAD', 'REF'), exact=True)
+            ref_samples = _group_samples(users, user_count, z_scores, first, second)
 
-                t, pvalue = stats.mannwhitneyu(_x, _y, alternative='two-sided')
-#                t, pvalue = stats.wilcoxon(value[1], correction=True)
-                metric2 = pvalue
+            # Repeated TGT and CHK items should score the same.
+            first, second = _pair_rows(users, items, types, type_names, ('CHK', 'TGT'))
+            chk_samples = _group_samples(users, user_count, z_scores, first, second)
 
+            # BAD items should score lower than their TGT counterparts.
+            first, second = _pair_rows(users, items, types, type_names, ('BAD', 'TGT'))
+            bad_samples = _group_samples(users, user_count, z_scores, first, second)
 
-                _x = []
-                _y = []
-                for _i in value[2]:
-                    _x.append(_i[0])
-                    _y.append(_i[1])
+            ref_pvalues = _compute_mannwhitneyu_pvalues(ref_samples, alternative='less')
+            chk_pvalues = _compute_mannwhitneyu_pvalues(chk_samples, alternative='two-sided')
+            bad_pvalues = _compute_mannwhitneyu_pvalues(bad_samples, alternative='less')
 
-                t, pvalue = stats.mannwhitneyu(_x, _y, alternative='less')
-                # t, pvalue = stats.wilcoxon(value[2], correction=True)
-                metric3 = pvalue
+            for user in range(user_count):
+                metrics.append((
+                  user_keys[user],
+                  ref_pvalues.get(user, 0),
+                  chk_pvalues.get(user, 0),
+                  bad_pvalues.get(user, 0),
+                  int(counts[user]),
+                ))
 
-            except ImportError:
-                pass
+        if export_csv:
+            _fields = (
+              'UserID', 'Ref', 'Chk', 'Bad', 'Count'
+            )
+            _header = ','.join(_fields)
+            print(_header)
 
+        for key, metric1, metric2, metric3, metric4 in metrics:
             if not export_csv:
                 print("{0}\t{1:.5f}\t{2:.5f}\t{3:f}\t{4:3d}".format(
                   key, metric1, metric2, metric3, metric4)
@@ -1,158 +1,221 @@
-from collections import defaultdict, OrderedDict
-from json import loads
-from django.contrib.auth.models import User
-from django.core.management.base import BaseCommand, CommandError
-
-from Campaign.models import Campaign
-from EvalData.models import DirectAssessmentTask, DirectAssessmentResult
-
-# pylint: disable=C0111,C0330,E1101
-class Command(BaseCommand):
-    help = 'Computes system scores over all results'
-
-    def add_arguments(self, parser):
-        parser.add_argument(
-            'campaign_name',
-            type=str,
-            help='Name of the campaign you want to process data for',
-        )
-        parser.add_argument(
-            '--completed-only',
-            action='store_true',
-            help='Include completed tasks only in the computation',
-        )
-        parser.add_argument(
-            '--csv-file',
-            type=str,
-            help='CSV file containing annotation data',
-        )
-        parser.add_argument(
-            '--exclude-ids',
-            type=str,
-            help='User IDs which should be ignored',
-        )
-        # TODO: add argument to specify batch user
-
-    def handle(self, *args, **options):
-        campaign_name = options['campaign_name']
-        completed_only = options['completed_only']
-        csv_file = options['csv_file']
-        exclude_ids = (
-            (x.lower() for x in options['exclude_ids'].split(','))
-            if options['exclude_ids']
-            else ()
-        )
-
-        normalized_scores = OrderedDict()
-        if csv_file:
-            _msg = 'Processing annotations in file {0}\n\n'.format(
-                csv_file
-            )
-            self.stdout.write(_msg)
-
-            # Need to load data from CSV file and bring into same
-            # format as would have been produced by the call to
-            # get_system_scores().
-            #
-            # CSV has this format
-            # zhoeng0802,GOOG_WMT2009_Test.chs-enu.txt,678,CHK,zho,eng,76,1511470503.271,1511470509.224
-            system_scores = defaultdict(list)
-
-            import csv
-            from collections import namedtuple
-
-            AnnotationResult = namedtuple(
-                'AnnotationResult',
-                (
-                    'user_id',
-                    'system_id',
-                    'segment_id',
-                    'type_id',
-                    'source_language',
-                    'target_language',
-                    'score',
-                ),
-            )
-
-            with open(csv_file) as input_file:
-                csv_reader = csv.reader(input_file)
-                for csv_line in csv_reader:
-                    # This may contain more than seven fields -- ignore those
-                    csv_data = AnnotationResult._make(csv_line[:7])
-
-                    if csv_data.user_id.lower() in exclude_ids:
-                        continue
-
-                    _key = '{0}-{1}-{2}'.format(
-                        csv_data.source_language,
-                        csv_data.target_language,
-                        csv_data.system_id,
-                    )
-
-                    if csv_data.type_id.upper() not in ('TGT', 'CHK'):
-                        continue
-
-                    system_scores[_key].append(
-                        (csv_data.segment_id, int(csv_data.score))
-                    )
-
-        else:
-            # Identify Campaign instance for given name
-            campaign = Campaign.objects.filter(
-                campaignName=campaign_name
-            ).first()
-            if not campaign:
-                _msg = 'Failure to identify campaign {0}'.format(
-                    campaign_name
-                )
-                self.stdout.write(_msg)
-                return
-
-            system_scores = DirectAssessmentResult.get_system_scores(
-                campaign.id
-            )
-
-        # TODO: this should consider the chosen campaign, otherwise
-        #   we will show systems across all possible campaigns...
-        #
-        # This requires us to identify results which belong to the
-        # current campaign. Depending on settings for --completed-only
-        # we should also constrain this to fully completed tasks.
-        #
-        # The current implementation of get_system_scores() is not
-        # sufficiently prepared for these use cases --> replace it!
-
-        for key, value in system_scores.items():
-            scores_by_segment = defaultdict(list)
-            for segment_id, score in value:
-                scores_by_segment[segment_id].append(score)
-
-            averaged_scores = []
-            for segment_id, scores in scores_by_segment.items():
-                averaged_score = sum(scores) / float(len(scores) or 1)
-                averaged_scores.append(averaged_score)
-
-            normalized_score = float(
-                sum(averaged_scores) / len(averaged_scores) or 1
-            )
-            normalized_scores[normalized_score] = (
-                key,
-                len(value),
-                normalized_score,
-            )
-
-        for key in sorted(normalized_scores, reverse=True):
-            value = normalized_scores[key]
-            print('{0:03.2f} {1}'.format(key, value))
-
-        print('\nExcluded IDs: {0}\n'.format(', '.join(exclude_ids)))
-
-        # Non-segment level average
-        # normalized_scores = defaultdict(list)
-        # for key, value in system_scores.items():
-        #    normalized_score = float(sum([x[1] for x in value]) / (len(value) or 1))
-        #    normalized_scores[normalized_score] = (key, len(value), normalized_score)
-        #
-        # for key in sorted(normalized_scores, reverse=True):
-        #    value = normalized_scores[key]
-        #    print('{0:03.2f} {1}'.format(key, value))
+from collections import defaultdict, OrderedDict
+from json import loads
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Campaign.models import Campaign
+from EvalData.models import (
+    DirectAssessmentTask,
+    DirectAssessmentResult,
+    SystemScoreAggregate,
+)
+from EvalData.result_frames import ResultFrame, ResultSnapshot
+
+
+def _average_system_scores(system_scores):
+    """
+    Yields (key, count, normalized_score) tuples for mapping system key
+    => list of (segment_id, score) tuples. Scores are averaged for each
+    segment first, then over all segments.
+    """
+    for key, value in system_scores.items():
+        scores_by_segment = defaultdict(list)
+        for segment_id, score in value:
+            scores_by_segment[segment_id].append(score)
+
+        averaged_scores = []
+        for segment_id, scores in scores_by_segment.items():
+            averaged_score = sum(scores) / float(len(scores) or 1)
+            averaged_scores.append(averaged_score)
+
+        normalized_score = float(
+            sum(averaged_scores) / len(averaged_scores) or 1
+        )
+        yield key, len(value), normalized_score
+
+
+def _average_frame_scores(frame):
+    """
+    Yields (key, count, normalized_score) tuples for each language pair
+    and system in given result frame, in order of first occurrence. Keys
+    have the format source-target-system.
+
+    Computes the same averages as _average_system_scores() using grouped
+    reductions, summing in the same order.
+    """
+    keys, groups = frame.group_by('sources', 'targets', 'systems')
+    _, segments = frame.group_by('sources', 'targets', 'systems', 'segments')
+
+    scores = frame['scores'].astype(np.float64)
+    segment_counts = np.bincount(segments)
+    segment_means = np.bincount(segments, weights=scores) / segment_counts
+
+    # Segment groups are numbered by first occurrence, so the first row of
+    # each segment group identifies its system group.
+    _, first_rows = np.unique(segments, return_index=True)
+    segment_keys = groups[first_rows]
+
+    counts = np.bincount(groups, minlength=len(keys))
+    segment_totals = np.bincount(segment_keys, minlength=len(keys))
+    mean_sums = np.bincount(
+        segment_keys, weights=segment_means, minlength=len(keys)
+    )
+
+    for index, key in enumerate(keys):
+        normalized_score = float(
+            mean_sums[index] / segment_totals[index] or 1
+        )
+        yield '{0}-{1}-{2}'.format(*key), int(counts[index]), normalized_score
+
+# pylint: disable=C0111,C0330,E1101
+class Command(BaseCommand):
+    help = 'Computes system scores over all results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'campaign_name',
+            type=str,
+            help='Name of the campaign you want to process data for',
+        )
+        parser.add_argument(
+            '--completed-only',
+            action='store_true',
+            help='Include completed tasks only in the computation',
+        )
+        parser.add_argument(
+            '--csv-file',
+            type=str,
+            help='CSV file containing annotation data',
+        )
+        parser.add_argument(
+            '--exclude-ids',
+            type=str,
+            help='User IDs which should be ignored',
+        )
+        parser.add_argument(
+            '--snapshot',
+            action='store_true',
+            help='Read annotation data from the campaign result snapshot',
+        )
+        parser.add_argument(
+            '--from-totals',
+            action='store_true',
+            help='Rank systems by z score using materialized score totals',
+        )
+        # TODO: add argument to specify batch user
+
+    def handle(self, *args, **options):
+        campaign_name = options['campaign_name']
+        completed_only = options['completed_only']
+        csv_file = options['csv_file']
+        exclude_ids = (
+            [x.lower() for x in options['exclude_ids'].split(',')]
+            if options['exclude_ids']
+            else []
+        )
+
+        normalized_scores = OrderedDict()
+        if csv_file:
+            _msg = 'Processing annotations in file {0}\n\n'.format(
+                csv_file
+            )
+            self.stdout.write(_msg)
+
+            # CSV has this format
+            # zhoeng0802,GOOG_WMT2009_Test.chs-enu.txt,678,CHK,zho,eng,76,1511470503.271,1511470509.224
+            frame = ResultFrame.from_csv(
+                csv_file, cache_dir=settings.RESULT_FRAME_CACHE_DIR
+            )
+            frame = frame.exclude_users(exclude_ids)
+            frame = frame.select_types(('TGT', 'CHK'), ignore_case=True)
+            system_totals = _average_frame_scores(frame)
+
+        elif options['snapshot']:
+            snapshot = ResultSnapshot.for_campaign(
+                campaign_name, settings.RESULT_SNAPSHOT_DIR
+            )
+            if not snapshot.chunk_names():
+                _msg = 'Failure to identify snapshot {0}'.format(
+                    snapshot.path
+                )
+                self.stdout.write(_msg)
+                return
+
+            # Like get_system_scores(), include results of inactive users.
+            frame = snapshot.load(include_inactive=True)
+            frame = frame.exclude_users(exclude_ids)
+            system_totals = _average_frame_scores(frame)
+
+        else:
+            # Identify Campaign instance for given name
+            campaign = Campaign.objects.filter(
+                campaignName=campaign_name
+            ).first()
+            if not campaign:
+                _msg = 'Failure to identify campaign {0}'.format(
+                    campaign_name
+                )
+                self.stdout.write(_msg)
+                return
+
+            if options['from_totals']:
+                self._print_totals(campaign)
+                return
+
+            # TODO: this should consider the chosen campaign, otherwise
+            #   we will show systems across all possible campaigns...
+            #
+            # This requires us to identify results which belong to the
+            # current campaign. Depending on settings for --completed-only
+            # we should also constrain this to fully completed tasks.
+            #
+            # The current implementation of get_system_scores() is not
+            # sufficiently prepared for these use cases --> replace it!
+            system_scores = DirectAssessmentResult.get_system_scores(
+                campaign.id
+            )
+            system_totals = _average_system_scores(system_scores)
+
+        for key, count, normalized_score in system_totals:
+            normalized_scores[normalized_score] = (
+                key,
+                count,
+                normalized_score,
+            )
+
+        for key in sorted(normalized_scores, reverse=True):
+            value = normalized_scores[key]
+            print('{0:03.2f} {1}'.format(key, value))
+
+        print('\nExcluded IDs: {0}\n'.format(', '.join(exclude_ids)))
+
+        # Non-segment level average
+        # normalized_scores = defaultdict(list)
+        # for key, value in system_scores.items():
+        #    normalized_score = float(sum([x[1] for x in value]) / (len(value) or 1))
+        #    normalized_scores[normalized_score] = (key, len(value), normalized_score)
+        #
+        # for key in sorted(normalized_scores, reverse=True):
+        #    value = normalized_scores[key]
+        #    print('{0:03.2f} {1}'.format(key, value))
+
+    def _print_totals(self, campaign):
+        """
+        Prints z score system rankings for each language pair, averaged
+        over all scores instead of per segment.
+        """
+        system_scores = SystemScoreAggregate.get_system_scores(campaign)
+        for (source_code, target_code), scores in sorted(
+            system_scores.items()
+        ):
+            self.stdout.write('{0}-{1}'.format(source_code, target_code))
+            for system_id, count, raw_score, z_score in scores:
+                self.stdout.write(
+                    '{0:+.3f} {1:03.2f} {2:>6} {3}'.format(
+                        z_score, raw_score, count, system_id
+                    )
+                )
+            self.stdout.write('')
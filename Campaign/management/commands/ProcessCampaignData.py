@@ -1,5 +1,9 @@
 # pylint: disable=C0103,C0111,C0330,E1101
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
 
 from Campaign.models import Campaign
 from Campaign.utils import _identify_super_users
@@ -14,6 +18,18 @@ from EvalData.models import (
 )
 
 
+def parse_batch(args):
+    """
+    Returns list of (task JSON, new items) tuples for given batch.
+
+    Runs in worker processes and does not access the database.
+    """
+    task_cls, batch_user, batch_data, max_count = args
+    return list(
+        task_cls.iter_tasks_from_json(batch_user, batch_data, max_count)
+    )
+
+
 class Command(BaseCommand):
     help = 'Validates campaign data batches'
 
@@ -35,6 +51,12 @@ class Command(BaseCommand):
             default=-1,
             help='Defines maximum number of batches to be processed',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes used to parse batches (default: 1)',
+        )
         # TODO: add argument to specify batch user
 
     def handle(self, *args, **options):
@@ -65,23 +87,90 @@ class Command(BaseCommand):
                 'Bad campaign type {0}'.format(campaign_type)
             )
 
-        # TODO: add rollback in case of errors
-        for batch_data in campaign.batches.filter(dataValid=True):
-            # We have already verified that campaign_type is valid
-            task_cls = CAMPAIGN_TASK_TYPES.get(campaign_type)
+        # We have already verified that campaign_type is valid
+        task_cls = CAMPAIGN_TASK_TYPES.get(campaign_type)
+
+        # Batches which have been imported before are skipped, so that an
+        # interrupted import can be resumed.
+        batches = campaign.batches.filter(dataValid=True)
+        skipped = batches.filter(dataReady=True).count()
+        if skipped:
+            self.stdout.write(
+                'Skipping {0} batches which are already ready'.format(skipped)
+            )
+        pending = list(batches.filter(dataReady=False).order_by('id'))
 
-            try:
-                task_cls.import_from_json(
-                    campaign, batch_user, batch_data, max_count
+        try:
+            if options['workers'] > 1:
+                self._import_parallel(
+                    task_cls, campaign, batch_user, pending, max_count,
+                    options['workers'],
                 )
 
-            except Exception as e:
-                raise CommandError(e)
+            else:
+                for index, batch_data in enumerate(pending, start=1):
+                    batch_tasks = task_cls.iter_tasks_from_json(
+                        batch_user, batch_data, max_count
+                    )
+                    self._import_batch(
+                        task_cls, campaign, batch_user, batch_data,
+                        batch_tasks, index, len(pending),
+                    )
 
-            finally:
-                batch_data.dataReady = True
-                batch_data.activate()
-                batch_data.save()
+        except Exception as e:
+            raise CommandError(e)
 
         campaign.activate()
         campaign.save()
+
+    def _import_parallel(
+        self, task_cls, campaign, batch_user, pending, max_count, workers
+    ):
+        """
+        Parses batches in worker processes and imports them in order.
+
+        At most workers + 1 parsed batches are kept in memory.
+        """
+        # Worker processes must not inherit open database connections.
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = deque()
+            for index, batch_data in enumerate(pending, start=1):
+                futures.append((index, batch_data, pool.submit(
+                    parse_batch,
+                    (task_cls, batch_user, batch_data, max_count),
+                )))
+
+                # Import oldest batch once enough batches are being parsed.
+                while futures and (
+                    len(futures) > workers or index == len(pending)
+                ):
+                    _index, _batch_data, future = futures.popleft()
+                    self._import_batch(
+                        task_cls, campaign, batch_user, _batch_data,
+                        future.result(), _index, len(pending),
+                    )
+
+    def _import_batch(
+        self, task_cls, campaign, batch_user, batch_data, batch_tasks,
+        index, total,
+    ):
+        """
+        Imports tasks for given batch and marks it as ready, in a single
+        transaction. If the import fails, the batch is rolled back.
+        """
+        with transaction.atomic():
+            created_count = task_cls.import_tasks(
+                campaign, batch_user, batch_data, batch_tasks
+            )
+
+            batch_data.dataReady = True
+            batch_data.activate()
+            batch_data.save()
+
+        self.stdout.write(
+            '[{0}/{1}] {2}: {3} tasks'.format(
+                index, total, batch_data, created_count
+            )
+        )
@@ -0,0 +1,42 @@
+"""
+Appraise
+"""
+# pylint: disable=C0103,C0111,C0330,E1101
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Campaign.models import Campaign
+from EvalData.result_frames import ResultSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Appends new campaign results to the campaign result snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'campaign_name',
+            type=str,
+            help='Name of the campaign you want to process data for',
+        )
+
+    def handle(self, *args, **options):
+        # Identify Campaign instance for given name.
+        try:
+            campaign = Campaign.get_campaign_or_raise(
+                options['campaign_name']
+            )
+
+        except LookupError as error:
+            raise CommandError(error)
+
+        snapshot = ResultSnapshot.for_campaign(
+            campaign.campaignName, settings.RESULT_SNAPSHOT_DIR
+        )
+        last_id = snapshot.last_id()
+        appended = snapshot.update(campaign)
+
+        self.stdout.write(
+            'Appended {0} results after result {1} to {2}'.format(
+                appended, last_id, snapshot.path
+            )
+        )
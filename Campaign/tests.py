@@ -1,160 +1,535 @@
-"""
-Appraise evaluation framework
-
-See LICENSE for usage details
-"""
-from pathlib import Path
-
-from django.contrib.auth.models import User
-from django.core.exceptions import ValidationError
-from django.core.files.base import File
-from django.core.management.base import CommandError
-from django.test import TestCase
-
-from Campaign.models import _validate_package_file, Campaign
-
-
-class TestInitCampaign(TestCase):
-    '''Tests init_campaign management command.'''
-
-    def setUp(self):
-        User.objects.create(username="admin", is_superuser=True)
-
-    def test_creates_correct_csv_for_sample_manifests(self):
-        '''Verifies correct CSV creation for sample manifests.'''
-        from Campaign.management.commands.init_campaign import Command
-
-        test_data = (
-            (
-                'HumanEvalFY2001',
-                'HumanEvalFY2001_Manifest.json',
-                'HumanEvalFY2001_Accounts_Control.csv',
-            ),
-            (
-                'HumanEvalFY2002',
-                'HumanEvalFY2002_Manifest.json',
-                'HumanEvalFY2002_Accounts_Control.csv',
-            ),
-        )
-
-        cmd = Command()
-        for test_item in test_data:
-            campaign_name, json_file, csv_file = test_item
-
-            # Run init_campaign with this JSON file
-            json_path = 'Campaign/testdata' / Path(json_file)
-
-            # Write output to this CSV file
-            out_file = json_file.replace('.json', '_Output.csv')
-            out_path = 'Campaign/testdata' / Path(out_file)
-
-            # Compare output against this reference file
-            csv_path = 'Campaign/testdata' / Path(csv_file)
-
-            # Remove output CSV data if it exists
-            if out_path.exists():
-                out_path.unlink()
-
-            options = {
-                'manifest_json': str(json_path),
-                'csv_output': str(out_path),
-                'xlsx_output': None,  # Defaults to None
-                'include_completed': False,  # Defaults to False
-            }
-
-            expected_msg = (
-                'Campaign {0!r} does not exist. No task agendas '
-                'have been assigned.'.format(campaign_name)
-            )
-
-            with self.assertRaisesMessage(CommandError, expected_msg):
-                cmd.handle(**options)
-
-            self.assertEqual(out_path.read_text(), csv_path.read_text())
-
-            # Clean up
-            out_path.unlink()
-
-    def test_validates_good_package_file(self):
-        '''Verifies that good package file passes validation.'''
-        package_file = Path('Campaign/testdata/FY2002/FY2002.zip')
-
-        campaign = Campaign()
-        campaign.campaignName = 'SomeCampaignName'
-        campaign.packageFile = File(package_file.open(mode='rb'))
-
-        self.assertTrue(_validate_package_file(campaign.packageFile))
-
-    def test_invalidates_bad_package_files(self):
-        '''Verifies that bad package files raise ValidationError.'''
-        package_paths = (
-            (
-                'BadCode/BadCode.zip',
-                "manifest.json key 'TASKS_TO_ANNOTATORS' list item has "
-                "invalid language codes, check ['eng', 'abc', 'uniform', "
-                "18, 36]",
-            ),
-            (
-                'BadContent/BadContent.zip',
-                "manifest.json should contain 'CAMPAIGN_KEY' key",
-            ),
-            (
-                'BadJSONType/BadJSONType.zip',
-                'manifest.json should contain single object',
-            ),
-            (
-                'BadTaskMap/BadTaskMap.zip',
-                "manifest.json key 'TASKS_TO_ANNOTATORS' list item has "
-                "bad task map (17 * 2 * 1 != 36), check ['eng', 'trk', "
-                "'uniform', 17, 36]",
-            ),
-            (
-                'BadTaskMapRedundancy/BadTaskMapRedundancy.zip',
-                "manifest.json key 'TASKS_TO_ANNOTATORS' list item has "
-                "bad task map (18 * 2 * 2 != 36), check ['trk', 'eng', "
-                "'uniform', 18, 36]",
-            ),
-            (
-                'BadTypeNo/BadTypeNo.zip',
-                "manifest.json key 'CAMPAIGN_NO' should be number (int) "
-                "type, is 'Not a number (int) value...'",
-            ),
-            (
-                'BadTypeTasksToAnnotators/BadTypeTasksToAnnotators.zip',
-                "manifest.json key 'TASKS_TO_ANNOTATORS' should have list "
-                'type, is 123',
-            ),
-            (
-                'BadTypeTasksToAnnotatorsItem/BadTypeTasksToAnnotators'
-                'Item.zip',
-                "manifest.json key 'TASKS_TO_ANNOTATORS' list item should "
-                "have <str, str, str, int, int> signature, is ['trk', 123, "
-                "'uniform', 18, 36]",
-            ),
-            (
-                'BadTypeURL/BadTypeURL.zip',
-                "manifest.json key 'CAMPAIGN_URL' should be string type, "
-                'is 123',
-            ),
-            (
-                'ValidManifest/ValidManifest.zip',
-                "Invalid package file 'ValidManifest.zip' -- expected at "
-                'least one batch JSON archive file',
-            ),
-            (
-                'ValidManifestNotEnoughBatches/ValidManifestNotEnough'
-                'Batches.zip',
-                "Invalid package file 'ValidManifestNotEnoughBatches.zip' -- "
-                'wrong number of batches (1 != 9)',
-            ),
-        )
-
-        for package_path, expected_msg in package_paths:
-            package_file = 'Campaign/testdata' / Path(package_path)
-
-            campaign = Campaign()
-            campaign.campaignName = 'SomeCampaignName'
-            campaign.packageFile = File(package_file.open(mode='rb'))
-
-            with self.assertRaisesMessage(ValidationError, expected_msg):
-                _validate_package_file(campaign.packageFile)
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+from contextlib import redirect_stdout
+from io import StringIO
+from json import dumps
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile, File
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from Campaign.models import (
+    _validate_package_file,
+    Campaign,
+    CampaignData,
+    CampaignTeam,
+    TrustedUser,
+)
+from EvalData.models import (
+    DirectAssessmentResult,
+    DirectAssessmentTask,
+    Market,
+    Metadata,
+    TextPair,
+)
+
+
+class TestInitCampaign(TestCase):
+    '''Tests init_campaign management command.'''
+
+    def setUp(self):
+        User.objects.create(username="admin", is_superuser=True)
+
+    def test_creates_correct_csv_for_sample_manifests(self):
+        '''Verifies correct CSV creation for sample manifests.'''
+        from Campaign.management.commands.init_campaign import Command
+
+        test_data = (
+            (
+                'HumanEvalFY2001',
+                'HumanEvalFY2001_Manifest.json',
+                'HumanEvalFY2001_Accounts_Control.csv',
+            ),
+            (
+                'HumanEvalFY2002',
+                'HumanEvalFY2002_Manifest.json',
+                'HumanEvalFY2002_Accounts_Control.csv',
+            ),
+        )
+
+        cmd = Command()
+        for test_item in test_data:
+            campaign_name, json_file, csv_file = test_item
+
+            # Run init_campaign with this JSON file
+            json_path = 'Campaign/testdata' / Path(json_file)
+
+            # Write output to this CSV file
+            out_file = json_file.replace('.json', '_Output.csv')
+            out_path = 'Campaign/testdata' / Path(out_file)
+
+            # Compare output against this reference file
+            csv_path = 'Campaign/testdata' / Path(csv_file)
+
+            # Remove output CSV data if it exists
+            if out_path.exists():
+                out_path.unlink()
+
+            options = {
+                'manifest_json': str(json_path),
+                'csv_output': str(out_path),
+                'xlsx_output': None,  # Defaults to None
+                'include_completed': False,  # Defaults to False
+            }
+
+            expected_msg = (
+                'Campaign {0!r} does not exist. No task agendas '
+                'have been assigned.'.format(campaign_name)
+            )
+
+            with self.assertRaisesMessage(CommandError, expected_msg):
+                cmd.handle(**options)
+
+            self.assertEqual(out_path.read_text(), csv_path.read_text())
+
+            # Clean up
+            out_path.unlink()
+
+    def test_validates_good_package_file(self):
+        '''Verifies that good package file passes validation.'''
+        package_file = Path('Campaign/testdata/FY2002/FY2002.zip')
+
+        campaign = Campaign()
+        campaign.campaignName = 'SomeCampaignName'
+        campaign.packageFile = File(package_file.open(mode='rb'))
+
+        self.assertTrue(_validate_package_file(campaign.packageFile))
+
+    def test_invalidates_bad_package_files(self):
+        '''Verifies that bad package files raise ValidationError.'''
+        package_paths = (
+            (
+                'BadCode/BadCode.zip',
+                "manifest.json key 'TASKS_TO_ANNOTATORS' list item has "
+                "invalid language codes, check ['eng', 'abc', 'uniform', "
+                "18, 36]",
+            ),
+            (
+                'BadContent/BadContent.zip',
+                "manifest.json should contain 'CAMPAIGN_KEY' key",
+            ),
+            (
+                'BadJSONType/BadJSONType.zip',
+                'manifest.json should contain single object',
+            ),
+            (
+                'BadTaskMap/BadTaskMap.zip',
+                "manifest.json key 'TASKS_TO_ANNOTATORS' list item has "
+                "bad task map (17 * 2 * 1 != 36), check ['eng', 'trk', "
+                "'uniform', 17, 36]",
+            ),
+            (
+                'BadTaskMapRedundancy/BadTaskMapRedundancy.zip',
+                "manifest.json key 'TASKS_TO_ANNOTATORS' list item has "
+                "bad task map (18 * 2 * 2 != 36), check ['trk', 'eng', "
+                "'uniform', 18, 36]",
+            ),
+            (
+                'BadTypeNo/BadTypeNo.zip',
+                "manifest.json key 'CAMPAIGN_NO' should be number (int) "
+                "type, is 'Not a number (int) value...'",
+            ),
+            (
+                'BadTypeTasksToAnnotators/BadTypeTasksToAnnotators.zip',
+                "manifest.json key 'TASKS_TO_ANNOTATORS' should have list "
+                'type, is 123',
+            ),
+            (
+                'BadTypeTasksToAnnotatorsItem/BadTypeTasksToAnnotators'
+                'Item.zip',
+                "manifest.json key 'TASKS_TO_ANNOTATORS' list item should "
+                "have <str, str, str, int, int> signature, is ['trk', 123, "
+                "'uniform', 18, 36]",
+            ),
+            (
+                'BadTypeURL/BadTypeURL.zip',
+                "manifest.json key 'CAMPAIGN_URL' should be string type, "
+                'is 123',
+            ),
+            (
+                'ValidManifest/ValidManifest.zip',
+                "Invalid package file 'ValidManifest.zip' -- expected at "
+                'least one batch JSON archive file',
+            ),
+            (
+                'ValidManifestNotEnoughBatches/ValidManifestNotEnough'
+                'Batches.zip',
+                "Invalid package file 'ValidManifestNotEnoughBatches.zip' -- "
+                'wrong number of batches (1 != 9)',
+            ),
+        )
+
+        for package_path, expected_msg in package_paths:
+            package_file = 'Campaign/testdata' / Path(package_path)
+
+            campaign = Campaign()
+            campaign.campaignName = 'SomeCampaignName'
+            campaign.packageFile = File(package_file.open(mode='rb'))
+
+            with self.assertRaisesMessage(ValidationError, expected_msg):
+                _validate_package_file(campaign.packageFile)
+
+
+class TestComputeZScores(TestCase):
+    '''Tests ComputeZScores significance testing.'''
+
+    def test_approximate_randomization(self):
+        '''Verifies seeded approximate randomization p-values.'''
+        from Campaign.management.commands.ComputeZScores import ar, ar_rng
+
+        set_a = [0.1 * x for x in range(50)]
+        set_b = [0.1 * x + 10 for x in range(50)]
+
+        # Identical samples are never significantly different.
+        _unused_t_obs, p_value = ar(set_a, set_a, trials=100, rng=ar_rng(1))
+        self.assertEqual(p_value, 1.0)
+
+        # Clearly different samples are only matched by the observed value.
+        t_obs, p_value = ar(set_a, set_b, trials=100, rng=ar_rng(1))
+        self.assertAlmostEqual(t_obs, 10.0)
+        self.assertEqual(p_value, 1 / 101.0)
+
+        # Equal seeds and keys produce identical p-values.
+        set_c = [0.1 * x + (x % 3) * 0.2 for x in range(50)]
+        results = [
+            ar(set_a, set_c, trials=500, rng=ar_rng(42, 0, 1))
+            for _ in range(2)
+        ]
+        self.assertEqual(results[0], results[1])
+
+
+class TestComputeAnnotatorMetrics(TestCase):
+    '''Tests ComputeAnnotatorMetrics management command.'''
+
+    def test_export_csv_from_file(self):
+        '''Verifies reliability metrics computed from a CSV file.'''
+        try:
+            from scipy.stats import mannwhitneyu
+
+        except ImportError:
+            self.skipTest('scipy is not installed')
+
+        rows = []
+        _fmt = 'good,sys,{0},{1},eng,deu,{2}'
+        for segment_id in range(1, 6):
+            rows.append(_fmt.format(segment_id, 'TGT', 60 + segment_id))
+            rows.append(_fmt.format(segment_id, 'BAD', 10 + segment_id))
+        rows.append('other,sys,1,TGT,eng,deu,50')
+
+        temp_dir = mkdtemp()
+        self.addCleanup(rmtree, temp_dir)
+        csv_file = Path(temp_dir) / 'results.csv'
+        csv_file.write_text('\n'.join(rows))
+
+        out = StringIO()
+        with override_settings(RESULT_FRAME_CACHE_DIR=temp_dir):
+            with redirect_stdout(out):
+                call_command(
+                    'ComputeAnnotatorMetrics', 'TestCampaign',
+                    csv_file=str(csv_file), export_csv=True,
+                    exclude_ids='other',
+                )
+
+        _, pvalue = mannwhitneyu(
+            [11, 12, 13, 14, 15], [61, 62, 63, 64, 65], alternative='less'
+        )
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            [
+                'UserID,Ref,Chk,Bad,Count',
+                'eng-deu-good,0.000000,0.000000,{0},10'.format(pvalue),
+            ],
+        )
+
+
+class TestProcessCampaignData(TestCase):
+    '''Tests ProcessCampaignData management command.'''
+
+    def setUp(self):
+        media_root = mkdtemp()
+        self.addCleanup(rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        user = User.objects.create(username="admin", is_superuser=True)
+        self.campaign = Campaign.objects.create(
+            campaignName='TestCampaign', createdBy=user
+        )
+        market = Market.objects.create(
+            sourceLanguageCode='eng',
+            targetLanguageCode='deu',
+            domainName='TEST',
+            createdBy=user,
+        )
+        metadata = Metadata.objects.create(
+            market=market,
+            corpusName='TEST',
+            versionInfo='1.0',
+            source='MANUAL',
+            createdBy=user,
+        )
+
+        for batch_no in (1, 2, 3):
+            batch_json = dumps([{
+                'task': {'batchNo': batch_no, 'requiredAnnotations': 1},
+                'items': [
+                    {
+                        'sourceID': 'src',
+                        'sourceText': 'Source text',
+                        'targetID': 'sys',
+                        'targetText': 'Target text',
+                        'itemID': item_id,
+                        'itemType': 'TGT',
+                    }
+                    for item_id in range(1, 101)
+                ],
+            }])
+            batch_data = CampaignData(
+                market=market,
+                metadata=metadata,
+                dataValid=True,
+                createdBy=user,
+            )
+            batch_data.dataFile.save(
+                'batch{0}.json'.format(batch_no),
+                ContentFile(batch_json.encode('utf-8')),
+            )
+            self.campaign.batches.add(batch_data)
+
+    def _process(self, workers):
+        out = StringIO()
+        call_command(
+            'ProcessCampaignData', 'TestCampaign', 'Direct',
+            workers=workers, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_imports_batches_in_parallel_and_resumes(self):
+        '''Verifies parallel import and skipping of ready batches.'''
+        self.campaign.batches.filter(
+            dataFile__endswith='batch1.json'
+        ).update(dataReady=True)
+
+        out = self._process(workers=2)
+        self.assertIn('Skipping 1 batches which are already ready', out)
+        self.assertIn('[2/2]', out)
+        self.assertEqual(
+            sorted(
+                DirectAssessmentTask.objects.values_list('batchNo', flat=True)
+            ),
+            [2, 3],
+        )
+        self.assertFalse(self.campaign.batches.filter(dataReady=False))
+
+        out = self._process(workers=1)
+        self.assertIn('Skipping 3 batches which are already ready', out)
+        self.assertEqual(DirectAssessmentTask.objects.count(), 2)
+
+
+class TestCampaignStatus(TestCase):
+    '''Tests campaign status view.'''
+
+    def setUp(self):
+        cache.clear()
+
+        self.staff = User.objects.create(username='staff', is_staff=True)
+        self.annotator = User.objects.create(username='annotator')
+        idle_user = User.objects.create(username='idle')
+
+        self.campaign = Campaign.objects.create(
+            campaignName='TestCampaign', createdBy=self.staff
+        )
+        team = CampaignTeam.objects.create(
+            teamName='TestTeam',
+            owner=self.staff,
+            requiredAnnotations=1,
+            requiredHours=1,
+            createdBy=self.staff,
+        )
+        team.members.add(self.annotator, idle_user)
+        self.campaign.teams.add(team)
+
+        market = Market.objects.create(
+            sourceLanguageCode='eng',
+            targetLanguageCode='deu',
+            domainName='TEST',
+            createdBy=self.staff,
+        )
+        metadata = Metadata.objects.create(
+            market=market,
+            corpusName='TEST',
+            versionInfo='1.0',
+            source='MANUAL',
+            createdBy=self.staff,
+        )
+        task = DirectAssessmentTask.objects.create(
+            campaign=self.campaign,
+            requiredAnnotations=1,
+            batchNo=1,
+            createdBy=self.staff,
+        )
+
+        # BAD items are scored lower than their TGT counterparts.
+        for item_id in range(1, 6):
+            for item_type, score in (('TGT', 60 + item_id), ('BAD', item_id)):
+                item = TextPair.objects.create(
+                    sourceID='src',
+                    sourceText='Source text',
+                    targetID='sys',
+                    targetText='Target text',
+                    itemID=item_id,
+                    itemType=item_type,
+                    metadata=metadata,
+                    createdBy=self.staff,
+                )
+                DirectAssessmentResult.objects.create(
+                    score=score,
+                    start_time=3600.0 * item_id,
+                    end_time=3600.0 * item_id + 600,
+                    item=item,
+                    task=task,
+                    createdBy=self.annotator,
+                    completed=True,
+                )
+
+    def _get_rows(self, user):
+        self.client.force_login(user)
+        response = self.client.get('/campaign-status/TestCampaign/')
+        self.assertEqual(response.status_code, 200)
+        lines = response.content.decode('utf-8').split('\n')
+        return [
+            [cell.strip() for cell in line.split('\t')] for line in lines[1:]
+        ]
+
+    def test_status_rows_are_computed_and_cached(self):
+        '''Verifies per-user statistics and cached rendering.'''
+        try:
+            from scipy.stats import mannwhitneyu
+
+        except ImportError:
+            self.skipTest('scipy is not installed')
+
+        _, pvalue = mannwhitneyu(
+            [1, 2, 3, 4, 5], [61, 62, 63, 64, 65], alternative='less'
+        )
+
+        rows = self._get_rows(self.staff)
+        self.assertEqual(
+            rows,
+            [
+                ['idle', '1', '0', 'Never', 'Never', 'n/a', 'n/a'],
+                [
+                    'annotator', '1', '10',
+                    '1970-01-01 01:00:00', '1970-01-01 05:10:00',
+                    '01h40m', '{0:1.6f}'.format(pvalue),
+                ],
+            ],
+        )
+
+        # Cached rows are used for subsequent requests, without reliability
+        # scores for non-staff users.
+        DirectAssessmentResult.objects.all().delete()
+        rows = self._get_rows(self.annotator)
+        self.assertEqual(rows[1][:3], ['annotator', '1', '10'])
+        self.assertEqual(len(rows[1]), 6)
+
+
+class TestCampaignCache(TestCase):
+    '''Tests cached campaign lookups.'''
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create(username='staff')
+        self.campaign = Campaign.objects.create(
+            campaignName='TestCampaign', createdBy=self.user
+        )
+        self.task = DirectAssessmentTask.objects.create(
+            campaign=self.campaign,
+            requiredAnnotations=1,
+            batchNo=1,
+            createdBy=self.user,
+        )
+
+    def test_campaign_is_cached_by_name(self):
+        '''Verifies that renamed campaigns are not found by old names.'''
+        self.assertEqual(
+            Campaign.get_campaign_by_name('TestCampaign'), self.campaign
+        )
+        with self.assertNumQueries(0):
+            Campaign.get_campaign_by_name('TestCampaign')
+
+        self.campaign.campaignName = 'RenamedCampaign'
+        self.campaign.save()
+        self.assertIsNone(Campaign.get_campaign_by_name('TestCampaign'))
+        self.assertEqual(
+            Campaign.get_campaign_by_name('RenamedCampaign'), self.campaign
+        )
+
+    def test_missing_campaigns_are_not_cached(self):
+        '''Verifies that campaigns created elsewhere are found at once.'''
+        self.assertIsNone(Campaign.get_campaign_by_name('NewCampaign'))
+
+        # Bulk inserts send no signals, like changes in another process.
+        Campaign.objects.bulk_create([
+            Campaign(campaignName='NewCampaign', createdBy=self.user)
+        ])
+        self.assertEqual(
+            Campaign.get_campaign_by_name('NewCampaign').campaignName,
+            'NewCampaign',
+        )
+
+    def test_trusted_users_are_invalidated_on_change(self):
+        '''Verifies that cached trusted users follow model changes.'''
+        self.assertFalse(self.task.is_trusted_user(self.user))
+        with self.assertNumQueries(0):
+            self.assertFalse(self.task.is_trusted_user(self.user))
+
+        trusted_user = TrustedUser.objects.create(
+            user=self.user, campaign=self.campaign
+        )
+        self.assertTrue(self.task.is_trusted_user(self.user))
+
+        trusted_user.delete()
+        self.assertFalse(self.task.is_trusted_user(self.user))
+
+    def test_campaign_type_is_cached_once_known(self):
+        '''Verifies that campaign types are cached for campaigns with tasks.'''
+        campaign = Campaign.objects.create(
+            campaignName='EmptyCampaign', createdBy=self.user
+        )
+        with self.assertRaises(LookupError):
+            campaign.get_campaign_type()
+
+        # Bulk inserts send no signals, unknown types must not be cached.
+        DirectAssessmentTask.objects.bulk_create([
+            DirectAssessmentTask(
+                campaign=campaign,
+                requiredAnnotations=1,
+                batchNo=1,
+                createdBy=self.user,
+            )
+        ])
+        self.assertEqual(campaign.get_campaign_type(), 'DirectAssessmentTask')
+
+        # Saving existing tasks does not invalidate the cached type.
+        self.task.activate()
+        self.assertEqual(
+            self.campaign.get_campaign_type(), 'DirectAssessmentTask'
+        )
+        self.task.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.campaign.get_campaign_type(), 'DirectAssessmentTask'
+            )
@@ -10,11 +10,18 @@ from math import floor, sqrt
 
 # pylint: disable=import-error
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.management.base import CommandError
+from django.db.models import Avg, Count, F, Max, Min, Sum
 from django.http import HttpResponse
 
+from Appraise.caching import CacheKey
+from Appraise.settings import CAMPAIGN_STATUS_CACHE_TIMEOUT
 from Appraise.utils import _get_logger
-from Campaign.utils import _get_campaign_instance
+from Campaign.utils import (
+    _compute_mannwhitneyu_pvalues,
+    _get_campaign_instance,
+)
 from EvalData.models import (
     DataAssessmentResult,
     DirectAssessmentResult,
@@ -34,13 +41,151 @@ RESULT_TYPE_BY_CLASS_NAME = {
     'PairwiseAssessmentTask': PairwiseAssessmentResult,
 }
 
+CAMPAIGN_STATUS_KEY = CacheKey('campaign:status', int)
+
 LOGGER = _get_logger(name=__name__)
 
 
+def _compute_campaign_status(campaign, result_type):
+    """
+    Returns campaign status rows for all team members of given campaign.
+
+    Each row is a (username, is_active, annotations, first_modified,
+    last_modified, annotation_time, reliable) tuple. Per user statistics
+    are computed by a single grouped query, reliability scores by another
+    one grouped by user and item.
+    """
+    members = [
+        user
+        for team in campaign.teams.prefetch_related('members')
+        for user in team.members.all()
+    ]
+
+    if result_type is PairwiseAssessmentResult:
+        score_field, system_field = 'score1', 'item__target1ID'
+    else:
+        score_field, system_field = 'score', 'item__targetID'
+
+    results = result_type.objects.filter(
+        completed=True,
+        task__campaign=campaign.id,
+        createdBy__in=set(user.id for user in members),
+    ).order_by()
+
+    user_stats = {}
+    user_scaling = {}
+    for _stats in results.values('createdBy').annotate(
+        annotations=Count('item', distinct=True),
+        results=Count('id'),
+        first_start=Min('start_time'),
+        last_end=Max('end_time'),
+        duration=Sum(F('end_time') - F('start_time')),
+        score_sum=Sum(score_field),
+        squares_sum=Sum(F(score_field) * F(score_field)),
+    ):
+        _annotations = _stats['annotations']
+        _user_mean = _stats['score_sum'] / (_annotations or 1)
+
+        _cs = _annotations - 1  # Corrected sample size for stdev.
+        _user_stdev = 1
+        if _cs > 0:
+            # Sum of squared deviations from the user mean over all results.
+            _squares = (
+                _stats['squares_sum']
+                - 2 * _user_mean * _stats['score_sum']
+                + _stats['results'] * _user_mean ** 2
+            )
+            _user_stdev = sqrt(max(_squares, 0) / _cs)
+
+        if int(_user_stdev) == 0:
+            _user_stdev = 1
+
+        user_stats[_stats['createdBy']] = _stats
+        user_scaling[_stats['createdBy']] = (_user_mean, _user_stdev)
+
+    # Mean z scores per user, item and system, for TGT and BAD items. As
+    # z scores are linear in raw scores, averaging raw scores suffices.
+    item_scores = defaultdict(dict)
+    for user_id, item_id, system_id, item_type, score_avg in results.filter(
+        item__itemType__in=('TGT', 'BAD')
+    ).values_list(
+        'createdBy', 'item__itemID', system_field, 'item__itemType'
+    ).annotate(score_avg=Avg(score_field)):
+        _user_mean, _user_stdev = user_scaling[user_id]
+        _z_score = (score_avg - _user_mean) / _user_stdev
+        item_scores[(user_id, item_id, system_id)][item_type] = _z_score
+
+    samples = defaultdict(lambda: ([], []))
+    for (user_id, _, _), _scores in item_scores.items():
+        if 'TGT' in _scores and 'BAD' in _scores:
+            samples[user_id][0].append(_scores['BAD'])
+            samples[user_id][1].append(_scores['TGT'])
+
+    reliability = _compute_mannwhitneyu_pvalues(samples)
+
+    _out = []
+    for user in members:
+        _stats = user_stats.get(user.id, {})
+
+        _annotations = _stats.get('annotations', 0)
+        _first_modified = _stats.get('first_start')
+        _last_modified = _stats.get('last_end')
+        _annotation_time = _stats.get('duration')
+        _reliable = reliability.get(user.id)
+
+        if _first_modified:
+            _date_modified = datetime(1970, 1, 1) + seconds_to_timedelta(
+                _first_modified
+            )
+            _first_modified = str(_date_modified).split('.')[0]
+
+        else:
+            _first_modified = 'Never'
+
+        if _last_modified:
+            _date_modified = datetime(1970, 1, 1) + seconds_to_timedelta(
+                _last_modified
+            )
+            _last_modified = str(_date_modified).split('.')[0]
+
+        else:
+            _last_modified = 'Never'
+
+        if _annotation_time:
+            _hours = int(floor(_annotation_time / 3600))
+            _minutes = int(floor((_annotation_time % 3600) / 60))
+            _annotation_time = '{0:0>2d}h{1:0>2d}m'.format(
+                _hours, _minutes
+            )
+
+        else:
+            _annotation_time = 'n/a'
+
+        if _reliable:
+            _reliable = '{0:1.6f}'.format(_reliable)
+
+        else:
+            _reliable = 'n/a'
+
+        _out.append((
+            user.username,
+            user.is_active,
+            _annotations,
+            _first_modified,
+            _last_modified,
+            _annotation_time,
+            _reliable,
+        ))
+
+    return _out
+
+
 @login_required
 def campaign_status(request, campaign_name, sort_key=2):
     """
     Campaign status view with completion details.
+
+    Status rows are cached for CAMPAIGN_STATUS_CACHE_TIMEOUT seconds.
     """
     LOGGER.info(
         'Rendering campaign status view for user "%s".',
@@ -58,161 +203,35 @@ def campaign_status(request, campaign_name, sort_key=2):
         _msg = 'Failure to identify campaign {0}'.format(campaign_name)
         return HttpResponse(_msg, content_type='text/plain')
 
-    _out = []
-    for team in campaign.teams.all():
-        for user in team.members.all():
-            try:
-                result_type = RESULT_TYPE_BY_CLASS_NAME[
-                    campaign.get_campaign_type()
-                ]  # May raise KeyError
-
-            except KeyError as exc:
-                LOGGER.debug(
-                    'Invalid campaign type %s for campaign %s',
-                    campaign.get_campaign_type(),
-                    campaign.campaignName,
-                )
-                LOGGER.error(exc)
-                continue
-
-            _data = result_type.objects.filter(
-                createdBy=user, completed=True, task__campaign=campaign.id
-            )
+    _key = CAMPAIGN_STATUS_KEY.format(campaign.id)
+    _out = cache.get(_key)
 
-            if result_type is PairwiseAssessmentResult:
-                _data = _data.values_list(
-                    'start_time',
-                    'end_time',
-                    'score1',
-                    'item__itemID',
-                    'item__target1ID',
-                    'item__itemType',
-                    'item__id',
-                )
-
-            else:
-                _data = _data.values_list(
-                    'start_time',
-                    'end_time',
-                    'score',
-                    'item__itemID',
-                    'item__targetID',
-                    'item__itemType',
-                    'item__id',
-                )
-
-            _annotations = len(set([x[6] for x in _data]))
-            _start_times = [x[0] for x in _data]
-            _end_times = [x[1] for x in _data]
-            _durations = [x[1] - x[0] for x in _data]
-
-            _user_mean = sum([x[2] for x in _data]) / (_annotations or 1)
-
-            _cs = _annotations - 1  # Corrected sample size for stdev.
-            _user_stdev = 1
-            if _cs > 0:
-                _user_stdev = sqrt(
-                    sum(((x[2] - _user_mean) ** 2 / _cs) for x in _data)
-                )
-
-            if int(_user_stdev) == 0:
-                _user_stdev = 1
-
-            _tgt = defaultdict(list)
-            _bad = defaultdict(list)
-            for _x in _data:
-                if _x[-2] == 'TGT':
-                    _dst = _tgt
-                elif _x[-2] == 'BAD':
-                    _dst = _bad
-                else:
-                    continue
-
-                _z_score = (_x[2] - _user_mean) / _user_stdev
-                _key = '{0}-{1}'.format(_x[3], _x[4])
-                _dst[_key].append(_z_score)
-
-            _first_modified = (
-                seconds_to_timedelta(min(_start_times))
-                if _start_times
-                else None
-            )
-            _last_modified = (
-                seconds_to_timedelta(max(_end_times))
-                if _end_times
-                else None
-            )
-            _annotation_time = sum(_durations) if _durations else None
-
-            _x = []
-            _y = []
-            for _key in set.intersection(set(_tgt.keys()), set(_bad.keys())):
-                _x.append(sum(_bad[_key]) / float(len(_bad[_key] or 1)))
-                _y.append(sum(_tgt[_key]) / float(len(_tgt[_key] or 1)))
-
-            _reliable = None
-            if _x and _y:
-                try:
-                    from scipy.stats import mannwhitneyu
-
-                    _t, pvalue = mannwhitneyu(_x, _y, alternative='less')
-                    _reliable = pvalue
-
-                except ImportError:
-                    pass
-
-                # Possible for mannwhitneyu() to throw in some scenarios:
-                #
-                # File "scipy/stats/stats.py", line 4865, in mannwhitneyu
-                #   raise ValueError(
-                #     'All numbers are identical in mannwhitneyu')
-                except ValueError:
-                    pass
-
-            if _first_modified:
-                _date_modified = datetime(1970, 1, 1) + _first_modified
-                _first_modified = str(_date_modified).split('.')[0]
-
-            else:
-                _first_modified = 'Never'
-
-            if _last_modified:
-                _date_modified = datetime(1970, 1, 1) + _last_modified
-                _last_modified = str(_date_modified).split('.')[0]
-
-            else:
-                _last_modified = 'Never'
-
-            if _annotation_time:
-                _hours = int(floor(_annotation_time / 3600))
-                _minutes = int(floor((_annotation_time % 3600) / 60))
-                _annotation_time = '{0:0>2d}h{1:0>2d}m'.format(
-                    _hours, _minutes
-                )
-
-            else:
-                _annotation_time = 'n/a'
-
-            if _reliable:
-                _reliable = '{0:1.6f}'.format(_reliable)
-
-            else:
-                _reliable = 'n/a'
-
-            _item = (
-                user.username,
-                user.is_active,
-                _annotations,
-                _first_modified,
-                _last_modified,
-                _annotation_time,
+    if _out is None:
+        try:
+            result_type = RESULT_TYPE_BY_CLASS_NAME[
+                campaign.get_campaign_type()
+            ]  # May raise KeyError
+
+        except KeyError as exc:
+            LOGGER.debug(
+                'Invalid campaign type %s for campaign %s',
+                campaign.get_campaign_type(),
+                campaign.campaignName,
             )
-            if request.user.is_staff:
-                _item += (_reliable,)
+            LOGGER.error(exc)
+            result_type = None
+
+        _out = []
+        if result_type is not None:
+            _out = _compute_campaign_status(campaign, result_type)
 
-            _out.append(_item)
+        cache.set(_key, _out, CAMPAIGN_STATUS_CACHE_TIMEOUT)
 
-    _out.sort(key=lambda x: x[int(sort_key)])
+    # Reliability scores are only shown to staff users.
+    if not request.user.is_staff:
+        _out = [_row[:-1] for _row in _out]
+
+    _out = sorted(_out, key=lambda x: x[int(sort_key)])
 
     _header = (
         'username',
@@ -235,3 +254,41 @@ def campaign_status(request, campaign_name, sort_key=2):
         _txt.append(_local_out)
 
     return HttpResponse(u'\n'.join(_txt), content_type='text/plain')
+
+
+@login_required
+def campaign_results(request, campaign_name):
+    """
+    Streams CSV export of all completed results for given campaign.
+
+    Only available to staff users.
+    """
+    LOGGER.info(
+        'Rendering campaign results export for user "%s".',
+        request.user.username or "Anonymous",
+    )
+
+    if not request.user.is_staff:
+        _msg = 'Campaign results are only available to staff users'
+        return HttpResponse(_msg, content_type='text/plain', status=403)
+
+    try:
+        campaign = _get_campaign_instance(campaign_name)
+
+    except CommandError:
+        _msg = 'Failure to identify campaign {0}'.format(campaign_name)
+        return HttpResponse(_msg, content_type='text/plain')
+
+    try:
+        result_type = RESULT_TYPE_BY_CLASS_NAME[campaign.get_campaign_type()]
+
+    except KeyError:
+        _msg = 'Invalid campaign type for campaign {0}'.format(campaign_name)
+        return HttpResponse(_msg, content_type='text/plain')
+
+    results = result_type.objects.filter(
+        completed=True, task__campaign=campaign.id
+    )
+    return result_type.get_results_as_csv_response(
+        '{0}.csv'.format(campaign.campaignName), results
+    )
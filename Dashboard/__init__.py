@@ -3,3 +3,5 @@ Appraise evaluation framework
 
 See LICENSE for usage details
 """
+
+default_app_config = 'Dashboard.apps.DashboardConfig'
@@ -9,3 +9,8 @@ from django.apps import AppConfig
 # pylint: disable-msg=missing-docstring
 class DashboardConfig(AppConfig):
     name = 'Dashboard'
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel
+        from Dashboard.utils import connect_signals
+        connect_signals()
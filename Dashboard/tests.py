@@ -3,7 +3,116 @@ Appraise evaluation framework
 
 See LICENSE for usage details
 """
-# pylint: disable=unused-import
-from django.db import models
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import TestCase
 
-# Deliberately left empty.
+from Campaign.models import Campaign
+from Dashboard.utils import get_languages_map, get_user_totals
+from EvalData.models import (
+    DirectAssessmentResult,
+    DirectAssessmentTask,
+    Market,
+    Metadata,
+    TextPair,
+)
+
+
+class DashboardSnapshotTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create a campaign with a single DirectAssessmentTask for eng-deu.
+        """
+        super(DashboardSnapshotTests, cls).setUpClass()
+
+        cls.valid_user = User.objects.create(username='dummy-user')
+        cls.valid_user.groups.add(Group.objects.create(name='deu'))
+
+        cls.valid_campaign = Campaign.objects.create(
+            campaignName='TestCampaign', createdBy=cls.valid_user
+        )
+
+        market = Market.objects.create(
+            sourceLanguageCode='eng',
+            targetLanguageCode='deu',
+            domainName='TEST',
+            createdBy=cls.valid_user,
+        )
+        metadata = Metadata.objects.create(
+            market=market,
+            corpusName='TEST',
+            versionInfo='1.0',
+            source='MANUAL',
+            createdBy=cls.valid_user,
+        )
+
+        cls.valid_task = DirectAssessmentTask.objects.create(
+            campaign=cls.valid_campaign,
+            requiredAnnotations=1,
+            batchNo=1,
+            activated=True,
+            createdBy=cls.valid_user,
+        )
+        cls.valid_item = TextPair.objects.create(
+            sourceID='src',
+            sourceText='Source text',
+            targetID='sys',
+            targetText='Target text',
+            itemID=1,
+            itemType='TGT',
+            metadata=metadata,
+            createdBy=cls.valid_user,
+        )
+        cls.valid_task.items.add(cls.valid_item)
+
+    def setUp(self):
+        cache.clear()
+
+    def _get_languages(self, user):
+        languages_map = get_languages_map(
+            user, ['deu'], (DirectAssessmentTask,)
+        )
+        return languages_map[DirectAssessmentTask].get('TestCampaign')
+
+    def test_languages_map_lists_free_tasks(self):
+        """
+        Languages with a free, unassigned task are available.
+        """
+        self.assertEqual(self._get_languages(self.valid_user), ['deu'])
+
+    def test_languages_map_is_invalidated_on_assignment(self):
+        """
+        Assigning the last free task invalidates the cached snapshot.
+        """
+        other_user = User.objects.create(username='other-user')
+        self.assertEqual(self._get_languages(other_user), ['deu'])
+
+        # Cached snapshot is used for subsequent requests.
+        with self.assertNumQueries(2):
+            self.assertEqual(self._get_languages(other_user), ['deu'])
+
+        self.valid_task.assignedTo.add(self.valid_user)
+        self.assertEqual(self._get_languages(other_user), [])
+
+    def test_user_totals_are_invalidated_on_new_results(self):
+        """
+        Creating a result invalidates the cached user totals.
+        """
+        totals = get_user_totals(self.valid_user, (DirectAssessmentResult,))
+        self.assertEqual(totals['annotations'], 0)
+
+        DirectAssessmentResult.objects.create(
+            score=50,
+            start_time=0.0,
+            end_time=2.0,
+            item=self.valid_item,
+            task=self.valid_task,
+            createdBy=self.valid_user,
+            activated=False,
+            completed=True,
+        )
+
+        totals = get_user_totals(self.valid_user, (DirectAssessmentResult,))
+        self.assertEqual(totals['annotations'], 1)
+        self.assertEqual(totals['durations'][0].total_seconds(), 2.0)
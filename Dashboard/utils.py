@@ -0,0 +1,281 @@
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+# pylint: disable=import-error,C0330
+from django.core.cache import cache
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import (
+  m2m_changed,
+  post_delete,
+  post_save,
+  pre_delete,
+)
+
+from Appraise.caching import CacheKey, invalidate_on_change
+from Appraise.utils import _get_logger
+from Campaign.models import Campaign
+from Dashboard.models import USER_GROUPS_KEY
+from EvalData.models import AnnotationTaskRegistry, TaskProgress
+
+LOGGER = _get_logger(name=__name__)
+
+# Cached dashboard data expires after five minutes, even without explicit
+# invalidation. This covers bulk updates which do not send model signals.
+DASHBOARD_CACHE_TIMEOUT = 300
+
+CAMPAIGN_SNAPSHOT_KEY = CacheKey('dashboard:campaign', int)
+USER_TOTALS_KEY = CacheKey('dashboard:user', int)
+
+
+def _compute_campaign_snapshots(campaign_ids, task_types):
+    """
+    Computes dashboard snapshots for the given campaign ids.
+
+    A snapshot is a dict with keys:
+    - task_types: names of task types with tasks in campaign, in the order
+      of task_types;
+    - free_tasks: mapping target language code => ids of free tasks for
+      the first of these task types.
+    """
+    snapshots = {
+        campaign_id: {'task_types': [], 'free_tasks': {}}
+        for campaign_id in campaign_ids
+    }
+
+    for task_cls in task_types:
+        for campaign_id in task_cls.objects.filter(
+          campaign_id__in=campaign_ids
+        ).order_by().values_list('campaign_id', flat=True).distinct():
+            snapshots[campaign_id]['task_types'].append(task_cls.__name__)
+
+    # Free tasks are only looked up for the primary task type of each
+    # campaign, using a single query per task type.
+    for task_cls in task_types:
+        primary_ids = [
+            campaign_id for campaign_id, snapshot in snapshots.items()
+            if snapshot['task_types'][:1] == [task_cls.__name__]
+        ]
+        if not primary_ids:
+            continue
+
+        free_tasks = task_cls.get_free_tasks_for_campaigns(primary_ids)
+        for campaign_id in primary_ids:
+            snapshots[campaign_id]['free_tasks'] = free_tasks.get(
+              campaign_id, {}
+            )
+
+    return snapshots
+
+
+def get_campaign_snapshots(campaigns, task_types):
+    """
+    Returns mapping campaign id => dashboard snapshot for given campaigns.
+
+    Snapshots are served from cache; missing snapshots are computed in bulk.
+    """
+    keys = {
+        campaign.id: CAMPAIGN_SNAPSHOT_KEY.format(campaign.id)
+        for campaign in campaigns
+    }
+    cached = cache.get_many(keys.values())
+
+    snapshots = {}
+    missing_ids = []
+    for campaign_id, key in keys.items():
+        if key in cached:
+            snapshots[campaign_id] = cached[key]
+        else:
+            missing_ids.append(campaign_id)
+
+    if missing_ids:
+        LOGGER.debug('Computing %d campaign snapshots', len(missing_ids))
+        computed = _compute_campaign_snapshots(missing_ids, task_types)
+        cache.set_many(
+          {keys[x]: computed[x] for x in missing_ids},
+          DASHBOARD_CACHE_TIMEOUT,
+        )
+        snapshots.update(computed)
+
+    return snapshots
+
+
+def get_languages_map(user, languages, task_types):
+    """
+    Returns mapping task type => campaign name => list of language codes
+    for which a free task is available to the given user.
+    """
+    languages_map = {task_cls: {} for task_cls in task_types}
+    classes_by_name = {task_cls.__name__: task_cls for task_cls in task_types}
+
+    campaigns = list(Campaign.objects.all())
+    snapshots = get_campaign_snapshots(campaigns, task_types)
+
+    # Tasks already assigned to the user do not count as free tasks.
+    assigned_tasks = {}
+    for task_cls in task_types:
+        assigned_tasks[task_cls.__name__] = set(
+          task_cls.objects.filter(
+            assignedTo=user, completed=False
+          ).order_by().values_list('id', flat=True)
+        )
+
+    for campaign in campaigns:
+        snapshot = snapshots[campaign.id]
+        if not snapshot['task_types']:
+            continue
+
+        campaign_types = [classes_by_name[x] for x in snapshot['task_types']]
+        primary_cls = campaign_types[0]
+
+        available = []
+        if not primary_cls.is_campaign_limit_reached_for_user(campaign, user):
+            assigned = assigned_tasks[primary_cls.__name__]
+            for code in languages:
+                free_tasks = snapshot['free_tasks'].get(code, ())
+                if any(x not in assigned for x in free_tasks):
+                    available.append(code)
+
+        for task_cls in campaign_types:
+            languages_map[task_cls][campaign.campaignName] = list(available)
+
+        LOGGER.debug(
+          'campaign = %s, type = %s, languages = %s',
+          campaign.campaignName, primary_cls.__name__, available,
+        )
+
+    return languages_map
+
+
+def get_user_totals(user, result_types):
+    """
+    Returns dict with annotations, hits, total_hits and per result type
+    durations for the given user.
+    """
+    key = USER_TOTALS_KEY.format(user.id)
+    totals = cache.get(key)
+
+    if totals is None:
+        totals = {
+            'annotations': 0,
+            'hits': 0,
+            'total_hits': 0,
+            'durations': [],
+        }
+        for result_cls in result_types:
+            totals['annotations'] += result_cls.get_completed_for_user(user)
+            _hits, _total = result_cls.get_hit_status_for_user(user)
+            totals['hits'] += _hits
+            totals['total_hits'] += _total
+            totals['durations'].append(result_cls.get_time_for_user(user))
+
+        cache.set(key, totals, DASHBOARD_CACHE_TIMEOUT)
+
+    return totals
+
+
+def invalidate_campaign_snapshots(campaign_ids):
+    """
+    Removes cached snapshots for the given campaign ids.
+    """
+    cache.delete_many(
+      [CAMPAIGN_SNAPSHOT_KEY.format(x) for x in campaign_ids]
+    )
+
+
+def invalidate_user_totals(user_id):
+    """
+    Removes cached totals for the given user id.
+    """
+    cache.delete(USER_TOTALS_KEY.format(user_id))
+
+
+# pylint: disable=unused-argument
+def _task_changed(sender, instance, **kwargs):
+    invalidate_campaign_snapshots([instance.campaign_id])
+
+
+# pylint: disable=unused-argument,too-many-arguments
+def _task_relation_changed(
+  sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        campaign_ids = [instance.campaign_id]
+
+    # Reverse clear does not report affected tasks; invalidate everything.
+    elif pk_set is None:
+        campaign_ids = Campaign.objects.values_list('id', flat=True)
+
+    else:
+        campaign_ids = model.objects.filter(
+          pk__in=pk_set
+        ).order_by().values_list('campaign_id', flat=True).distinct()
+
+    invalidate_campaign_snapshots(set(campaign_ids))
+
+
+# pylint: disable=unused-argument
+def _result_changed(sender, instance, **kwargs):
+    invalidate_user_totals(instance.createdBy_id)
+
+
+# pylint: disable=unused-argument
+def _progress_changed(sender, instance, **kwargs):
+    invalidate_user_totals(instance.user_id)
+
+
+# pylint: disable=unused-argument,too-many-arguments
+def _user_groups_changed(
+  sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        user_ids = [instance.id]
+
+    # Reverse clear does not report affected users, look them up first.
+    elif pk_set is None:
+        user_ids = instance.user_set.values_list('id', flat=True)
+
+    else:
+        user_ids = pk_set
+
+    USER_GROUPS_KEY.delete_many([(x,) for x in user_ids])
+
+
+# pylint: disable=unused-argument
+def _group_changed(sender, instance, **kwargs):
+    USER_GROUPS_KEY.delete_many(
+      [(x,) for x in instance.user_set.values_list('id', flat=True)]
+    )
+
+
+def connect_signals():
+    """
+    Connects cache invalidation to all registered annotation task types
+    and user groups.
+    """
+    for type_name in AnnotationTaskRegistry.get_types():
+        task_cls = AnnotationTaskRegistry.get_type(type_name)
+        result_cls = task_cls.get_result_class()
+
+        for signal in (post_save, post_delete):
+            signal.connect(_task_changed, sender=task_cls)
+            signal.connect(_result_changed, sender=result_cls)
+
+        for through in (task_cls.assignedTo.through, task_cls.items.through):
+            m2m_changed.connect(_task_relation_changed, sender=through)
+
+    post_save.connect(_progress_changed, sender=TaskProgress)
+    post_delete.connect(_progress_changed, sender=TaskProgress)
+
+    # Group names of users, see Dashboard.models.get_user_group_names().
+    invalidate_on_change(User, USER_GROUPS_KEY, lambda x: [(x.id,)])
+    m2m_changed.connect(_user_groups_changed, sender=User.groups.through)
+    post_save.connect(_group_changed, sender=Group)
+    pre_delete.connect(_group_changed, sender=Group)
@@ -3,7 +3,6 @@ Appraise evaluation framework
 
 See LICENSE for usage details
 """
-from datetime import datetime
 from hashlib import md5
 from inspect import currentframe, getframeinfo
 
@@ -14,8 +13,14 @@ from django.contrib.auth import authenticate, login, logout
 from django.shortcuts import render, redirect, render_to_response
 
 from Appraise.settings import BASE_CONTEXT
-from Appraise.utils import _get_logger
-from Dashboard.models import UserInviteToken, LANGUAGE_CODES_AND_NAMES
+from Appraise.utils import _get_logger, StepTimer
+from Dashboard.models import (
+    LANGUAGE_CODES_AND_NAMES,
+    UserInviteToken,
+    get_user_group_names,
+    get_user_languages,
+)
+from Dashboard.utils import get_languages_map, get_user_totals
 from EvalData.models import (
     DataAssessmentTask,
     DataAssessmentResult,
@@ -27,6 +32,7 @@ from EvalData.models import (
     DirectAssessmentDocumentResult,
     MultiModalAssessmentTask,
     MultiModalAssessmentResult,
+    ObjectID,
     PairwiseAssessmentTask,
     PairwiseAssessmentResult,
     TaskAgenda,
@@ -347,18 +353,15 @@ def dashboard(request):
     """
     Appraise dashboard page.
     """
-    _t1 = datetime.now()
+    timer = StepTimer('dashboard', logger=LOGGER)
 
     template_context = {'active_page': 'dashboard'}
     template_context.update(BASE_CONTEXT)
 
-    annotations = 0
-    hits = 0
-    total_hits = 0
-    for result_cls in TASK_RESULTS:
-        annotations += result_cls.get_completed_for_user(request.user)
-        _hits, _total = result_cls.get_hit_status_for_user(request.user)
-        hits, total_hits = hits + _hits, total_hits + _total
+    user_totals = get_user_totals(request.user, TASK_RESULTS)
+    annotations = user_totals['annotations']
+    hits = user_totals['hits']
+    total_hits = user_totals['total_hits']
 
     # If user still has an assigned task, only offer link to this task.
     current_task = None
@@ -369,8 +372,9 @@ def dashboard(request):
         # Check if marketTargetLanguage for current_task matches user languages.
         if current_task:
             code = current_task.marketTargetLanguageCode()
-            print('  User groups:', request.user.groups.all())
-            if code not in request.user.groups.values_list('name', flat=True):
+            user_groups = get_user_group_names(request.user)
+            LOGGER.info('User groups: %s', user_groups)
+            if code not in user_groups:
                 _msg = (
                     'Language %s not specified for user %s. Giving up task %s'
                 )
@@ -381,7 +385,7 @@ def dashboard(request):
 
     print('  Current task: {0}'.format(current_task))
 
-    _t2 = datetime.now()
+    timer.mark('current task')
 
     # If there is no current task, check if user is done with work agenda.
     work_completed = False
@@ -392,8 +396,11 @@ def dashboard(request):
             LOGGER.info('Identified work agenda %s', agenda)
 
             tasks_to_complete = []
-            for serialized_open_task in agenda.serialized_open_tasks():
-                open_task = serialized_open_task.get_object_instance()
+            serialized_open_tasks = agenda.serialized_open_tasks()
+            open_tasks = ObjectID.get_object_instances(serialized_open_tasks)
+            for serialized_open_task, open_task in zip(
+              serialized_open_tasks, open_tasks
+            ):
 
                 # Skip tasks which are not available anymore
                 if open_task is None:
@@ -401,7 +408,6 @@ def dashboard(request):
 
                 if open_task.next_item_for_user(request.user) is not None:
                     current_task = open_task
-                    campaign = agenda.campaign
                     LOGGER.info(
                         'Current task type: %s',
                         open_task.__class__.__name__,
@@ -426,75 +432,23 @@ def dashboard(request):
     languages_map = { task_cls: {} for task_cls in TASK_TYPES }
 
     if not current_task and not work_completed:
-        languages = []
-        for code in LANGUAGE_CODES_AND_NAMES:
-            if request.user.groups.filter(name=code).exists():
-                if not code in languages:
-                    languages.append(code)
+        languages = get_user_languages(request.user)
 
         if hits < HITS_REQUIRED_BEFORE_ENGLISH_ALLOWED:
             if len(languages) > 1 and 'eng' in languages:
                 languages.remove('eng')
 
         # Remove any language for which no free task is available.
-        from Campaign.models import Campaign
-
-        # Mapping: task type => campaigns as QuerySet
-        campaign_map = { task_cls: None for task_cls in TASK_TYPES }
-
-        for campaign in Campaign.objects.all():
-            print('Campaign: {0}'.format(campaign.campaignName))
-
-            for task_cls in campaign_map:
-                campaign_map[task_cls] = task_cls.objects.filter(
-                    campaign__campaignName=campaign.campaignName
-                )
-
-            for task_cls in campaign_map:
-                if campaign_map[task_cls].exists():
-                    languages_map[task_cls][campaign.campaignName] = []
-                    languages_map[task_cls][campaign.campaignName].extend(languages)
-
-            for code in languages:
-                next_task_available = None
-
-                _cls = DirectAssessmentTask
-                for task_cls in campaign_map:
-                    if campaign_map[task_cls].exists():
-                        _cls = task_cls
-                        break
-
-                next_task_available = _cls.get_next_free_task_for_language(
-                    code, campaign, request.user
-                )
-
-                if not next_task_available:
-                    for task_cls in campaign_map:
-                        if campaign_map[task_cls].exists():
-                            languages_map[task_cls][campaign.campaignName].remove(code)
-
-            # _type and _languages variables are only for debug
-            for task_cls in campaign_map:
-                if campaign_map[task_cls].exists():
-                    _type = TASK_NAMES[task_cls]
-                    _languages = languages_map[task_cls]
-                    break
-
-            print(
-                "campaign = {0}, type = {1}, languages = {2}".format(
-                    campaign.campaignName,
-                    _type,
-                    _languages.get(campaign.campaignName, 'none'),
-                )
-            )
+        languages_map = get_languages_map(
+          request.user, languages, TASK_TYPES
+        )
 
-    _t3 = datetime.now()
+    timer.mark('languages')
 
 
     # Collect total annotation time
     times = { 'days': 0, 'hours': 0, 'minutes': 0, 'seconds': 0 }
-    for task_cls in TASK_RESULTS:
-        duration = task_cls.get_time_for_user(request.user)
+    for duration in user_totals['durations']:
         secs = duration.total_seconds()
         days = duration.days
         times['days'] += days
@@ -502,7 +456,8 @@ def dashboard(request):
         times['minutes'] += int(((secs - (days * 86400)) % 3600) / 60)
         times['seconds'] += int((secs - (days * 86400)) % 60)
 
-    _t4 = datetime.now()
+    timer.mark('times')
+    timer.log()
 
 
     # All languages per task type
@@ -543,7 +498,7 @@ def dashboard(request):
             'current_type': current_type,
             'current_url': current_url,
             'all_languages': all_languages,
-            'debug_times': (_t2 - _t1, _t3 - _t2, _t4 - _t3, _t4 - _t1),
+            'debug_times': timer.durations(),
             'template_debug': 'debug' in request.GET,
             'work_completed': work_completed,
         }
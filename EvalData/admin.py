@@ -496,21 +496,26 @@ class TaskAgendaAdmin(admin.ModelAdmin):
     def reset_taskagenda(self, request, queryset):
         """
         Handles reset task agenda admin action for TaskAgenda instances.
+
+        Resets all selected task agendas. Each reset is a transaction of
+        its own; failures are reported without affecting other agendas.
         """
-        agendas_selected = queryset.count()
-        if agendas_selected > 1:
-            _msg = (
-              "You can only reset one task agenda at a time. "
-              "No items have been changed."
-            )
-            self.message_user(request, _msg, level=messages.WARNING)
-            return HttpResponseRedirect(
-              reverse('admin:EvalData_taskagenda_changelist'))
-
-        _pk = request.POST.getlist(admin.ACTION_CHECKBOX_NAME)
+        _reset = 0
+        for agenda in queryset.select_related('user', 'campaign'):
+            # This will return triple with a status message and level.
+            _ret, _msg, _lvl = agenda.reset_taskagenda()
+            if _ret:
+                _reset += 1
+            else:
+                self.message_user(request, _msg, level=_lvl)
+
+        _msg = 'Reset {0} of {1} selected task agendas.'.format(
+          _reset, queryset.count()
+        )
+        self.message_user(request, _msg, level=messages.INFO)
         return HttpResponseRedirect(
-          reverse('reset-taskagenda', args=_pk))
-    reset_taskagenda.short_description = "Reset task agenda"
+          reverse('admin:EvalData_taskagenda_changelist'))
+    reset_taskagenda.short_description = "Reset selected task agendas"
 
 
 class PairwiseAssessmentTaskAdmin(BaseMetadataAdmin):
@@ -8,3 +8,16 @@ from django.apps import AppConfig
 # pylint: disable=missing-docstring
 class EvaldataConfig(AppConfig):
     name = 'EvalData'
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel
+        from EvalData.models import (
+            connect_document_block_signals,
+            connect_progress_signals,
+            connect_system_score_signals,
+            connect_task_cache_signals,
+        )
+        connect_document_block_signals()
+        connect_progress_signals()
+        connect_system_score_signals()
+        connect_task_cache_signals()
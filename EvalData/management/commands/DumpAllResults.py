@@ -22,19 +22,23 @@ class Command(BaseCommand):
     help = 'Dumps all DirectAssessmentResult and MultiModalAssessmentResult instances'
 
     def add_arguments(self, parser):
-        pass
+        parser.add_argument(
+            '--compress',
+            action='store_true',
+            help='Write gzip-compressed CSV files',
+        )
 
     def handle(self, *args, **options):
         del args  # Unused.
-        del options  # Unused.
+        compress = options['compress']
 
         _msg = '\n[{0}]\n\n'.format(basename(__file__))
         self.stdout.write(_msg)
         self.stdout.write('\n[INIT]\n\n')
 
         DirectAssessmentResult.dump_all_results_to_csv_file(
-            'DirectAssessmentResults.csv')
+            'DirectAssessmentResults.csv', compress=compress)
         MultiModalAssessmentResult.dump_all_results_to_csv_file(
-            'MultiModalAssessmentResults.csv')
+            'MultiModalAssessmentResults.csv', compress=compress)
 
         self.stdout.write('\n[DONE]\n\n')
@@ -0,0 +1,84 @@
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+from os.path import basename
+
+# pylint: disable=E0401,W0611
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from Campaign.models import Campaign
+from EvalData.models import TextSegmentWithTwoTargets
+from EvalData.models.base_models import BULK_CREATE_BATCH_SIZE
+
+
+# pylint: disable=C0111,C0330
+class Command(BaseCommand):
+    help = 'Precomputes target texts with differences for pairwise items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=str,
+            default=None,
+            help='Only precompute diffs for items in the given campaign',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute diffs which have been stored already',
+        )
+
+    def handle(self, *args, **options):
+        _msg = '\n[{0}]\n\n'.format(basename(__file__))
+        self.stdout.write(_msg)
+        self.stdout.write('\n[INIT]\n\n')
+
+        items = TextSegmentWithTwoTargets.objects.all()
+        if options['campaign']:
+            try:
+                campaign = Campaign.get_campaign_or_raise(
+                    options['campaign']
+                )
+
+            except LookupError as error:
+                raise CommandError(error)
+
+            items = items.filter(
+                evaldata_pairwiseassessmenttasks__campaign=campaign
+            ).distinct()
+
+        if not options['force']:
+            items = items.filter(target1Diff__isnull=True)
+
+        items = items.only('id', 'target1Text', 'target2Text').order_by('id')
+
+        updated_count = 0
+        batch = []
+        for item in items.iterator(chunk_size=BULK_CREATE_BATCH_SIZE):
+            item.update_target_diffs()
+            batch.append(item)
+
+            if len(batch) >= BULK_CREATE_BATCH_SIZE:
+                updated_count += self._update_diffs(batch)
+                batch = []
+
+        if batch:
+            updated_count += self._update_diffs(batch)
+
+        self.stdout.write('Precomputed diffs for {0} items'.format(
+            updated_count
+        ))
+
+        self.stdout.write('\n[DONE]\n\n')
+
+    @staticmethod
+    def _update_diffs(items):
+        TextSegmentWithTwoTargets.objects.bulk_update(
+            items, ['target1Diff', 'target2Diff']
+        )
+        return len(items)
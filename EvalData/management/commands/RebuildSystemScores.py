@@ -0,0 +1,59 @@
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+from os.path import basename
+
+# pylint: disable=E0401,W0611
+from django.apps import apps
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from Campaign.models import Campaign
+from EvalData.models import AnnotationTaskRegistry, SystemScoreAggregate
+
+
+# pylint: disable=C0111,C0330
+class Command(BaseCommand):
+    help = 'Rebuilds system score totals from existing annotation results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=str,
+            default=None,
+            help='Only rebuild totals for the given campaign',
+        )
+
+    def handle(self, *args, **options):
+        _msg = '\n[{0}]\n\n'.format(basename(__file__))
+        self.stdout.write(_msg)
+        self.stdout.write('\n[INIT]\n\n')
+
+        campaign_ids = None
+        if options['campaign']:
+            try:
+                campaign = Campaign.get_campaign_or_raise(
+                    options['campaign']
+                )
+                campaign_ids = [campaign.id]
+
+            except LookupError as error:
+                raise CommandError(error)
+
+        for task_type in sorted(AnnotationTaskRegistry.get_types()):
+            task_cls = apps.get_model('EvalData', task_type)
+            result_cls = task_cls.get_result_class()
+
+            rows = SystemScoreAggregate.rebuild(
+                result_cls, campaign_ids=campaign_ids
+            )
+
+            self.stdout.write(
+                'Rebuilt {0} {1} totals'.format(rows, result_cls.__name__)
+            )
+
+        self.stdout.write('\n[DONE]\n\n')
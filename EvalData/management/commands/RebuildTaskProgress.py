@@ -0,0 +1,84 @@
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+from os.path import basename
+
+# pylint: disable=E0401,W0611
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.db import transaction
+
+from Campaign.models import Campaign
+from EvalData.models import AnnotationTaskRegistry, TaskProgress
+
+
+# pylint: disable=C0111,C0330
+class Command(BaseCommand):
+    help = 'Rebuilds TaskProgress cursors from existing annotation results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=str,
+            default=None,
+            help='Only rebuild cursors for tasks in the given campaign',
+        )
+
+    def handle(self, *args, **options):
+        _msg = '\n[{0}]\n\n'.format(basename(__file__))
+        self.stdout.write(_msg)
+        self.stdout.write('\n[INIT]\n\n')
+
+        campaign = None
+        if options['campaign']:
+            try:
+                campaign = Campaign.get_campaign_or_raise(
+                    options['campaign']
+                )
+
+            except LookupError as error:
+                raise CommandError(error)
+
+        for task_type in sorted(AnnotationTaskRegistry.get_types()):
+            task_cls = apps.get_model('EvalData', task_type)
+            result_cls = task_cls.get_result_class()
+
+            tasks = task_cls.objects.all()
+            if campaign:
+                tasks = tasks.filter(campaign=campaign)
+
+            task_users = list(
+                result_cls.objects.filter(task__in=tasks)
+                .order_by()
+                .values_list('task_id', 'createdBy_id')
+                .distinct()
+            )
+
+            task_instances = tasks.in_bulk(
+                set(task_id for task_id, _ in task_users)
+            )
+            user_instances = User.objects.in_bulk(
+                set(user_id for _, user_id in task_users)
+            )
+
+            with transaction.atomic():
+                stale_cursors = TaskProgress.objects.filter(
+                    taskType=task_type, taskID__in=tasks.values('id')
+                )
+                stale_cursors.delete()
+
+                for task_id, user_id in task_users:
+                    task = task_instances[task_id]
+                    task.update_progress_for_user(user_instances[user_id])
+
+            self.stdout.write(
+                'Rebuilt {0} {1} cursors'.format(len(task_users), task_type)
+            )
+
+        self.stdout.write('\n[DONE]\n\n')
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.28 on 2026-10-17 06:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('EvalData', '0046_auto_20210127_0602'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taskType', models.CharField(max_length=100, verbose_name='Task type')),
+                ('taskID', models.PositiveIntegerField(verbose_name='Task ID')),
+                ('nextItemID', models.PositiveIntegerField(blank=True, help_text='(empty if all items are completed)', null=True, verbose_name='Next item ID')),
+                ('nextItemPosition', models.PositiveIntegerField(default=0, help_text='(0-based)', verbose_name='Next item position')),
+                ('completedItems', models.PositiveIntegerField(default=0, verbose_name='Completed items')),
+                ('completedTargets', models.PositiveIntegerField(default=0, verbose_name='Completed target items')),
+                ('completedBlocks', models.PositiveIntegerField(default=0, verbose_name='Completed blocks')),
+                ('dateModified', models.DateTimeField(auto_now=True, verbose_name='Date modified')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Task progress',
+                'verbose_name_plural': 'Task progress',
+                'unique_together': {('user', 'taskType', 'taskID')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-17 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EvalData', '0047_taskprogress'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='market',
+            name='targetLanguageCode',
+            field=models.CharField(db_index=True, help_text='(max. 10 characters)', max_length=10, verbose_name='Target language'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+TASK_TYPES = (
+    'DataAssessmentTask',
+    'DirectAssessmentTask',
+    'DirectAssessmentContextTask',
+    'DirectAssessmentDocumentTask',
+    'MultiModalAssessmentTask',
+    'PairwiseAssessmentTask',
+)
+
+
+def deduplicate_object_ids(apps, schema_editor):
+    """
+    Merges duplicate ObjectID bindings into the oldest binding, moving
+    task agenda references, and creates missing bindings for tasks.
+    """
+    ObjectID = apps.get_model('EvalData', 'ObjectID')
+    TaskAgenda = apps.get_model('EvalData', 'TaskAgenda')
+    through_models = (
+        TaskAgenda._open_tasks.through,
+        TaskAgenda._completed_tasks.through,
+    )
+
+    duplicates = ObjectID.objects.values('typeName', 'primaryID').annotate(
+        keep_id=Min('id'), count=Count('id')
+    ).filter(count__gt=1)
+
+    for duplicate in duplicates:
+        keep_id = duplicate['keep_id']
+        duplicate_ids = list(
+            ObjectID.objects.filter(
+                typeName=duplicate['typeName'],
+                primaryID=duplicate['primaryID'],
+            ).exclude(id=keep_id).values_list('id', flat=True)
+        )
+
+        for through in through_models:
+            for row in through.objects.filter(objectid_id__in=duplicate_ids):
+                if not through.objects.filter(
+                    objectid_id=keep_id, taskagenda_id=row.taskagenda_id
+                ).exists():
+                    row.objectid_id = keep_id
+                    row.save()
+                else:
+                    row.delete()
+
+        ObjectID.objects.filter(id__in=duplicate_ids).delete()
+
+    for type_name in TASK_TYPES:
+        task_model = apps.get_model('EvalData', type_name)
+        bound_ids = set(
+            ObjectID.objects.filter(typeName=type_name).values_list(
+                'primaryID', flat=True
+            )
+        )
+        ObjectID.objects.bulk_create(
+            [
+                ObjectID(typeName=type_name, primaryID=str(task_id))
+                for task_id in task_model.objects.values_list('id', flat=True)
+                if str(task_id) not in bound_ids
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EvalData', '0048_market_targetlanguagecode_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            deduplicate_object_ids, migrations.RunPython.noop
+        ),
+    ]
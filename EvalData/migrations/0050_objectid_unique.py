@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-17 06:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EvalData', '0049_objectid_deduplicate'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='objectid',
+            unique_together={('typeName', 'primaryID')},
+        ),
+    ]
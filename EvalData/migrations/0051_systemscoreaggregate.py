@@ -0,0 +1,37 @@
+# Generated by Django 2.2.28 on 2026-10-17 06:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Campaign', '0013_auto_20200601_1217'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('EvalData', '0050_objectid_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemScoreAggregate',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resultType', models.CharField(max_length=100, verbose_name='Result type')),
+                ('sourceLanguageCode', models.CharField(max_length=10, verbose_name='Source language')),
+                ('targetLanguageCode', models.CharField(max_length=10, verbose_name='Target language')),
+                ('systemID', models.CharField(max_length=1000, verbose_name='System ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Score count')),
+                ('scoreSum', models.FloatField(default=0, verbose_name='Score sum')),
+                ('scoreSquaresSum', models.FloatField(default=0, verbose_name='Score squares sum')),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='Campaign.Campaign', verbose_name='Campaign')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'System score aggregate',
+                'verbose_name_plural': 'System score aggregates',
+                'unique_together': {('campaign', 'resultType', 'sourceLanguageCode', 'targetLanguageCode', 'systemID', 'user')},
+            },
+        ),
+    ]
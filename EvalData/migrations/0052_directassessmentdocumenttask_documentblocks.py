@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-17 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EvalData', '0051_systemscoreaggregate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='directassessmentdocumenttask',
+            name='documentBlocks',
+            field=models.TextField(blank=True, editable=False, help_text='(IDs of items completing a document block)', null=True, verbose_name='Document blocks'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-17 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EvalData', '0052_directassessmentdocumenttask_documentblocks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='textsegmentwithtwotargets',
+            name='target1Diff',
+            field=models.TextField(blank=True, editable=False, null=True, verbose_name='Text with differences (1)'),
+        ),
+        migrations.AddField(
+            model_name='textsegmentwithtwotargets',
+            name='target2Diff',
+            field=models.TextField(blank=True, editable=False, null=True, verbose_name='Text with differences (2)'),
+        ),
+    ]
@@ -10,4 +10,5 @@ from .direct_assessment_context import *
 from .direct_assessment_document import *
 from .multi_modal_assessment import *
 from .pairwise_assessment import *
+from .system_scores import *
 from .task_agenda import *
@@ -4,21 +4,32 @@ Appraise evaluation framework
 See LICENSE for usage details
 """
 # pylint: disable=C0103,C0330,no-member
+import csv
+import gzip
+from codecs import getincrementaldecoder
+from collections import defaultdict
 from datetime import datetime
 from datetime import timedelta
-from traceback import format_exc
-from typing import Set
-
-from django.db import models
+from json import JSONDecoder
+from os.path import join
+from zipfile import is_zipfile
+from zipfile import ZipFile
+
+from django.db import connection, models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Sum
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
 from django.utils.text import format_lazy as f
 from django.utils.timezone import utc
 from django.utils.translation import ugettext_lazy as _
 
 # TODO: Unclear if these are needed?
 # from Appraise.settings import STATIC_URL, BASE_CONTEXT
+from Appraise.caching import CacheKey, invalidate_on_change
 from Appraise.utils import _get_logger
+from Dashboard.models import LANGUAGE_CODES_AND_NAMES
 
 MAX_DOMAINNAME_LENGTH = 20
 MAX_LANGUAGECODE_LENGTH = 10
@@ -31,6 +42,14 @@ MAX_ITEMTYPE_LENGTH = 5
 MAX_REQUIREDANNOTATIONS_VALUE = 50
 MAX_TYPENAME_LENGTH = 100
 MAX_PRIMARYID_LENGTH = 50
+MAX_ASSIGNMENT_ATTEMPTS = 10
+ASSIGNMENT_CANDIDATES = 10
+CSV_EXPORT_CHUNK_SIZE = 2000
+BULK_CREATE_BATCH_SIZE = 500
+IMPORT_CHUNK_SIZE = 50
+JSON_STREAM_CHUNK_SIZE = 65536
+
+TASK_MARKET_KEY = CacheKey('task:market', str, int)
 
 SET_ITEMTYPE_CHOICES = (
   ('SRC', 'Source text'),
@@ -54,6 +73,124 @@ def seconds_to_timedelta(value):
     return timedelta(days=_days, hours=_hours, minutes=_mins, seconds=_secs)
 
 
+def bulk_create_with_ids(model_cls, instances):
+    """
+    Inserts given new model instances and sets their primary keys.
+
+    Uses bulk INSERT statements if the database returns ids for bulk
+    inserts and the model has no multi-table inheritance parents, which
+    Django cannot bulk create. Otherwise, instances are saved one by one.
+    Either way, ObjectID bindings are created as in BaseMetadata.save().
+    """
+    if connection.features.can_return_ids_from_bulk_insert \
+      and not model_cls._meta.parents:
+        model_cls.objects.bulk_create(
+          instances, batch_size=BULK_CREATE_BATCH_SIZE
+        )
+        if model_cls.BIND_OBJECT_ID:
+            model_cls.create_object_ids(instances)
+        return
+
+    for instance in instances:
+        instance.save()
+
+
+def iter_json_array(json_file, chunk_size=JSON_STREAM_CHUNK_SIZE):
+    """
+    Yields elements of the top-level JSON array in given binary file.
+
+    The file is decoded incrementally, so only the current element has to
+    fit into memory. Raises ValueError for invalid JSON.
+    """
+    decoder = JSONDecoder()
+    utf8_decoder = getincrementaldecoder('utf-8')()
+
+    buffer = ''
+    pos = 0
+    eof = False
+    expected = '['
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+
+        if pos == len(buffer):
+            if eof:
+                raise ValueError('Unexpected end of JSON array')
+
+            data = json_file.read(chunk_size)
+            eof = not data
+            buffer = utf8_decoder.decode(data, final=eof)
+            pos = 0
+            continue
+
+        char = buffer[pos]
+        if expected == '[':
+            if char != '[':
+                raise ValueError('Expected JSON array')
+            pos += 1
+            expected = 'value or ]'
+
+        elif expected == ',':
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError('Expected , or ] in JSON array')
+            pos += 1
+            expected = 'value'
+
+        elif char == ']' and expected == 'value or ]':
+            return
+
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+
+            except ValueError:
+                if eof:
+                    raise
+                end = None
+
+            # Values ending at the end of the buffer may be incomplete, so
+            # we read more data, doubling the buffer size, and try again.
+            if end is None or end == len(buffer) and not eof:
+                data = json_file.read(max(chunk_size, len(buffer) - pos))
+                eof = not data
+                buffer = buffer[pos:] + utf8_decoder.decode(data, final=eof)
+                pos = 0
+                continue
+
+            yield value
+            buffer = buffer[end:]
+            pos = 0
+            expected = ','
+
+
+def iter_batch_tasks(batch_data):
+    """
+    Yields task objects from the JSON file for given batch data. For ZIP
+    archives, tasks from all contained JSON files are yielded in order.
+    """
+    batch_name = batch_data.dataFile.name
+    batch_file = batch_data.dataFile
+
+    if not batch_name.endswith('.zip'):
+        batch_file.open('rb')
+        with batch_file:
+            yield from iter_json_array(batch_file)
+        return
+
+    if not is_zipfile(batch_file):
+        _msg = 'Batch {0} not a valid ZIP archive'.format(batch_name)
+        LOGGER.warn(_msg)
+        return
+
+    with ZipFile(batch_file) as batch_zip:
+        for batch_json_file in batch_zip.namelist():
+            if batch_json_file.endswith('.json'):
+                with batch_zip.open(batch_json_file) as json_file:
+                    yield from iter_json_array(json_file)
+
+
 class ObjectID(models.Model):
     """
     Encodes an object type and ID for retrieval.
@@ -74,41 +211,61 @@ class ObjectID(models.Model):
         value=MAX_PRIMARYID_LENGTH))
     )
 
+    # pylint: disable=C0111,R0903
+    class Meta:
+        unique_together = ('typeName', 'primaryID')
+
     def get_object_instance(self):
         """
         Returns actual object instance for current ObjectID instance.
         """
-        instance = None
-        try:
-            # TODO: add registry of type names to models.py and ensure only
-            #   those are used for typeName. Furthermore, verify that the
-            #   given primaryID does not contain ')'.
+        return ObjectID.get_object_instances([self])[0]
 
-            _code = '{0}.objects.get(id={1})'.format(
-              self.typeName, self.primaryID
-            )
+    @staticmethod
+    def get_object_instances(object_ids):
+        """
+        Returns actual object instances for given ObjectID instances.
 
-            # Hack for Python 3.5.2
-            from EvalData.models import (
-                DataAssessmentTask,
-                DirectAssessmentTask,
-                DirectAssessmentContextTask,
-                DirectAssessmentDocumentTask,
-                MultiModalAssessmentTask,
-                PairwiseAssessmentTask,
-            )
+        Uses a single query per annotation task type. The returned list
+        matches the order of object_ids and contains None for any ObjectID
+        which cannot be resolved.
+        """
+        object_ids = list(object_ids)
 
-            instance = eval(_code)
+        primary_ids_by_type = defaultdict(set)
+        for object_id in object_ids:
+            if object_id.primaryID.isdigit():
+                primary_ids_by_type[object_id.typeName].add(
+                  int(object_id.primaryID)
+                )
 
-        except:
-            _msg = 'ObjectID {0}.{1} invalid'.format(
-              self.typeName, self.primaryID
-            )
-            LOGGER.warn(_msg)
-            LOGGER.warn(format_exc())
+        instances_by_type = {}
+        for type_name, primary_ids in primary_ids_by_type.items():
+            task_cls = AnnotationTaskRegistry.get_type(type_name)
+            if task_cls is None:
+                continue
+
+            instances_by_type[type_name] = task_cls.objects.select_related(
+              'campaign'
+            ).in_bulk(primary_ids)
+
+        instances = []
+        for object_id in object_ids:
+            instance = None
+            if object_id.primaryID.isdigit():
+                instance = instances_by_type.get(object_id.typeName, {}).get(
+                  int(object_id.primaryID)
+                )
+
+            if instance is None:
+                _msg = 'ObjectID {0}.{1} invalid'.format(
+                  object_id.typeName, object_id.primaryID
+                )
+                LOGGER.warn(_msg)
 
-        finally:
-            return instance
+            instances.append(instance)
+
+        return instances
 
     def __str__(self):
         return str(self.id)+'.'+self.typeName+'.'+self.primaryID
@@ -120,7 +277,7 @@ class AnnotationTaskRegistry():
 
     Use @AnnotationTaskRegistry.register decorator to register class.
     """
-    _ANNOTATION_TASK_REGISTRY = set()  # Set[str]
+    _ANNOTATION_TASK_REGISTRY = {}  # Dict[str, type]
 
     @staticmethod
     def register(obj):
@@ -128,22 +285,78 @@ class AnnotationTaskRegistry():
         Add annotation task type to registry.
         """
         _name = obj.__name__
-        AnnotationTaskRegistry._ANNOTATION_TASK_REGISTRY.add(_name)
+        AnnotationTaskRegistry._ANNOTATION_TASK_REGISTRY[_name] = obj
         return obj
 
     @staticmethod
     def get_types():
         """
-        Get annotation task types in registry.
+        Get annotation task type names in registry.
+        """
+        return set(AnnotationTaskRegistry._ANNOTATION_TASK_REGISTRY.keys())
+
+    @staticmethod
+    def get_type(type_name):
+        """
+        Get annotation task class for given type name, or None if unknown.
         """
-        return AnnotationTaskRegistry._ANNOTATION_TASK_REGISTRY
+        return AnnotationTaskRegistry._ANNOTATION_TASK_REGISTRY.get(type_name)
 
 
 # pylint: disable=C0103,R0903
+class BaseMetadataQuerySet(models.QuerySet):
+    """
+    QuerySet for BaseMetadata models, supporting bulk state changes.
+
+    State changes are applied using a single UPDATE query. They do not
+    call save() and do not send model signals.
+    """
+
+    def _set_boolean_states(self, activated, completed, retired, **kwargs):
+        """
+        Sets boolean states and respective dates for all instances. Other
+        fields can be updated using keyword arguments.
+
+        Returns number of updated rows.
+        """
+        utc_now = datetime.utcnow().replace(tzinfo=utc)
+
+        return self.update(
+          activated=activated,
+          dateActivated=utc_now if activated else None,
+          completed=completed,
+          dateCompleted=utc_now if completed else None,
+          retired=retired,
+          dateRetired=utc_now if retired else None,
+          **kwargs
+        )
+
+    def activate(self, **kwargs):
+        """
+        Sets activated=True for all instances.
+        """
+        return self._set_boolean_states(True, False, False, **kwargs)
+
+    def complete(self, **kwargs):
+        """
+        Sets completed=True for all instances.
+        """
+        return self._set_boolean_states(False, True, False, **kwargs)
+
+    def retire(self, **kwargs):
+        """
+        Sets retired=True for all instances.
+        """
+        return self._set_boolean_states(False, False, True, **kwargs)
+
+
 class BaseMetadata(models.Model):
     """
     Abstract base metadata for all object models.
     """
+    # New instances get a matching ObjectID binding when inserted.
+    BIND_OBJECT_ID = True
+
     dateCreated = models.DateTimeField(
       auto_now_add=True,
       editable=False,
@@ -265,11 +478,28 @@ class BaseMetadata(models.Model):
       editable=False
     )
 
+    objects = BaseMetadataQuerySet.as_manager()
+
     # pylint: disable=C0111
     class Meta:
         abstract = True
         ordering = ['_str_name']
 
+    @classmethod
+    def create_object_ids(cls, instances):
+        """
+        Creates ObjectID bindings for given saved instances, using a single
+        query. Existing bindings are left unchanged.
+        """
+        ObjectID.objects.bulk_create(
+          [
+            ObjectID(typeName=cls.__name__, primaryID=instance.id)
+            for instance in instances
+          ],
+          batch_size=BULK_CREATE_BATCH_SIZE,
+          ignore_conflicts=True,
+        )
+
     def _set_boolean_states(self, activated, completed, retired):
         """
         Sets boolean states for current model instance.
@@ -335,28 +565,18 @@ class BaseMetadata(models.Model):
         For object instances with an ID, we precompute the _str_name
         attribute so that future __str__() lookups are efficient.
 
-        Also, we ensure that a matching ObjectID binding is created.
+        Also, we create a matching ObjectID binding for new instances.
         """
-        if self.id:
-            _new_name = self._generate_str_name()
-            if self._str_name != _new_name:
-                self._str_name = _new_name
+        adding = self._state.adding
 
-            qs = ObjectID.objects.filter(
-              typeName=self.__class__.__name__,
-              primaryID=self.id
-            )
-            if not qs.exists():
-                _serialized = ObjectID.objects.create(
-                  typeName=self.__class__.__name__,
-                  primaryID=self.id
-                )
-                _msg = 'Created serialized ObjectID:{0}'.format(
-                    _serialized.id)
-                LOGGER.info(_msg)
+        if self.id:
+            self._str_name = self._generate_str_name()
 
         super(BaseMetadata, self).save(*args, **kwargs)
 
+        if adding and self.BIND_OBJECT_ID:
+            self.__class__.create_object_ids([self])
+
     # pylint: disable=E1136
     def __str__(self):
         if self._str_name == "":
@@ -366,6 +586,984 @@ class BaseMetadata(models.Model):
         return self._str_name
 
 
+class TaskProgress(models.Model):
+    """
+    Models annotation progress of a user on an annotation task.
+
+    Acts as a cursor so that the next item for a user can be looked up
+    without scanning all results. Cursors are updated whenever results
+    are saved and can be rebuilt using the RebuildTaskProgress command.
+    """
+    user = models.ForeignKey(
+      User,
+      models.CASCADE,
+      verbose_name=_('User')
+    )
+
+    taskType = models.CharField(
+      max_length=MAX_TYPENAME_LENGTH,
+      verbose_name=_('Task type')
+    )
+
+    taskID = models.PositiveIntegerField(
+      verbose_name=_('Task ID')
+    )
+
+    nextItemID = models.PositiveIntegerField(
+      blank=True,
+      null=True,
+      verbose_name=_('Next item ID'),
+      help_text=_('(empty if all items are completed)')
+    )
+
+    nextItemPosition = models.PositiveIntegerField(
+      default=0,
+      verbose_name=_('Next item position'),
+      help_text=_('(0-based)')
+    )
+
+    completedItems = models.PositiveIntegerField(
+      default=0,
+      verbose_name=_('Completed items')
+    )
+
+    completedTargets = models.PositiveIntegerField(
+      default=0,
+      verbose_name=_('Completed target items')
+    )
+
+    completedBlocks = models.PositiveIntegerField(
+      default=0,
+      verbose_name=_('Completed blocks')
+    )
+
+    dateModified = models.DateTimeField(
+      auto_now=True,
+      verbose_name=_('Date modified')
+    )
+
+    # pylint: disable=C0111,R0903
+    class Meta:
+        unique_together = ('user', 'taskType', 'taskID')
+        verbose_name = 'Task progress'
+        verbose_name_plural = 'Task progress'
+
+    @classmethod
+    def prefetch_for_user(cls, user, tasks):
+        """
+        Loads existing progress cursors of user for given annotation tasks
+        using a single query and caches them on the task instances.
+
+        Tasks keep cached cursors for their lifetime, updating them when
+        progress is recomputed. None entries in tasks are skipped.
+        """
+        tasks = [x for x in tasks if x is not None]
+        if not tasks:
+            return
+
+        cursors = cls.objects.filter(
+          user=user,
+          taskType__in=set(x.__class__.__name__ for x in tasks),
+          taskID__in=set(x.id for x in tasks),
+        )
+        cursors = {(x.taskType, x.taskID): x for x in cursors}
+
+        for task in tasks:
+            if not hasattr(task, '_cached_progress'):
+                task._cached_progress = {}
+
+            cursor = cursors.get((task.__class__.__name__, task.id))
+            if cursor is not None:
+                task._cached_progress[user.id] = cursor
+
+    @classmethod
+    def reset_for_user(cls, user_id, campaign_id):
+        """
+        Deletes progress cursors of given user for all annotation tasks in
+        given campaign, so that they are recomputed on next access.
+        """
+        for type_name in AnnotationTaskRegistry.get_types():
+            task_cls = AnnotationTaskRegistry.get_type(type_name)
+            cls.objects.filter(
+              user_id=user_id,
+              taskType=type_name,
+              taskID__in=task_cls.objects.filter(
+                campaign_id=campaign_id
+              ).values('id'),
+            ).delete()
+
+    def __str__(self):
+        return '{0}/{1}[{2}]@{3}'.format(
+          self.user_id,
+          self.taskType,
+          self.taskID,
+          self.nextItemPosition
+        )
+
+
+# pylint: disable=unused-argument
+def _trusted_user_changed(sender, instance, **kwargs):
+    # Trusted users skip non-target items, so cursors depend on the status.
+    TaskProgress.reset_for_user(instance.user_id, instance.campaign_id)
+
+
+def connect_progress_signals():
+    """
+    Connects resetting progress cursors when trusted users change.
+    """
+    # pylint: disable=import-outside-toplevel
+    from Campaign.models import TrustedUser
+    post_save.connect(_trusted_user_changed, sender=TrustedUser)
+    post_delete.connect(_trusted_user_changed, sender=TrustedUser)
+
+
+class _EchoBuffer():
+    """
+    File-like object returning written values, used to stream CSV rows.
+    """
+
+    # pylint: disable=no-self-use
+    def write(self, value):
+        return value
+
+
+class AnnotationResultMixin():
+    """
+    Per-user statistics and CSV export shared by all annotation result
+    models.
+
+    Each statistic is computed by a single aggregate query. Sub classes
+    have to define createdBy, item, task, start_time and end_time fields.
+    """
+
+    # Results are never referenced by ObjectID.
+    BIND_OBJECT_ID = False
+
+    # Columns of the full result dump as (header, field) tuples. Columns
+    # without field are derived from the annotator and start/end times.
+    DUMP_COLUMNS = (
+      ('taskID', 'task__id'),
+      ('systemID', 'item__targetID'),
+      ('username', None),
+      ('email', None),
+      ('groups', None),
+      ('segmentID', 'item__itemID'),
+      ('score', 'score'),
+      ('startTime', 'start_time'),
+      ('endTime', 'end_time'),
+      ('durationInSeconds', None),
+      ('itemType', 'item__itemType'),
+      ('campaignName', 'task__campaign__campaignName'),
+    )
+
+    # Columns of per-market CSV exports as (header, field) tuples. The
+    # first column is only written for allData exports. Columns without
+    # field contain the duration in seconds.
+    CSV_COLUMNS = (
+      ('systemID', 'item__targetID'),
+      ('username', 'createdBy__username'),
+      ('email', 'createdBy__email'),
+      ('segmentID', 'item__itemID'),
+      ('score', 'score'),
+      ('durationInSeconds', None),
+      ('itemType', 'item__itemType'),
+    )
+
+    # Scores aggregated into system score totals as (system field, score
+    # field) tuples. System ids joined by '+' count for each system.
+    SCORE_COLUMNS = (
+      ('item__targetID', 'score'),
+    )
+
+    # Fields which, besides the score fields, affect system score totals.
+    SYSTEM_SCORE_STATE_FIELDS = (
+      'completed', 'retired', 'item_id', 'createdBy_id',
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(AnnotationResultMixin, cls).from_db(
+          db, field_names, values
+        )
+        instance.update_system_score_state()
+        return instance
+
+    def _get_system_score_state(self):
+        attnames = self.SYSTEM_SCORE_STATE_FIELDS + tuple(
+          score_field for _, score_field in self.SCORE_COLUMNS
+        )
+
+        # Deferred fields are not loaded, these count as changed.
+        return tuple(self.__dict__.get(x) for x in attnames)
+
+    def update_system_score_state(self):
+        """
+        Remembers current values of fields affecting system score totals.
+        """
+        self._system_score_state = self._get_system_score_state()
+
+    def system_score_state_changed(self):
+        """
+        Returns True if fields affecting system score totals have changed
+        since the result was loaded or last saved.
+        """
+        return getattr(self, '_system_score_state', None) \
+          != self._get_system_score_state()
+
+    # Results are saved by annotation views only, never when displayed.
+    def __str__(self):
+        return self._str_name or self._generate_str_name()
+
+    @classmethod
+    def get_annotator_data(cls, results):
+        """
+        Returns mapping user id => (username, email, groups) for annotators
+        of given results, using a single query.
+
+        Groups are joined by semicolons, excluding language code groups.
+        """
+        annotator_groups = {}
+        for user_id, username, email, group_name in User.objects.filter(
+          id__in=results.values('createdBy')
+        ).order_by('id', 'groups__id').values_list(
+          'id', 'username', 'email', 'groups__name'
+        ):
+            _, _, groups = annotator_groups.setdefault(
+              user_id, (username, email, [])
+            )
+            if group_name and not group_name in LANGUAGE_CODES_AND_NAMES:
+                groups.append(group_name)
+
+        return {
+          user_id: (username, email, ';'.join(groups) or 'NoGroupInfo')
+          for user_id, (username, email, groups) in annotator_groups.items()
+        }
+
+    @classmethod
+    def iter_results_as_csv_rows(cls, results=None):
+        """
+        Yields CSV header and rows for given results, or all completed
+        results if results is None.
+
+        Rows are grouped by market and domain, then ordered by id.
+        """
+        if results is None:
+            results = cls.objects.filter(completed=True)
+
+        annotators = cls.get_annotator_data(results)
+
+        value_names = [field for _, field in cls.DUMP_COLUMNS if field]
+        for field in ('createdBy', 'start_time', 'end_time'):
+            if not field in value_names:
+                value_names.append(field)
+        value_index = {field: index for index, field in enumerate(value_names)}
+
+        yield [header for header, _ in cls.DUMP_COLUMNS]
+
+        results = results.order_by(
+          'item__metadata__market__sourceLanguageCode',
+          'item__metadata__market__targetLanguageCode',
+          'item__metadata__market__domainName',
+          'id',
+        ).values_list(*value_names)
+
+        for result in results.iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE):
+            username, useremail, usergroups = annotators[
+              result[value_index['createdBy']]
+            ]
+            start_time = result[value_index['start_time']]
+            end_time = result[value_index['end_time']]
+            derived = {
+              'username': username,
+              'email': useremail,
+              'groups': usergroups,
+              'durationInSeconds': round(
+                float(end_time) - float(start_time), 1
+              ),
+            }
+
+            yield [
+              derived[header] if field is None else result[value_index[field]]
+              for header, field in cls.DUMP_COLUMNS
+            ]
+
+    @classmethod
+    def dump_all_results_to_csv_file(cls, csv_file, compress=False):
+        """
+        Writes all completed results to given CSV file in media folder.
+
+        If compress is True, output is gzip-compressed and '.gz' appended
+        to the file name.
+        """
+        from Appraise.settings import BASE_DIR
+        media_file_path = join(BASE_DIR, 'media', csv_file)
+
+        if compress:
+            outfile = gzip.open(
+              media_file_path + '.gz', 'wt', encoding='utf-8', newline=''
+            )
+        else:
+            outfile = open(media_file_path, 'w', encoding='utf-8', newline='')
+
+        with outfile:
+            csv_writer = csv.writer(outfile, lineterminator='\n')
+            csv_writer.writerows(cls.iter_results_as_csv_rows())
+
+    @classmethod
+    def get_results_as_csv_response(cls, filename, results=None):
+        """
+        Returns StreamingHttpResponse with CSV export of given results.
+        """
+        csv_writer = csv.writer(_EchoBuffer(), lineterminator='\n')
+        response = StreamingHttpResponse(
+          (csv_writer.writerow(row)
+            for row in cls.iter_results_as_csv_rows(results)),
+          content_type='text/csv',
+        )
+        response['Content-Disposition'] = \
+          'attachment; filename="{0}"'.format(filename)
+        return response
+
+    @classmethod
+    def iter_csv_rows(cls, srcCode, tgtCode, domain):
+        """
+        Yields CSV_COLUMNS tuples for completed results in given market and
+        domain, ordered by id.
+        """
+        qs = cls.objects.filter(
+          completed=True,
+          item__metadata__market__sourceLanguageCode=srcCode,
+          item__metadata__market__targetLanguageCode=tgtCode,
+          item__metadata__market__domainName=domain,
+        ).order_by('id')
+
+        value_names = [field for _, field in cls.CSV_COLUMNS if field]
+        value_names.extend(('start_time', 'end_time'))
+
+        results = qs.values_list(*value_names)
+        for result in results.iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE):
+            start_time, end_time = result[-2:]
+            duration = round(float(end_time) - float(start_time), 1)
+
+            values = iter(result)
+            yield tuple(
+              duration if field is None else next(values)
+              for _, field in cls.CSV_COLUMNS
+            )
+
+    @classmethod
+    def get_csv(cls, srcCode, tgtCode, domain):
+        """
+        Returns mapping market-domain => list of CSV_COLUMNS tuples for
+        completed results in given market and domain.
+        """
+        system_scores = defaultdict(list)
+        marketID = '{0}-{1}-{2}'.format(srcCode, tgtCode, domain)
+        for row in cls.iter_csv_rows(srcCode, tgtCode, domain):
+            system_scores[marketID].append(row)
+
+        return system_scores
+
+    @classmethod
+    def write_csv(cls, srcCode, tgtCode, domain, csvFile, allData=False):
+        """
+        Writes completed results in given market and domain to given CSV
+        file in media folder. The first column is only written if allData
+        is True.
+        """
+        first = 0 if allData else 1
+
+        from Appraise.settings import BASE_DIR
+        media_file_path = join(BASE_DIR, 'media', csvFile)
+        with open(
+          media_file_path, 'w', encoding='utf-8', newline=''
+        ) as outfile:
+            csv_writer = csv.writer(outfile, lineterminator='\n')
+            csv_writer.writerow(
+              [header for header, _ in cls.CSV_COLUMNS[first:]]
+            )
+            for row in cls.iter_csv_rows(srcCode, tgtCode, domain):
+                csv_writer.writerow(row[first:])
+
+    @classmethod
+    def _completed_results_for_user(cls, user):
+        return cls.objects.filter(
+          createdBy=user,
+          activated=False,
+          completed=True
+        )
+
+    @classmethod
+    def get_completed_for_user(cls, user, unique_only=True):
+        _query = cls._completed_results_for_user(user)
+        if unique_only:
+            _count = Count('item_id', distinct=True)
+        else:
+            _count = Count('id')
+        return _query.aggregate(completed=_count)['completed']
+
+    @classmethod
+    def get_hit_status_for_user(cls, user):
+        # Progress cursors only exist for opened tasks, so results are
+        # always counted per task instead.
+        targets_per_task = cls._completed_results_for_user(user).filter(
+          item__itemType__iexact='tgt'
+        ).order_by().values('task_id').annotate(
+          targets=Count('id')
+        ).values_list('targets', flat=True)
+
+        targets_per_task = list(targets_per_task)
+        total_hits = len(targets_per_task)
+        completed_hits = len([x for x in targets_per_task if x >= 70])
+
+        return (completed_hits, total_hits)
+
+    @classmethod
+    def get_time_for_user(cls, user):
+        duration = cls._completed_results_for_user(user).aggregate(
+          duration=Sum(F('end_time') - F('start_time'))
+        )['duration']
+
+        return seconds_to_timedelta(duration or 0)
+
+    @classmethod
+    def completed_results_for_user_and_campaign(cls, user, campaign):
+        return cls.objects.filter(
+          activated=False,
+          completed=True,
+          createdBy=user,
+          task__campaign=campaign
+        ).aggregate(completed=Count('item_id', distinct=True))['completed']
+
+
+class BaseAnnotationTask(BaseMetadata):
+    """
+    Abstract base class for annotation task models.
+
+    Implements next item resolution shared by all annotation task types.
+    Sub classes have to define campaign and items fields and implement
+    get_result_class().
+    """
+
+    # pylint: disable=C0111,R0903
+    class Meta(BaseMetadata.Meta):
+        abstract = True
+
+    @classmethod
+    def get_result_class(cls):
+        """
+        Returns result class storing annotations for this task type.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def iter_tasks_from_json(cls, batch_user, batch_data, max_count):
+        """
+        Yields (task JSON, new items) tuples for valid tasks in JSON input.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def import_from_json(cls, campaign, batch_user, batch_data, max_count):
+        """
+        Creates new task instances based on JSON input.
+
+        Returns number of created tasks.
+        """
+        return cls.import_tasks(
+          campaign, batch_user, batch_data,
+          cls.iter_tasks_from_json(batch_user, batch_data, max_count),
+        )
+
+    @classmethod
+    @transaction.atomic
+    def import_tasks(cls, campaign, batch_user, batch_data, batch_tasks):
+        """
+        Creates tasks for given iterable of (task JSON, new items) tuples in
+        a single transaction, inserting IMPORT_CHUNK_SIZE tasks at a time.
+
+        Returns number of created tasks.
+        """
+        created_count = 0
+        chunk = []
+        for batch_task in batch_tasks:
+            chunk.append(batch_task)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                created_count += len(cls.bulk_create_tasks(
+                  campaign, batch_user, batch_data, chunk
+                ))
+                chunk = []
+
+        if chunk:
+            created_count += len(cls.bulk_create_tasks(
+              campaign, batch_user, batch_data, chunk
+            ))
+
+        _msg = 'Success processing batch {0}, {1} tasks'.format(
+            str(batch_data), created_count
+        )
+        LOGGER.info(_msg)
+
+        return created_count
+
+    @classmethod
+    def bulk_create_tasks(cls, campaign, batch_user, batch_data, batch_tasks):
+        """
+        Creates tasks for given batch data in a single transaction.
+
+        batch_tasks is a list of (task JSON, new items) tuples. Items, tasks,
+        task-item relations and task ObjectIDs are inserted in bulk.
+        Returns list of new tasks.
+        """
+        batch_meta = batch_data.metadata
+        task_field = cls.items.field.m2m_field_name()
+        item_field = cls.items.field.m2m_reverse_field_name()
+        through_cls = cls.items.through
+
+        new_items = []
+        new_tasks = []
+        for batch_task, items in batch_tasks:
+            for item in items:
+                item.metadata = batch_meta
+                item._str_name = item._generate_str_name()
+            new_items.extend(items)
+
+            new_tasks.append(cls(
+              campaign=campaign,
+              requiredAnnotations=batch_task['requiredAnnotations'],
+              batchNo=batch_task['batchNo'],
+              batchData=batch_data,
+              createdBy=batch_user,
+            ))
+
+        with transaction.atomic():
+            batch_meta.save()
+            if new_items:
+                bulk_create_with_ids(new_items[0].__class__, new_items)
+            bulk_create_with_ids(cls, new_tasks)
+
+            for new_task in new_tasks:
+                new_task._str_name = new_task._generate_str_name()
+            cls.objects.bulk_update(
+              new_tasks, ['_str_name'], batch_size=BULK_CREATE_BATCH_SIZE
+            )
+
+            through_cls.objects.bulk_create(
+              [
+                through_cls(**{
+                  task_field + '_id': new_task.id,
+                  item_field + '_id': item.pk,
+                })
+                for new_task, (_, items) in zip(new_tasks, batch_tasks)
+                for item in items
+              ],
+              batch_size=BULK_CREATE_BATCH_SIZE,
+            )
+
+        # Bulk inserts send no signals to invalidate the cached type.
+        campaign.reset_campaign_type()
+        return new_tasks
+
+    @classmethod
+    def get_free_tasks(cls):
+        """
+        Returns active tasks with fewer assigned users than required
+        annotations.
+        """
+        return cls.objects.filter(
+          activated=True,
+          completed=False,
+        ).annotate(
+          active_users=Count('assignedTo', distinct=True)
+        ).filter(
+          active_users__lt=F('requiredAnnotations')
+        )
+
+    @classmethod
+    def get_free_tasks_for_campaigns(cls, campaign_ids):
+        """
+        Returns free task ids for the given campaigns.
+
+        Returns mapping campaign id => target language code => list of
+        task ids, ordered by id.
+        """
+        free_tasks = cls.get_free_tasks().filter(
+          campaign_id__in=campaign_ids
+        ).values_list('id', flat=True)
+
+        tasks_by_campaign = {}
+        for task_id, campaign_id, code in cls.objects.filter(
+          id__in=free_tasks
+        ).order_by('id').values_list(
+          'id', 'campaign_id', 'items__metadata__market__targetLanguageCode'
+        ).distinct():
+            if code is None:
+                continue
+
+            campaign_tasks = tasks_by_campaign.setdefault(campaign_id, {})
+            campaign_tasks.setdefault(code, []).append(task_id)
+
+        return tasks_by_campaign
+
+    @classmethod
+    def get_free_tasks_for_language(cls, code, campaign=None, user=None):
+        """
+        Returns free tasks for target language code, ordered by id.
+
+        Tasks already assigned to user are excluded.
+        """
+        language_tasks = cls.objects.filter(
+          items__metadata__market__targetLanguageCode=code
+        ).values('id')
+
+        free_tasks = cls.get_free_tasks().filter(id__in=language_tasks)
+
+        if campaign:
+            free_tasks = free_tasks.filter(campaign=campaign)
+
+        if user:
+            free_tasks = free_tasks.exclude(assignedTo=user)
+
+        return free_tasks.order_by('id')
+
+    @classmethod
+    def get_next_free_task_for_language(cls, code, campaign=None, user=None):
+        if campaign and user and cls.is_campaign_limit_reached_for_user(
+          campaign, user
+        ):
+            return None
+
+        return cls.get_free_tasks_for_language(code, campaign, user).first()
+
+    @classmethod
+    def get_next_free_task_for_language_and_campaign(cls, code, campaign):
+        return cls.get_next_free_task_for_language(code, campaign)
+
+    @classmethod
+    def assign_next_free_task_for_language(cls, code, campaign, user):
+        """
+        Claims the next free task for target language code for user.
+
+        Returns the claimed task, or None if no free task is available.
+
+        Candidate tasks are locked using SELECT ... FOR UPDATE SKIP LOCKED
+        so that concurrent requests claim different tasks. On databases
+        without row locks, such as SQLite, the claim is verified after
+        adding the user and rolled back if the task got oversubscribed.
+        """
+        if campaign and cls.is_campaign_limit_reached_for_user(
+          campaign, user
+        ):
+            return None
+
+        skip_locked = connection.features.has_select_for_update_skip_locked
+
+        full_tasks = set()
+        for _unused_attempt in range(MAX_ASSIGNMENT_ATTEMPTS):
+            with transaction.atomic():
+                candidates = cls.get_free_tasks_for_language(
+                  code, campaign, user
+                ).exclude(id__in=full_tasks).values_list('id', flat=True)
+
+                candidate_ids = list(candidates[:ASSIGNMENT_CANDIDATES])
+                if not candidate_ids:
+                    return None
+
+                tasks = cls.objects.filter(id__in=candidate_ids)
+                if skip_locked:
+                    tasks = tasks.select_for_update(skip_locked=True)
+
+                task = tasks.order_by('id').first()
+                if task is None:
+                    continue
+
+                # Assigned users may have changed since candidates were read.
+                if task.assignedTo.count() >= task.requiredAnnotations:
+                    full_tasks.add(task.id)
+                    continue
+
+                task.assignedTo.add(user)
+
+                if not skip_locked:
+                    if task.assignedTo.count() > task.requiredAnnotations:
+                        task.assignedTo.remove(user)
+                        full_tasks.add(task.id)
+                        continue
+
+                return task
+
+        _msg = 'Could not claim free task for code {0}, campaign {1}'.format(
+          code, campaign
+        )
+        LOGGER.warn(_msg)
+        return None
+
+    # pylint: disable=unused-argument
+    @classmethod
+    def is_campaign_limit_reached_for_user(cls, campaign, user):
+        """
+        Checks if user may not be assigned any further tasks in campaign.
+        """
+        return False
+
+    def is_trusted_user(self, user, cached=True):
+        """
+        Checks if user is a trusted user in the campaign of this task.
+
+        Use cached=False for decisions which are stored in the database,
+        e.g., progress cursors, so that these never depend on cached data
+        which another process has not invalidated yet.
+        """
+        from Campaign.models import TrustedUser
+        if not cached:
+            return TrustedUser.objects.filter(
+              user=user, campaign_id=self.campaign_id
+            ).exists()
+
+        return user.id in TrustedUser.get_trusted_user_ids(self.campaign_id)
+
+    def get_market_name(self):
+        """
+        Returns name of the market of the first item, using the cache.
+        """
+        return TASK_MARKET_KEY.get_or_compute(
+          lambda: str(
+            self.items.select_related('metadata__market').first().metadata.market
+          ),
+          self.__class__.__name__, self.id
+        )
+
+    # pylint: disable=no-self-use
+    def is_trusted_item_type(self, item_type):
+        """
+        Checks if items of given type need annotation by trusted users.
+        """
+        return item_type == 'TGT'
+
+    def completed_items_for_user(self, user):
+        return self.get_progress_for_user(user).completedItems
+
+    def get_item_status_for_user(self, user):
+        """
+        Returns (id, itemType, completed) tuples for all items, ordered by id.
+
+        Completion status is resolved by a single correlated EXISTS query
+        instead of one query per item.
+        """
+        completed_results = self.get_result_class().objects.filter(
+          item=OuterRef('pk'),
+          activated=False,
+          completed=True,
+          createdBy=user
+        )
+
+        return list(
+          self.items.annotate(
+            is_completed=Exists(completed_results)
+          ).order_by('id').values_list('id', 'itemType', 'is_completed')
+        )
+
+    # pylint: disable=unused-argument
+    def count_completed_blocks_for_user(self, user, next_item_position):
+        """
+        Returns number of completed blocks of ten items for the given user.
+        """
+        return next_item_position // 10
+
+    def compute_progress_for_user(self, user):
+        """
+        Computes progress cursor values for given user from results.
+        """
+        trusted_user = self.is_trusted_user(user, cached=False)
+
+        next_item_id = None
+        next_item_position = 0
+        completed_items = 0
+        completed_targets = 0
+        for item_id, item_type, is_completed in \
+          self.get_item_status_for_user(user):
+            if is_completed:
+                completed_items += 1
+                if item_type.lower() == 'tgt':
+                    completed_targets += 1
+
+            if next_item_id is not None:
+                continue
+
+            if not is_completed:
+                if not trusted_user or self.is_trusted_item_type(item_type):
+                    next_item_id = item_id
+                    continue
+
+            next_item_position += 1
+
+        return {
+          'nextItemID': next_item_id,
+          'nextItemPosition': next_item_position,
+          'completedItems': completed_items,
+          'completedTargets': completed_targets,
+          'completedBlocks': self.count_completed_blocks_for_user(
+            user, next_item_position
+          ),
+        }
+
+    def update_progress_for_user(self, user):
+        """
+        Recomputes and stores progress cursor for given user.
+
+        Call this inside the same transaction which saves new results.
+        """
+        progress, _ = TaskProgress.objects.update_or_create(
+          user=user,
+          taskType=self.__class__.__name__,
+          taskID=self.id,
+          defaults=self.compute_progress_for_user(user)
+        )
+
+        if hasattr(self, '_cached_progress'):
+            self._cached_progress[user.id] = progress
+
+        return progress
+
+    def get_progress_for_user(self, user):
+        """
+        Returns progress cursor for given user, creating it if needed.
+
+        Cursors prefetched using TaskProgress.prefetch_for_user() are
+        returned without querying the database.
+        """
+        cached = getattr(self, '_cached_progress', {}).get(user.id)
+        if cached is not None:
+            return cached
+
+        try:
+            return TaskProgress.objects.get(
+              user=user,
+              taskType=self.__class__.__name__,
+              taskID=self.id
+            )
+
+        except TaskProgress.DoesNotExist:
+            return self.update_progress_for_user(user)
+
+    def next_item_for_user(self, user, return_completed_items=False):
+        progress = self.get_progress_for_user(user)
+
+        next_item = None
+        if progress.nextItemID is not None:
+            next_item = self.items.model.objects.select_related(
+              'metadata__market'
+            ).filter(pk=progress.nextItemID).first()
+
+            # Stale cursor pointing to a deleted item, rebuild it.
+            if next_item is None:
+                self.update_progress_for_user(user)
+                return self.next_item_for_user(user, return_completed_items)
+
+            LOGGER.info(
+              'Identified next item: {0}/{1}'.format(
+                next_item.id, next_item.itemType
+              )
+            )
+
+        else:
+            trusted_user = self.is_trusted_user(user, cached=False)
+
+            LOGGER.info('No next item found for task {0}'.format(self.id))
+            uniqueAnnotations = self.get_result_class().objects.filter(
+              task=self,
+              activated=False,
+              completed=True
+            ).order_by().values('item_id').distinct().count()
+
+            required_user_results = 100
+            if trusted_user:
+                required_user_results = 70
+
+            _total_required = self.requiredAnnotations * required_user_results
+            LOGGER.info(
+              'Unique annotations={0}/{1}'.format(
+                uniqueAnnotations,
+                _total_required
+              )
+            )
+            if uniqueAnnotations >= _total_required:
+                LOGGER.info('Completing task {0}'.format(self.id))
+                self.complete()
+                self.save()
+
+        if return_completed_items:
+            return (next_item, progress.nextItemPosition)
+
+        return next_item
+
+    def has_next_item_for_user(self, user):
+        """
+        Checks if user has items left to annotate in this task.
+
+        Only the progress cursor is looked up if items are left. Otherwise,
+        the task is completed like in next_item_for_user().
+        """
+        if self.get_progress_for_user(user).nextItemID is not None:
+            return True
+
+        return self.next_item_for_user(user) is not None
+
+    @classmethod
+    def get_task_for_user(cls, user):
+        active_tasks = list(
+          cls.objects.filter(
+            assignedTo=user,
+            activated=True,
+            completed=False
+          ).select_related('campaign').order_by('-id')
+        )
+        TaskProgress.prefetch_for_user(user, active_tasks)
+
+        for active_task in active_tasks:
+            if active_task.has_next_item_for_user(user):
+                return active_task
+
+        return None
+
+
+# pylint: disable=unused-argument,too-many-arguments
+def _task_items_changed(
+  sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        task_keys = [(instance.__class__.__name__, instance.id)]
+
+    # Reverse clear does not report affected tasks, look them up first.
+    elif pk_set is None:
+        task_ids = model.objects.filter(items=instance).values_list(
+          'id', flat=True
+        )
+        task_keys = [(model.__name__, x) for x in task_ids]
+
+    else:
+        task_keys = [(model.__name__, x) for x in pk_set]
+
+    TASK_MARKET_KEY.delete_many(task_keys)
+
+
+def connect_task_cache_signals():
+    """
+    Connects cache invalidation for market names of all registered
+    annotation task types.
+    """
+    for type_name in AnnotationTaskRegistry.get_types():
+        task_cls = AnnotationTaskRegistry.get_type(type_name)
+        invalidate_on_change(
+          task_cls, TASK_MARKET_KEY,
+          lambda x: [(x.__class__.__name__, x.id)],
+        )
+        m2m_changed.connect(_task_items_changed, sender=task_cls.items.through)
+
+
 class Market(BaseMetadata):
     """
     Models a language/locale market.
@@ -392,6 +1590,7 @@ class Market(BaseMetadata):
 
     targetLanguageCode = models.CharField(
       max_length=MAX_LANGUAGECODE_LENGTH,
+      db_index=True,
       verbose_name=_('Target language'),
       help_text=_(f('(max. {value} characters)',
         value=MAX_LANGUAGECODE_LENGTH))
@@ -514,6 +1713,9 @@ class EvalItem(BaseMetadata):
 
     Models corresponding, 1-based, integer ID and metadata.
     """
+    # Items are never referenced by ObjectID.
+    BIND_OBJECT_ID = False
+
     itemID = models.PositiveIntegerField(
       verbose_name=_('Item ID'),
       help_text=_('(1-based)')
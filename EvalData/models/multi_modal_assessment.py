@@ -5,9 +5,6 @@ See LICENSE for usage details
 """
 # pylint: disable=C0103,C0330,no-member
 from collections import defaultdict
-from json import loads
-from zipfile import is_zipfile
-from zipfile import ZipFile
 
 from django.db import models
 from django.contrib.auth.models import User
@@ -18,13 +15,15 @@ from django.utils.translation import ugettext_lazy as _
 # from Appraise.settings import STATIC_URL, BASE_CONTEXT
 from Appraise.utils import _get_logger
 from Dashboard.models import LANGUAGE_CODES_AND_NAMES
+from EvalData.models.base_models import AnnotationResultMixin
 from EvalData.models.base_models import AnnotationTaskRegistry
+from EvalData.models.base_models import BaseAnnotationTask
 from EvalData.models.base_models import BaseMetadata
 from EvalData.models.base_models import EvalItem
 from EvalData.models.base_models import MAX_REQUIREDANNOTATIONS_VALUE
 from EvalData.models.base_models import MAX_SEGMENTID_LENGTH
 from EvalData.models.base_models import MAX_SEGMENTTEXT_LENGTH
-from EvalData.models.base_models import seconds_to_timedelta
+from EvalData.models.base_models import iter_batch_tasks
 
 LOGGER = _get_logger(name=__name__)
 
@@ -90,7 +89,7 @@ class TextPairWithImage(EvalItem):
 
 
 @AnnotationTaskRegistry.register
-class MultiModalAssessmentTask(BaseMetadata):
+class MultiModalAssessmentTask(BaseAnnotationTask):
     """
     Models a multimodal assessment evaluation task.
     """
@@ -142,174 +141,48 @@ class MultiModalAssessmentTask(BaseMetadata):
       verbose_name=_('Batch data')
     )
 
+    @classmethod
+    def get_result_class(cls):
+        return MultiModalAssessmentResult
+
     def dataName(self):
         return str(self.batchData)
 
     def marketName(self):
-        return str(self.items.first().metadata.market)
+        return self.get_market_name()
 
     def marketSourceLanguage(self):
-        tokens = str(self.items.first().metadata.market).split('_')
+        tokens = self.get_market_name().split('_')
         if len(tokens) == 3 and tokens[0] in LANGUAGE_CODES_AND_NAMES.keys():
             return LANGUAGE_CODES_AND_NAMES[tokens[0]]
         return None
 
     def marketSourceLanguageCode(self):
-        tokens = str(self.items.first().metadata.market).split('_')
+        tokens = self.get_market_name().split('_')
         if len(tokens) == 3 and tokens[0] in LANGUAGE_CODES_AND_NAMES.keys():
             return tokens[0]
         return None
 
     def marketTargetLanguage(self):
-        tokens = str(self.items.first().metadata.market).split('_')
+        tokens = self.get_market_name().split('_')
         if len(tokens) == 3 and tokens[1] in LANGUAGE_CODES_AND_NAMES.keys():
             return LANGUAGE_CODES_AND_NAMES[tokens[1]]
         return None
 
     def marketTargetLanguageCode(self):
-        tokens = str(self.items.first().metadata.market).split('_')
+        tokens = self.get_market_name().split('_')
         if len(tokens) == 3 and tokens[1] in LANGUAGE_CODES_AND_NAMES.keys():
             return tokens[1]
         return None
 
-    def completed_items_for_user(self, user):
-        results = MultiModalAssessmentResult.objects.filter(
-          task=self,
-          activated=False,
-          completed=True,
-          createdBy=user
-        ).values_list('item_id', flat=True)
-
-        return len(set(results))
-
-    def is_trusted_user(self, user):
-        from Campaign.models import TrustedUser
-        trusted_user = TrustedUser.objects.filter(\
-          user=user, campaign=self.campaign
-        )
-        return trusted_user.exists()
-
-    def next_item_for_user(self, user, return_completed_items=False):
-        trusted_user = self.is_trusted_user(user)
-
-        next_item = None
-        completed_items = 0
-        for item in self.items.all().order_by('id'):
-            result = MultiModalAssessmentResult.objects.filter(
-              item=item,
-              activated=False,
-              completed=True,
-              createdBy=user
-            )
-
-            if not result.exists():
-                print('identified next item: {0}/{1} for trusted={2}'.format(
-                  item.id, item.itemType, trusted_user
-                ))
-                if not trusted_user or item.itemType == 'TGT':
-                    next_item = item
-                    break
-
-            completed_items += 1
-
-        if not next_item:
-            LOGGER.info('No next item found for task {0}'.format(self.id))
-            annotations = MultiModalAssessmentResult.objects.filter(
-              task=self,
-              activated=False,
-              completed=True
-            ).values_list('item_id', flat=True)
-            uniqueAnnotations = len(set(annotations))
-
-            required_user_results = 100
-            if trusted_user:
-                required_user_results = 70
-
-            _total_required = self.requiredAnnotations * required_user_results
-            LOGGER.info(
-              'Unique annotations={0}/{1}'.format(
-                uniqueAnnotations, _total_required
-              )
-            )
-            if uniqueAnnotations >= _total_required:
-                LOGGER.info('Completing task {0}'.format(self.id))
-                self.complete()
-                self.save()
-
-                # Not sure why I would complete the batch here?
-                # self.batchData.complete()
-                # self.batchData.save()
-
-        if return_completed_items:
-            return (next_item, completed_items)
-
-        return next_item
-
-    @classmethod
-    def get_task_for_user(cls, user):
-        for active_task in cls.objects.filter(
-          assignedTo=user,
-          activated=True,
-          completed=False
-        ).order_by('-id'):
-            next_item = active_task.next_item_for_user(user)
-            if next_item is not None:
-                return active_task
-
-        return None
-
     @classmethod
-    def get_next_free_task_for_language(cls, code, campaign=None, user=None):
-        active_tasks = cls.objects.filter(
-          activated=True,
-          completed=False,
-          items__metadata__market__targetLanguageCode=code
-        )
-
-        if campaign:
-            active_tasks = active_tasks.filter(
-              campaign=campaign
-            )
-
-        for active_task in active_tasks.order_by('id'):
-            active_users = active_task.assignedTo.count()
-            print(active_users, active_task.requiredAnnotations)
-            if active_users < active_task.requiredAnnotations:
-                if user and not user in active_task.assignedTo.all():
-                    return active_task
-
-        return None
-
-    @classmethod
-    def get_next_free_task_for_language_and_campaign(cls, code, campaign):
-        return cls.get_next_free_task_for_language(code, campaign)
-
-    @classmethod
-    def import_from_json(cls, campaign, batch_user, batch_data, max_count):
+    def iter_tasks_from_json(cls, batch_user, batch_data, max_count):
         """
-        Creates new MultiModalAssessmentTask instances based on JSON input.
+        Yields (task JSON, new items) tuples for valid tasks in JSON input.
+        Items are not saved yet, see BaseAnnotationTask.import_tasks().
         """
-        batch_meta = batch_data.metadata
         batch_name = batch_data.dataFile.name
-        batch_file = batch_data.dataFile
-        batch_json = None
-
-        if batch_name.endswith('.zip'):
-            if not is_zipfile(batch_file):
-                _msg = 'Batch {0} not a valid ZIP archive'.format(batch_name)
-                LOGGER.warn(_msg)
-                return
-
-            batch_zip = ZipFile(batch_file)
-            batch_json_files = [
-                x for x in batch_zip.namelist() if x.endswith('.json')]
-            # TODO: implement proper support for multiple json files in archive.
-            for batch_json_file in batch_json_files:
-                batch_content = batch_zip.read(batch_json_file).decode('utf-8')
-                batch_json = loads(batch_content, encoding='utf-8')
-
-        else:
-            batch_json = loads(str(batch_file.read(), encoding="utf-8"))
+        batch_json = iter_batch_tasks(batch_data)
 
         from datetime import datetime
         t1 = datetime.now()
@@ -323,10 +196,7 @@ class MultiModalAssessmentTask(BaseMetadata):
                   max_count
                 )
                 LOGGER.info(_msg)
-
-                t2 = datetime.now()
-                print(t2-t1)
-                return
+                break
 
             print(batch_name, batch_task['task']['batchNo'])
 
@@ -364,32 +234,7 @@ class MultiModalAssessmentTask(BaseMetadata):
                 continue
 
             current_count += 1
-
-
-            #for new_item in new_items:
-            #    new_item.metadata = batch_meta
-            #    new_item.save()
-            batch_meta.textpairwithimage_set.add(*new_items, bulk=False)
-            batch_meta.save()
-
-            new_task = MultiModalAssessmentTask(
-                campaign=campaign,
-                requiredAnnotations=batch_task['task']['requiredAnnotations'],
-                batchNo=batch_task['task']['batchNo'],
-                batchData=batch_data,
-                createdBy=batch_user,
-            )
-            new_task.save()
-
-            #for new_item in new_items:
-            #    new_task.items.add(new_item)
-            new_task.items.add(*new_items)
-            new_task.save()
-
-            _msg = 'Success processing batch {0}, task {1}'.format(
-                str(batch_data), batch_task['task']['batchNo']
-            )
-            LOGGER.info(_msg)
+            yield batch_task['task'], new_items
 
         _msg = 'Max length ID={0}, text={1}'.format(
           max_length_id, max_length_text
@@ -424,7 +269,7 @@ class MultiModalAssessmentTask(BaseMetadata):
           self.items.count()
         )
 
-class MultiModalAssessmentResult(BaseMetadata):
+class MultiModalAssessmentResult(AnnotationResultMixin, BaseMetadata):
     """
     Models a multimodal assessment evaluation result.
     """
@@ -478,51 +323,6 @@ class MultiModalAssessmentResult(BaseMetadata):
     def item_type(self):
         return self.item.itemType
 
-    @classmethod
-    def get_completed_for_user(cls, user, unique_only=True):
-        _query = cls.objects.filter(
-          createdBy=user,
-          activated=False,
-          completed=True
-        )
-        if unique_only:
-            return _query.values_list('item__id').distinct().count()
-        return _query.count()
-
-    @classmethod
-    def get_hit_status_for_user(cls, user):
-        user_data = defaultdict(int)
-
-        for user_item in cls.objects.filter(
-          createdBy=user,
-          activated=False,
-          completed=True
-        ).values_list('task__id', 'item__itemType'):
-            if user_item[1].lower() != 'tgt':
-                continue
-
-            user_data[user_item[0]] += 1
-
-        total_hits = len(user_data.keys())
-        completed_hits = len([x for x in user_data.values() if x >= 70])
-
-        return (completed_hits, total_hits)
-
-    @classmethod
-    def get_time_for_user(cls, user):
-        results = cls.objects.filter(
-          createdBy=user,
-          activated=False,
-          completed=True
-        )
-
-        durations = []
-        for result in results:
-            duration = result.end_time - result.start_time
-            durations.append(duration)
-
-        return seconds_to_timedelta(sum(durations))
-
     @classmethod
     def compute_accurate_group_status(cls):
         from Dashboard.models import LANGUAGE_CODES_AND_NAMES
@@ -557,63 +357,6 @@ class MultiModalAssessmentResult(BaseMetadata):
 
         return group_hits
 
-    @classmethod
-    def dump_all_results_to_csv_file(cls, csv_file):
-        from Dashboard.models import LANGUAGE_CODES_AND_NAMES
-        system_scores = defaultdict(list)
-        user_data = {}
-        qs = cls.objects.filter(completed=True)
-        for result in qs.values_list('item__targetID', 'score', 'start_time', 'end_time', 'createdBy', 'item__itemID', 'item__metadata__market__sourceLanguageCode', 'item__metadata__market__targetLanguageCode', 'item__metadata__market__domainName', 'item__itemType', 'task__id', 'task__campaign__campaignName'):
-
-            systemID = result[0]
-            score = result[1]
-            start_time = result[2]
-            end_time = result[3]
-            duration = round(float(end_time)-float(start_time), 1)
-            annotatorID = result[4]
-            segmentID = result[5]
-            marketID = '{0}-{1}'.format(result[6], result[7])
-            domainName = result[8]
-            itemType = result[9]
-            taskID = result[10]
-            campaignName = result[11]
-
-            if annotatorID in user_data:
-                username = user_data[annotatorID][0]
-                useremail = user_data[annotatorID][1]
-                usergroups = user_data[annotatorID][2]
-
-            else:
-                user = User.objects.get(pk=annotatorID)
-                username = user.username
-                useremail = user.email
-                usergroups = ';'.join([x.name for x in user.groups.all() if not x.name in LANGUAGE_CODES_AND_NAMES.keys()])
-                if not usergroups:
-                    usergroups = 'NoGroupInfo'
-
-                user_data[annotatorID] = (
-                  username, useremail, usergroups
-                )
-
-            system_scores[marketID+'-'+domainName].append(
-                (taskID, systemID, username, useremail, usergroups,
-                segmentID, score, start_time, end_time, duration,
-                itemType, campaignName))
-
-        x = system_scores
-        s = ['taskID,systemID,username,email,groups,segmentID,score,startTime,endTime,durationInSeconds,itemType,campaignName']
-        for l in x:
-            for i in x[l]:
-                s.append(','.join([str(a) for a in i]))
-
-        from os.path import join
-        from Appraise.settings import BASE_DIR
-        media_file_path = join(BASE_DIR, 'media', csv_file)
-        with open(media_file_path, 'w') as outfile:
-            for c in s:
-                outfile.write(c)
-                outfile.write('\n')
-
     @classmethod
     def get_system_annotations(cls):
         system_scores = defaultdict(list)
@@ -674,13 +417,3 @@ class MultiModalAssessmentResult(BaseMetadata):
 
         return output_data
 
-    @classmethod
-    def completed_results_for_user_and_campaign(cls, user, campaign):
-        results = cls.objects.filter(
-          activated=False,
-          completed=True,
-          createdBy=user,
-          task__campaign=campaign
-        ).values_list('item_id', flat=True)
-
-        return len(set(results))
@@ -6,10 +6,7 @@ See LICENSE for usage details
 # pylint: disable=C0103,C0330,no-member
 from collections import defaultdict
 from difflib import SequenceMatcher
-from json import loads
 from traceback import format_exc
-from zipfile import is_zipfile
-from zipfile import ZipFile
 
 from django.db import models
 from django.contrib import messages
@@ -27,6 +24,45 @@ from EvalData.models.base_models import *
 
 LOGGER = _get_logger(name=__name__)
 
+# CSS classes of highlighted token differences per SequenceMatcher opcode.
+DIFF_CLASSES = {
+    'replace': 'diff diff-sub',
+    'insert': 'diff diff-ins',
+    'delete': 'diff diff-del',
+}
+
+
+def compute_target_diffs(text1, text2):
+    """
+    Returns the pair of texts with HTML tags highlighting token differences,
+    or the unchanged texts if any of them is empty.
+
+    Texts are assembled from lists of parts, taking time linear in the
+    number of tokens once the opcodes have been computed.
+    """
+    if not text1 or not text2:
+        return (text1, text2)
+
+    toks1 = text1.split()
+    toks2 = text2.split()
+    matcher = SequenceMatcher(None, toks1, toks2)
+
+    parts1 = []
+    parts2 = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        for parts, toks in ((parts1, toks1[i1:i2]), (parts2, toks2[j1:j2])):
+            if not toks:
+                continue
+
+            if tag == 'equal':
+                parts.append(' '.join(toks))
+            else:
+                parts.append('<span class="{0}">{1}</span>'.format(
+                    DIFF_CLASSES[tag], ' '.join(toks)
+                ))
+
+    return (' '.join(parts1), ' '.join(parts2))
+
 
 class TextSegmentWithTwoTargets(TextSegment):
     """
@@ -70,6 +106,22 @@ class TextSegmentWithTwoTargets(TextSegment):
       verbose_name=_('Context (right)')
     )
 
+    # Target texts with highlighted differences, see compute_target_diffs().
+    # Computed on save; None for items saved before diffs were stored.
+    target1Diff = models.TextField(
+      blank=True,
+      editable=False,
+      null=True,
+      verbose_name=_('Text with differences (1)')
+    )
+
+    target2Diff = models.TextField(
+      blank=True,
+      editable=False,
+      null=True,
+      verbose_name=_('Text with differences (2)')
+    )
+
     def has_context(self):
         """Checks if the current segment has context provided."""
         return self.contextLeft or self.contextRight
@@ -96,6 +148,14 @@ class TextSegmentWithTwoTargets(TextSegment):
             else ''
         )
 
+    def update_target_diffs(self):
+        """
+        Recomputes target texts with differences, without saving them.
+        """
+        self.target1Diff, self.target2Diff = compute_target_diffs(
+            self.target1Text, self.target2Text
+        )
+
     def target_texts_with_diffs(self):
         """
         Returns the pair of texts with HTML tags highlighting token differences.
@@ -106,28 +166,19 @@ class TextSegmentWithTwoTargets(TextSegment):
         will become:
             'a <span class="diff diff-sub">b</span> c <span class="diff diff-del">d</span> e',
             'a <span class="diff diff-sub">B</span> c e <span class="diff diff-ins">f</span>'
+
+        Diffs are stored on save; missing diffs are computed and stored once.
         """
-        if not self.target1Text or not self.target2Text:
-            return (self.target1Text, self.target2Text)
+        if self.target1Diff is None:
+            self.update_target_diffs()
 
-        toks1 = self.target1Text.split()
-        toks2 = self.target2Text.split()
-        matcher = SequenceMatcher(None, toks1, toks2)
+            if self.pk:
+                TextSegmentWithTwoTargets.objects.filter(pk=self.pk).update(
+                    target1Diff=self.target1Diff,
+                    target2Diff=self.target2Diff,
+                )
 
-        text1 = ''
-        text2 = ''
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == 'equal':
-                text1 += ' ' + ' '.join(toks1[i1:i2])
-                text2 += ' ' + ' '.join(toks2[j1:j2])
-            elif tag == 'replace':
-                text1 += ' <span class="diff diff-sub">' + ' '.join(toks1[i1:i2]) + '</span>'
-                text2 += ' <span class="diff diff-sub">' + ' '.join(toks2[j1:j2]) + '</span>'
-            elif tag == 'insert':
-                text2 += ' <span class="diff diff-ins">' + ' '.join(toks2[j1:j2]) + '</span>'
-            elif tag == 'delete':
-                text1 += ' <span class="diff diff-del">' + ' '.join(toks1[i1:i2]) + '</span>'
-        return (text1.strip(), text2.strip())
+        return (self.target1Diff, self.target2Diff)
 
     # pylint: disable=E1101
     def is_valid(self):
@@ -156,9 +207,16 @@ class TextSegmentWithTwoTargets(TextSegment):
 
         return super(TextSegmentWithTwoTargets, self).is_valid()
 
+    def save(self, *args, **kwargs):
+        """
+        Stores target texts with differences for the current texts.
+        """
+        self.update_target_diffs()
+        super(TextSegmentWithTwoTargets, self).save(*args, **kwargs)
+
 
 @AnnotationTaskRegistry.register
-class PairwiseAssessmentTask(BaseMetadata):
+class PairwiseAssessmentTask(BaseAnnotationTask):
     """
     Models a direct assessment evaluation task.
     """
@@ -210,206 +268,51 @@ class PairwiseAssessmentTask(BaseMetadata):
       verbose_name=_('Batch data')
     )
 
+    @classmethod
+    def get_result_class(cls):
+        return PairwiseAssessmentResult
+
     def dataName(self):
         return str(self.batchData)
 
     def marketName(self):
-        return str(self.items.first().metadata.market)
+        return self.get_market_name()
 
     def marketSourceLanguage(self):
-        tokens = str(self.items.first().metadata.market).split('_')
+        tokens = self.get_market_name().split('_')
         if len(tokens) == 3 and tokens[0] in LANGUAGE_CODES_AND_NAMES.keys():
             return LANGUAGE_CODES_AND_NAMES[tokens[0]]
         return None
 
     def marketSourceLanguageCode(self):
-        tokens = str(self.items.first().metadata.market).split('_')
+        tokens = self.get_market_name().split('_')
         if len(tokens) == 3 and tokens[0] in LANGUAGE_CODES_AND_NAMES.keys():
             return tokens[0]
         return None
 
     def marketTargetLanguage(self):
-        tokens = str(self.items.first().metadata.market).split('_')
+        tokens = self.get_market_name().split('_')
         if len(tokens) == 3 and tokens[1] in LANGUAGE_CODES_AND_NAMES.keys():
             return LANGUAGE_CODES_AND_NAMES[tokens[1]]
         return None
 
     def marketTargetLanguageCode(self):
-        tokens = str(self.items.first().metadata.market).split('_')
+        tokens = self.get_market_name().split('_')
         if len(tokens) == 3 and tokens[1] in LANGUAGE_CODES_AND_NAMES.keys():
             return tokens[1]
         return None
 
-    def completed_items_for_user(self, user):
-        results = PairwiseAssessmentResult.objects.filter(
-          task=self,
-          activated=False,
-          completed=True,
-          createdBy=user
-        ).values_list('item_id', flat=True)
-
-        return len(set(results))
-
-    def is_trusted_user(self, user):
-        from Campaign.models import TrustedUser
-        trusted_user = TrustedUser.objects.filter(\
-          user=user, campaign=self.campaign
-        )
-        return trusted_user.exists()
-
-    def next_item_for_user(self, user, return_completed_items=False):
-        trusted_user = self.is_trusted_user(user)
-
-        next_item = None
-        completed_items = 0
-        for item in self.items.all().order_by('id'):
-            result = PairwiseAssessmentResult.objects.filter(
-              item=item,
-              activated=False,
-              completed=True,
-              createdBy=user
-            )
-
-            if not result.exists():
-                print('identified next item: {0}/{1} for trusted={2}'.format(
-                  item.id, item.itemType, trusted_user
-                ))
-                if not trusted_user or item.itemType.startswith('TGT'):
-                    next_item = item
-                    print('  - got it')
-                    break
-
-            completed_items += 1
-
-        if not next_item:
-            LOGGER.info('No next item found for task {0}'.format(self.id))
-            annotations = PairwiseAssessmentResult.objects.filter(
-              task=self,
-              activated=False,
-              completed=True
-            ).values_list('item_id', flat=True)
-            uniqueAnnotations = len(set(annotations))
-
-            required_user_results = 100
-            if trusted_user:
-                required_user_results = 70
-
-            _total_required = self.requiredAnnotations * required_user_results
-            LOGGER.info(
-              'Unique annotations={0}/{1}'.format(
-                uniqueAnnotations,
-                _total_required
-              )
-            )
-            if uniqueAnnotations >= _total_required:
-                LOGGER.info('Completing task {0}'.format(self.id))
-                self.complete()
-                self.save()
-
-                # Not sure why I would complete the batch here?
-                # self.batchData.complete()
-                # self.batchData.save()
-
-        if return_completed_items:
-            return (next_item, completed_items)
-
-        return next_item
+    def is_trusted_item_type(self, item_type):
+        return item_type.startswith('TGT')
 
     @classmethod
-    def get_task_for_user(cls, user):
-        for active_task in cls.objects.filter(
-          assignedTo=user,
-          activated=True,
-          completed=False
-        ).order_by('-id'):
-            next_item = active_task.next_item_for_user(user)
-            if next_item is not None:
-                return active_task
-
-        return None
-
-    @classmethod
-    def get_next_free_task_for_language(cls, code, campaign=None, user=None):
-        print('  Looking for next free task for language: {0}'.format(code))
-        print('  Campaign: {0}'.format(campaign))
-        print('  User: {0}'.format(user))
-
-        active_tasks = cls.objects.filter(
-          activated=True,
-          completed=False,
-          items__metadata__market__targetLanguageCode=code
-        )
-
-        print('    Number of active tasks: ({0})'.format(len(active_tasks)))
-
-        if campaign:
-            active_tasks = active_tasks.filter(
-              campaign=campaign
-            )
-
-        for active_task in active_tasks.order_by('id'):
-            active_users = active_task.assignedTo.count()
-            if active_users < active_task.requiredAnnotations:
-                if user and not user in active_task.assignedTo.all():
-                    return active_task
-
-        print('    No next free task available')
-        return None
-
-        # It seems that assignedTo is converted to an integer count.
-        active_tasks = active_tasks.order_by('id') \
-         .values_list('id', 'requiredAnnotations', 'assignedTo')
-
-        for active_task in active_tasks:
-            print(active_task)
-            active_users = active_task[2] or 0
-            if active_users < active_task[1]:
-                return cls.objects.get(pk=active_task[0])
-
-        return None
-
-        # TODO: this needs to be removed.
-        for active_task in active_tasks:
-            market = active_task.items.first().metadata.market
-            if not market.targetLanguageCode == code:
-                continue
-
-            active_users = active_task.assignedTo.count()
-            if active_users < active_task.requiredAnnotations:
-                return active_task
-
-        return None
-
-    @classmethod
-    def get_next_free_task_for_language_and_campaign(cls, code, campaign):
-        return cls.get_next_free_task_for_language(code, campaign)
-
-    @classmethod
-    def import_from_json(cls, campaign, batch_user, batch_data, max_count):
+    def iter_tasks_from_json(cls, batch_user, batch_data, max_count):
         """
-        Creates new PairwiseAssessmentTask instances based on JSON input.
+        Yields (task JSON, new items) tuples for valid tasks in JSON input.
+        Items are not saved yet, see BaseAnnotationTask.import_tasks().
         """
-        batch_meta = batch_data.metadata
         batch_name = batch_data.dataFile.name
-        batch_file = batch_data.dataFile
-        batch_json = None
-
-        if batch_name.endswith('.zip'):
-            if not is_zipfile(batch_file):
-                _msg = 'Batch {0} not a valid ZIP archive'.format(batch_name)
-                LOGGER.warn(_msg)
-                return
-
-            batch_zip = ZipFile(batch_file)
-            batch_json_files = [
-                x for x in batch_zip.namelist() if x.endswith('.json')]
-            # TODO: implement proper support for multiple json files in archive.
-            for batch_json_file in batch_json_files:
-                batch_content = batch_zip.read(batch_json_file).decode('utf-8')
-                batch_json = loads(batch_content, encoding='utf-8')
-
-        else:
-            batch_json = loads(str(batch_file.read(), encoding="utf-8"))
+        batch_json = iter_batch_tasks(batch_data)
 
         from datetime import datetime
         t1 = datetime.now()
@@ -423,10 +326,7 @@ class PairwiseAssessmentTask(BaseMetadata):
                   max_count
                 )
                 LOGGER.info(_msg)
-
-                t2 = datetime.now()
-                print(t2-t1)
-                return
+                break
 
             print('Loading batch:', batch_name, batch_task['task']['batchNo'])
 
@@ -486,32 +386,7 @@ class PairwiseAssessmentTask(BaseMetadata):
                 continue
 
             current_count += 1
-
-
-            #for new_item in new_items:
-            #    new_item.metadata = batch_meta
-            #    new_item.save()
-            batch_meta.textsegment_set.add(*new_items, bulk=False)
-            batch_meta.save()
-
-            new_task = PairwiseAssessmentTask(
-                campaign=campaign,
-                requiredAnnotations=batch_task['task']['requiredAnnotations'],
-                batchNo=batch_task['task']['batchNo'],
-                batchData=batch_data,
-                createdBy=batch_user,
-            )
-            new_task.save()
-
-            #for new_item in new_items:
-            #    new_task.items.add(new_item)
-            new_task.items.add(*new_items)
-            new_task.save()
-
-            _msg = 'Success processing batch {0}, task {1}'.format(
-                str(batch_data), batch_task['task']['batchNo']
-            )
-            LOGGER.info(_msg)
+            yield batch_task['task'], new_items
 
         _msg = 'Max length ID={0}, text={1}'.format(
           max_length_id, max_length_text
@@ -546,7 +421,7 @@ class PairwiseAssessmentTask(BaseMetadata):
         )
 
 
-class PairwiseAssessmentResult(BaseMetadata):
+class PairwiseAssessmentResult(AnnotationResultMixin, BaseMetadata):
     """
     Models a contrastive direct assessment evaluation result.
     """
@@ -592,6 +467,40 @@ class PairwiseAssessmentResult(BaseMetadata):
       verbose_name=_('Task')
     )
 
+    DUMP_COLUMNS = (
+      ('taskID', 'task__id'),
+      ('segmentID', 'item__itemID'),
+      ('username', None),
+      ('email', None),
+      ('groups', None),
+      ('system1ID', 'item__target1ID'),
+      ('score1', 'score1'),
+      ('system2ID', 'item__target2ID'),
+      ('score2', 'score2'),
+      ('startTime', 'start_time'),
+      ('endTime', 'end_time'),
+      ('durationInSeconds', None),
+      ('itemType', 'item__itemType'),
+      ('campaignName', 'task__campaign__campaignName'),
+    )
+
+    CSV_COLUMNS = (
+      ('segmentID', 'item__itemID'),
+      ('username', 'createdBy__username'),
+      ('email', 'createdBy__email'),
+      ('system1ID', 'item__target1ID'),
+      ('score1', 'score1'),
+      ('system2ID', 'item__target2ID'),
+      ('score2', 'score2'),
+      ('durationInSeconds', None),
+      ('itemType', 'item__itemType'),
+    )
+
+    SCORE_COLUMNS = (
+      ('item__target1ID', 'score1'),
+      ('item__target2ID', 'score2'),
+    )
+
     # pylint: disable=E1136
     def _generate_str_name(self):
         return '{0}.{1}={2}+{3}'.format(
@@ -608,51 +517,6 @@ class PairwiseAssessmentResult(BaseMetadata):
     def item_type(self):
         return self.item.itemType
 
-    @classmethod
-    def get_completed_for_user(cls, user, unique_only=True):
-        _query = cls.objects.filter(
-          createdBy=user,
-          activated=False,
-          completed=True
-        )
-        if unique_only:
-            return _query.values_list('item__id').distinct().count()
-        return _query.count()
-
-    @classmethod
-    def get_hit_status_for_user(cls, user):
-        user_data = defaultdict(int)
-
-        for user_item in cls.objects.filter(
-          createdBy=user,
-          activated=False,
-          completed=True
-        ).values_list('task__id', 'item__itemType'):
-            if user_item[1].lower() != 'tgt':
-                continue
-
-            user_data[user_item[0]] += 1
-
-        total_hits = len(user_data.keys())
-        completed_hits = len([x for x in user_data.values() if x >= 70])
-
-        return (completed_hits, total_hits)
-
-    @classmethod
-    def get_time_for_user(cls, user):
-        results = cls.objects.filter(
-          createdBy=user,
-          activated=False,
-          completed=True
-        )
-
-        durations = []
-        for result in results:
-            duration = result.end_time - result.start_time
-            durations.append(duration)
-
-        return seconds_to_timedelta(sum(durations))
-
     @classmethod
     def get_system_annotations(cls):
         system_scores = defaultdict(list)
@@ -718,141 +582,6 @@ class PairwiseAssessmentResult(BaseMetadata):
         return group_hits
 
 
-    @classmethod
-    def dump_all_results_to_csv_file(cls, csv_file):
-        from Dashboard.models import LANGUAGE_CODES_AND_NAMES
-        system_scores = defaultdict(list)
-        user_data = {}
-        qs = cls.objects.filter(completed=True)
-
-        value_names = (
-            'item__target1ID', 'score1', 'item__target2ID', 'score2',
-            'start_time', 'end_time',
-            'createdBy',
-            'item__itemID',
-            'item__metadata__market__sourceLanguageCode',
-            'item__metadata__market__targetLanguageCode',
-            'item__metadata__market__domainName',
-            'item__itemType',
-            'task__id', 'task__campaign__campaignName'
-        )
-        for result in qs.values_list(*value_names):
-
-            system1ID = result[0]
-            score1 = result[1]
-            system2ID = result[2]
-            score2 = result[3]
-            start_time = result[4]
-            end_time = result[5]
-            duration = round(float(end_time)-float(start_time), 1)
-            annotatorID = result[6]
-            segmentID = result[7]
-            marketID = '{0}-{1}'.format(result[8], result[9])
-            domainName = result[10]
-            itemType = result[11]
-            taskID = result[12]
-            campaignName = result[13]
-
-            if annotatorID in user_data:
-                username = user_data[annotatorID][0]
-                useremail = user_data[annotatorID][1]
-                usergroups = user_data[annotatorID][2]
-
-            else:
-                user = User.objects.get(pk=annotatorID)
-                username = user.username
-                useremail = user.email
-                usergroups = ';'.join([x.name for x in user.groups.all() if not x.name in LANGUAGE_CODES_AND_NAMES.keys()])
-                if not usergroups:
-                    usergroups = 'NoGroupInfo'
-
-                user_data[annotatorID] = (
-                  username, useremail, usergroups
-                )
-
-            system_scores[marketID+'-'+domainName].append(
-                (taskID, segmentID, username, useremail, usergroups,
-                system1ID, score1, system2ID, score2, start_time, end_time, duration,
-                itemType, campaignName))
-
-        # TODO: this is very intransparent... and needs to be fixed!
-        x = system_scores
-        s = ['taskID,segmentID,username,email,groups,system1ID,score1,system2ID,score2,startTime,endTime,durationInSeconds,itemType,campaignName']
-        for l in x:
-            for i in x[l]:
-                s.append(','.join([str(a) for a in i]))
-
-        from os.path import join
-        from Appraise.settings import BASE_DIR
-        media_file_path = join(BASE_DIR, 'media', csv_file)
-        with open(media_file_path, 'w') as outfile:
-            for c in s:
-                outfile.write(c)
-                outfile.write('\n')
-
-    @classmethod
-    def get_csv(cls, srcCode, tgtCode, domain):
-        system_scores = defaultdict(list)
-        qs = cls.objects.filter(completed=True)
-
-        value_names = (
-            'item__target1ID', 'score1', 'item__target2ID', 'score2',
-            'start_time', 'end_time',
-            'createdBy',
-            'item__itemID',
-            'item__metadata__market__sourceLanguageCode',
-            'item__metadata__market__targetLanguageCode',
-            'item__metadata__market__domainName', 'item__itemType'
-        )
-
-        for result in qs.values_list(*value_names):
-            if not domain == result[10] \
-            or not srcCode == result[8] \
-            or not tgtCode == result[9]:
-                continue
-
-            system1ID = result[0]
-            score1 = result[1]
-            system2ID = result[2]
-            score2 = result[3]
-            start_time = result[4]
-            end_time = result[5]
-            duration = round(float(end_time)-float(start_time), 1)
-            annotatorID = result[6]
-            segmentID = result[7]
-            marketID = '{0}-{1}'.format(result[8], result[9])
-            domainName = result[10]
-            itemType = result[11]
-            user = User.objects.get(pk=annotatorID)
-            username = user.username
-            useremail = user.email
-            system_scores[marketID+'-'+domainName].append(
-                (segmentID, username, useremail, system1ID, score1,
-                system2ID, score2,
-                duration, itemType))
-
-        return system_scores
-
-    @classmethod
-    def write_csv(cls, srcCode, tgtCode, domain, csvFile, allData=False):
-        x = cls.get_csv(srcCode, tgtCode, domain)
-        s = ['username,email,segmentID,score1,score2,durationInSeconds,itemType']
-        if allData:
-            s[0] = 'systemID,' + s[0]
-
-        for l in x:
-            for i in x[l]:
-                e = i[1:] if not allData else i
-                s.append(','.join([str(a) for a in e]))
-
-        from os.path import join
-        from Appraise.settings import BASE_DIR
-        media_file_path = join(BASE_DIR, 'media', csvFile)
-        with open(media_file_path, 'w') as outfile:
-            for c in s:
-                outfile.write(c)
-                outfile.write('\n')
-
     @classmethod
     def get_system_scores(cls, campaign_id):
         system_scores = defaultdict(list)
@@ -996,13 +725,3 @@ class PairwiseAssessmentResult(BaseMetadata):
         return output_data
 
 
-    @classmethod
-    def completed_results_for_user_and_campaign(cls, user, campaign):
-        results = cls.objects.filter(
-          activated=False,
-          completed=True,
-          createdBy=user,
-          task__campaign=campaign
-        ).values_list('item_id', flat=True)
-
-        return len(set(results))
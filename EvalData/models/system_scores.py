@@ -0,0 +1,391 @@
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+# pylint: disable=C0103,C0330,no-member
+from collections import defaultdict
+from math import sqrt
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import ugettext_lazy as _
+
+from EvalData.models.base_models import AnnotationTaskRegistry
+from EvalData.models.base_models import BULK_CREATE_BATCH_SIZE
+from EvalData.models.base_models import MAX_LANGUAGECODE_LENGTH
+from EvalData.models.base_models import MAX_SEGMENTID_LENGTH
+from EvalData.models.base_models import MAX_TYPENAME_LENGTH
+from EvalData.models.base_models import Metadata
+
+# Only scores for these item types contribute to system scores.
+SYSTEM_SCORE_ITEM_TYPES = ('TGT', 'CHK')
+
+# Fields identifying a single aggregate row, in order of the key tuples
+# returned by SystemScoreAggregate.compute_totals().
+SYSTEM_SCORE_KEY_FIELDS = (
+  'campaign_id',
+  'resultType',
+  'sourceLanguageCode',
+  'targetLanguageCode',
+  'systemID',
+  'user_id',
+)
+
+
+class SystemScoreAggregate(models.Model):
+    """
+    Models score totals per campaign, language pair, system and annotator.
+
+    Stores count, sum and sum of squares of completed scores so that raw
+    means, per annotator standardization and z-score system rankings can
+    be computed without scanning results. Totals are updated whenever
+    results are saved or deleted and can be rebuilt using the
+    RebuildSystemScores command.
+    """
+    campaign = models.ForeignKey(
+      'Campaign.Campaign',
+      models.CASCADE,
+      verbose_name=_('Campaign')
+    )
+
+    resultType = models.CharField(
+      max_length=MAX_TYPENAME_LENGTH,
+      verbose_name=_('Result type')
+    )
+
+    sourceLanguageCode = models.CharField(
+      max_length=MAX_LANGUAGECODE_LENGTH,
+      verbose_name=_('Source language')
+    )
+
+    targetLanguageCode = models.CharField(
+      max_length=MAX_LANGUAGECODE_LENGTH,
+      verbose_name=_('Target language')
+    )
+
+    systemID = models.CharField(
+      max_length=MAX_SEGMENTID_LENGTH,
+      verbose_name=_('System ID')
+    )
+
+    user = models.ForeignKey(
+      User,
+      models.CASCADE,
+      verbose_name=_('User')
+    )
+
+    count = models.PositiveIntegerField(
+      default=0,
+      verbose_name=_('Score count')
+    )
+
+    scoreSum = models.FloatField(
+      default=0,
+      verbose_name=_('Score sum')
+    )
+
+    scoreSquaresSum = models.FloatField(
+      default=0,
+      verbose_name=_('Score squares sum')
+    )
+
+    # pylint: disable=C0111,R0903
+    class Meta:
+        unique_together = (
+          'campaign',
+          'resultType',
+          'sourceLanguageCode',
+          'targetLanguageCode',
+          'systemID',
+          'user',
+        )
+        verbose_name = 'System score aggregate'
+        verbose_name_plural = 'System score aggregates'
+
+    def __str__(self):
+        return '{0}-{1} {2} ({3})'.format(
+          self.sourceLanguageCode, self.targetLanguageCode,
+          self.systemID, self.user_id
+        )
+
+    @classmethod
+    def compute_totals(cls, result_cls, results):
+        """
+        Returns mapping key => [count, scoreSum, scoreSquaresSum] for the
+        completed results in given queryset of result_cls.
+
+        Keys are tuples ordered as SYSTEM_SCORE_KEY_FIELDS. Totals are
+        grouped in the database, then expanded for multi system ids.
+        """
+        results = results.filter(
+          completed=True, item__itemType__in=SYSTEM_SCORE_ITEM_TYPES
+        ).order_by()
+
+        totals = defaultdict(lambda: [0, 0.0, 0.0])
+        for system_field, score_field in result_cls.SCORE_COLUMNS:
+            for campaign_id, source_code, target_code, system_ids, \
+              user_id, count, score_sum, squares_sum in results.values_list(
+                'task__campaign_id',
+                'item__metadata__market__sourceLanguageCode',
+                'item__metadata__market__targetLanguageCode',
+                system_field,
+                'createdBy_id',
+              ).annotate(
+                score_count=Count('id'),
+                score_sum=Sum(score_field),
+                squares_sum=Sum(F(score_field) * F(score_field)),
+              ):
+                if campaign_id is None or not system_ids:
+                    continue
+
+                for system_id in system_ids.split('+'):
+                    key = (
+                      campaign_id, result_cls.__name__, source_code,
+                      target_code, system_id, user_id,
+                    )
+                    total = totals[key]
+                    total[0] += count
+                    total[1] += score_sum or 0
+                    total[2] += squares_sum or 0
+
+        return totals
+
+    @classmethod
+    def add_results(cls, result_cls, results):
+        """
+        Adds completed results in given queryset of result_cls to totals.
+
+        Existing rows are incremented using a single UPDATE query each.
+        """
+        cls._add_totals(cls.compute_totals(result_cls, results))
+
+    @classmethod
+    def add_result_instances(cls, result_cls, results):
+        """
+        Adds completed results in given list of result_cls instances to
+        totals.
+
+        Totals are computed from the instances, so that results inserted
+        in bulk do not have to be looked up again. This only queries the
+        language codes of the result items.
+        """
+        results = [
+          x for x in results
+          if x.completed and x.item.itemType in SYSTEM_SCORE_ITEM_TYPES
+        ]
+
+        languages = {
+          metadata_id: (source_code, target_code)
+          for metadata_id, source_code, target_code
+          in Metadata.objects.filter(
+            id__in=set(x.item.metadata_id for x in results)
+          ).values_list(
+            'id',
+            'market__sourceLanguageCode',
+            'market__targetLanguageCode',
+          )
+        }
+
+        totals = defaultdict(lambda: [0, 0.0, 0.0])
+        for result in results:
+            campaign_id = result.task.campaign_id
+            source_code, target_code = languages[result.item.metadata_id]
+
+            for system_field, score_field in result_cls.SCORE_COLUMNS:
+                system_ids = result
+                for name in system_field.split('__'):
+                    system_ids = getattr(system_ids, name)
+
+                if campaign_id is None or not system_ids:
+                    continue
+
+                # Submitted scores may not have been converted yet.
+                score = float(getattr(result, score_field) or 0)
+                for system_id in system_ids.split('+'):
+                    key = (
+                      campaign_id, result_cls.__name__, source_code,
+                      target_code, system_id, result.createdBy_id,
+                    )
+                    total = totals[key]
+                    total[0] += 1
+                    total[1] += score
+                    total[2] += score * score
+
+        cls._add_totals(totals)
+
+    @classmethod
+    def _add_totals(cls, totals):
+        for key, (count, score_sum, squares_sum) in totals.items():
+            lookup = dict(zip(SYSTEM_SCORE_KEY_FIELDS, key))
+            if cls._increment(lookup, count, score_sum, squares_sum):
+                continue
+
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                      count=count,
+                      scoreSum=score_sum,
+                      scoreSquaresSum=squares_sum,
+                      **lookup
+                    )
+
+            # Concurrent request has created the row in the meantime.
+            except IntegrityError:
+                cls._increment(lookup, count, score_sum, squares_sum)
+
+    @classmethod
+    def _increment(cls, lookup, count, score_sum, squares_sum):
+        return cls.objects.filter(**lookup).update(
+          count=F('count') + count,
+          scoreSum=F('scoreSum') + score_sum,
+          scoreSquaresSum=F('scoreSquaresSum') + squares_sum,
+        )
+
+    @classmethod
+    def rebuild(cls, result_cls, campaign_ids=None, user_ids=None):
+        """
+        Recomputes totals of result_cls for given campaigns and users, or
+        all campaigns or users if None.
+
+        Returns number of created rows.
+        """
+        stale = cls.objects.filter(resultType=result_cls.__name__)
+        results = result_cls.objects.all()
+
+        if campaign_ids is not None:
+            stale = stale.filter(campaign_id__in=campaign_ids)
+            results = results.filter(task__campaign_id__in=campaign_ids)
+
+        if user_ids is not None:
+            stale = stale.filter(user_id__in=user_ids)
+            results = results.filter(createdBy_id__in=user_ids)
+
+        totals = cls.compute_totals(result_cls, results)
+        with transaction.atomic():
+            stale.delete()
+            cls.objects.bulk_create(
+              [
+                cls(
+                  count=count,
+                  scoreSum=score_sum,
+                  scoreSquaresSum=squares_sum,
+                  **dict(zip(SYSTEM_SCORE_KEY_FIELDS, key))
+                )
+                for key, (count, score_sum, squares_sum) in totals.items()
+              ],
+              batch_size=BULK_CREATE_BATCH_SIZE,
+            )
+
+        return len(totals)
+
+    @classmethod
+    def get_system_scores(cls, campaign, include_inactive=False):
+        """
+        Returns mapping (sourceLanguageCode, targetLanguageCode) => list of
+        (systemID, count, raw score, z score) tuples, ranked by z score.
+
+        Scores are standardized using mean and sample standard deviation
+        of each annotator per language pair, matching ComputeZScores.
+        Averages are taken over all scores, not per segment.
+        """
+        aggregates = cls.objects.filter(campaign=campaign)
+        if not include_inactive:
+            aggregates = aggregates.filter(user__is_active=True)
+
+        rows = list(aggregates.values_list(
+          'sourceLanguageCode', 'targetLanguageCode', 'systemID',
+          'user_id', 'count', 'scoreSum', 'scoreSquaresSum',
+        ))
+
+        user_totals = defaultdict(lambda: [0, 0.0, 0.0])
+        for source_code, target_code, _, user_id, count, score_sum, \
+          squares_sum in rows:
+            total = user_totals[(source_code, target_code, user_id)]
+            total[0] += count
+            total[1] += score_sum
+            total[2] += squares_sum
+
+        user_stats = {}
+        for key, (count, score_sum, squares_sum) in user_totals.items():
+            mean = score_sum / float(count or 1)
+            variance = (squares_sum - score_sum * mean) / float(
+              (count - 1) or 1
+            )
+            user_stats[key] = (mean, sqrt(max(variance, 0)) or 1)
+
+        system_totals = defaultdict(lambda: [0, 0.0, 0.0])
+        for source_code, target_code, system_id, user_id, count, \
+          score_sum, _ in rows:
+            mean, deviation = user_stats[(source_code, target_code, user_id)]
+            total = system_totals[(source_code, target_code, system_id)]
+            total[0] += count
+            total[1] += score_sum
+            total[2] += (score_sum - count * mean) / deviation
+
+        system_scores = defaultdict(list)
+        for (source_code, target_code, system_id), \
+          (count, score_sum, z_sum) in system_totals.items():
+            system_scores[(source_code, target_code)].append((
+              system_id, count,
+              score_sum / float(count or 1),
+              z_sum / float(count or 1),
+            ))
+
+        for scores in system_scores.values():
+            scores.sort(key=lambda x: (-x[3], -x[2], x[0]))
+
+        return system_scores
+
+
+# pylint: disable=unused-argument
+def _result_saved(sender, instance, created, **kwargs):
+    if instance.task_id is None:
+        return
+
+    # New results are added incrementally; changes to existing results,
+    # e.g., retiring them, require recomputing the annotator's totals.
+    # Saves which do not change scores or states leave totals unchanged.
+    if created:
+        if instance.completed:
+            SystemScoreAggregate.add_results(
+              sender, sender.objects.filter(pk=instance.pk)
+            )
+
+    elif instance.system_score_state_changed():
+        SystemScoreAggregate.rebuild(
+          sender,
+          campaign_ids=[instance.task.campaign_id],
+          user_ids=[instance.createdBy_id],
+        )
+
+    instance.update_system_score_state()
+
+
+# pylint: disable=unused-argument
+def _result_deleted(sender, instance, **kwargs):
+    if instance.task_id is None:
+        return
+
+    SystemScoreAggregate.rebuild(
+      sender,
+      campaign_ids=[instance.task.campaign_id],
+      user_ids=[instance.createdBy_id],
+    )
+
+
+def connect_system_score_signals():
+    """
+    Connects system score updates to all registered annotation task types.
+
+    Bulk updates do not send model signals and have to call
+    SystemScoreAggregate.rebuild() for affected users instead.
+    """
+    for type_name in AnnotationTaskRegistry.get_types():
+        task_cls = AnnotationTaskRegistry.get_type(type_name)
+        result_cls = task_cls.get_result_class()
+
+        post_save.connect(_result_saved, sender=result_cls)
+        post_delete.connect(_result_deleted, sender=result_cls)
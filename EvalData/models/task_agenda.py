@@ -7,7 +7,7 @@ See LICENSE for usage details
 from inspect import currentframe, getframeinfo
 from re import compile as re_compile
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib import messages
 from django.contrib.auth.models import User
 from django.utils.translation import ugettext_lazy as _
@@ -15,12 +15,14 @@ from django.utils.translation import ugettext_lazy as _
 # TODO: Unclear if these are needed?
 # from Appraise.settings import STATIC_URL, BASE_CONTEXT
 from EvalData.models.base_models import ObjectID
+from EvalData.models.base_models import TaskProgress
 from EvalData.models.direct_assessment import DirectAssessmentResult
 from EvalData.models.direct_assessment import DirectAssessmentTask
 from EvalData.models.direct_assessment_context import DirectAssessmentContextResult
 from EvalData.models.direct_assessment_document import DirectAssessmentDocumentResult
 from EvalData.models.multi_modal_assessment import MultiModalAssessmentResult
 from EvalData.models.pairwise_assessment import PairwiseAssessmentResult
+from EvalData.models.system_scores import SystemScoreAggregate
 
 from deprecated import add_deprecated_method
 
@@ -63,13 +65,15 @@ class TaskAgenda(models.Model):
         return self._open_tasks.count() == 0
 
     def open_tasks(self):
-        return (x.get_object_instance() for x in self._open_tasks.all())
+        return iter(ObjectID.get_object_instances(self._open_tasks.all()))
 
     def serialized_open_tasks(self):
         return list(self._open_tasks.all())
 
     def completed_tasks(self):
-        return (x.get_object_instance() for x in self._completed_tasks.all())
+        return iter(
+          ObjectID.get_object_instances(self._completed_tasks.all())
+        )
 
     def activate_task(self, task):
         return self.activate_completed_task(task, only_completed=False)
@@ -201,19 +205,29 @@ class TaskAgenda(models.Model):
         # This user will be inactive and won't allow authentication as we
         # do not set a password. The account is purely for archival use.
         _name = '{0}-{1:02x}'.format(self.user.username, _shadow_copies + 1)
-        _shadow_copy = User.objects.create_user(_name)
-        _shadow_copy.is_active = False
-        _shadow_copy.save()
+        with transaction.atomic():
+            _shadow_copy = User.objects.create_user(_name)
+            _shadow_copy.is_active = False
+            _shadow_copy.save()
+
+            # Moves and retires all annotations using a single UPDATE query.
+            annotated_output_for_user.retire(
+                createdBy=_shadow_copy, modifiedBy=_shadow_copy
+            )
 
-        for annotation_result in annotated_output_for_user:
-            annotation_result.createdBy = _shadow_copy
-            annotation_result.modifiedBy = _shadow_copy
-            annotation_result.retire() # Implictly calls save()
+            # Bulk updates do not send signals, so system score totals for
+            # the campaign annotator are recomputed explicitly.
+            SystemScoreAggregate.rebuild(
+                result_class, user_ids=[self.user.id, _shadow_copy.id]
+            )
 
-        # pylint: disable=protected-access
-        for task in self._completed_tasks.all():
-            self._open_tasks.add(task)
-            self._completed_tasks.remove(task)
+            # Progress cursors are rebuilt from remaining results on next
+            # access.
+            TaskProgress.objects.filter(user=self.user).delete()
+
+            # pylint: disable=protected-access
+            self._open_tasks.add(*self._completed_tasks.all())
+            self._completed_tasks.clear()
 
         _msg = ('Succesfully reset task agenda for user {0}, creating '
           'shadow copy {1}.'.format(self.user, _shadow_copy))
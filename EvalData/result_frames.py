@@ -0,0 +1,562 @@
+"""
+Appraise evaluation framework
+
+See LICENSE for usage details
+"""
+# pylint: disable=C0103,C0330
+import csv
+import gzip
+from array import array
+from collections import OrderedDict
+from hashlib import md5
+from math import nan
+from os import listdir, makedirs, replace, stat
+from os.path import abspath, exists, join
+
+import numpy as np
+from django.db.models import Count, Max, Q
+
+from Appraise.utils import _get_logger
+
+LOGGER = _get_logger(name=__name__)
+
+# Version of the on-disk format, part of all cache keys.
+RESULT_FRAME_FORMAT_VERSION = 1
+
+# Columns holding integer codes into per column vocabularies, in system
+# data row order: user, system and segment ID, item type, source and
+# target language.
+CODE_COLUMNS = ('users', 'systems', 'segments', 'types', 'sources', 'targets')
+
+# Columns holding values, following the code columns in system data rows.
+VALUE_COLUMNS = ('scores', 'start_times', 'end_times')
+
+# Columns with few distinct values use smaller integer codes.
+SMALL_CODE_COLUMNS = ('types', 'sources', 'targets')
+
+# Extra columns of snapshot chunks, mapping column name => (row index,
+# array typecode) for extended system data rows with result ids.
+SNAPSHOT_COLUMNS = {'ids': (9, 'q')}
+
+# Snapshot file holding the status of all annotators of the campaign.
+SNAPSHOT_ANNOTATORS_NAME = 'annotators.npy'
+
+# Snapshot chunks are named by their first and last result id.
+SNAPSHOT_CHUNK_NAME = '{0:010d}-{1:010d}.npz'
+
+# Results are not committed in id order, e.g., while annotation views
+# update system scores and progress in the same transaction. Updates hence
+# re-read results with ids up to this much below the last snapshot id.
+SNAPSHOT_ID_WINDOW = 10000
+
+
+def _to_float(value):
+    """
+    Converts optional time value to float, using NaN for missing values.
+    """
+    if value is None or value == '':
+        return nan
+    return float(value)
+
+
+def _vocabulary(values):
+    """
+    Returns vocabulary array for list of distinct values, using strings
+    unless all values are integers.
+    """
+    vocabulary = np.array(values)
+    if vocabulary.dtype.kind not in 'iU':
+        vocabulary = np.array([str(x) for x in values], dtype=str)
+    return vocabulary
+
+
+class ResultFrame():
+    """
+    Columnar in-memory representation of annotation results.
+
+    Rows follow the system data format of DirectAssessmentResult, i.e.,
+    user, system and segment ID, item type, source and target language,
+    score and optional start and end time. Identifiers are interned into
+    integer codes indexing per column vocabularies, in order of first
+    occurrence. Scores are stored as int8 and times as float64, with NaN
+    for missing times.
+
+    Frames can be loaded from the database or from CSV files and are
+    cached on disk in NumPy's binary .npz format. Frames may hold extra
+    value columns, e.g., result ids for snapshots.
+    """
+
+    def __init__(self, columns, vocabularies):
+        self.columns = columns
+        self.vocabularies = vocabularies
+
+    def __len__(self):
+        return len(self.columns['scores'])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    @classmethod
+    def from_rows(cls, rows, extra_columns=None):
+        """
+        Creates frame from iterable of system data rows.
+
+        Rows are consumed one at a time and interned on the fly, so no
+        intermediate list of rows is created. Extra columns map column
+        name => (row index, array typecode) for additional row values.
+        """
+        extra_columns = extra_columns or {}
+        lookups = [{} for _ in CODE_COLUMNS]
+        codes = [array('i') for _ in CODE_COLUMNS]
+        scores = array('h')
+        start_times = array('d')
+        end_times = array('d')
+        extras = {
+          name: array(typecode)
+          for name, (_, typecode) in extra_columns.items()
+        }
+
+        for row in rows:
+            for lookup, column, value in zip(lookups, codes, row):
+                column.append(lookup.setdefault(value, len(lookup)))
+
+            scores.append(int(row[6]))
+            start_times.append(_to_float(row[7]) if len(row) > 7 else nan)
+            end_times.append(_to_float(row[8]) if len(row) > 8 else nan)
+
+            for name, (index, _) in extra_columns.items():
+                extras[name].append(row[index])
+
+        columns = {}
+        vocabularies = {}
+        for name, lookup, column in zip(CODE_COLUMNS, lookups, codes):
+            dtype = np.int16 if name in SMALL_CODE_COLUMNS else np.int32
+            columns[name] = np.frombuffer(column, dtype=np.int32).astype(dtype)
+            vocabularies[name] = _vocabulary(list(lookup))
+
+        columns['scores'] = np.frombuffer(scores, dtype=np.int16)
+        _int8 = np.iinfo(np.int8)
+        if not len(scores) or (
+          columns['scores'].min() >= _int8.min
+          and columns['scores'].max() <= _int8.max
+        ):
+            columns['scores'] = columns['scores'].astype(np.int8)
+        columns['start_times'] = np.frombuffer(start_times, dtype=np.float64)
+        columns['end_times'] = np.frombuffer(end_times, dtype=np.float64)
+
+        for name, values in extras.items():
+            columns[name] = np.array(values)
+
+        return cls(columns, vocabularies)
+
+    @classmethod
+    def concat(cls, frames):
+        """
+        Returns frame with rows of all given frames, in order.
+
+        Vocabularies are merged in order of first occurrence and codes are
+        mapped accordingly. Only columns present in all frames are kept.
+        """
+        frames = list(frames)
+        if not frames:
+            return cls.from_rows(())
+
+        if len(frames) == 1:
+            return frames[0]
+
+        names = set.intersection(*(set(x.columns) for x in frames))
+
+        columns = {}
+        vocabularies = {}
+        for name in CODE_COLUMNS:
+            lookup = {}
+            codes = []
+            for frame in frames:
+                mapping = np.array([
+                  lookup.setdefault(x, len(lookup))
+                  for x in frame.vocabularies[name].tolist()
+                ], dtype=np.int64)
+                codes.append(mapping[frame[name]] if len(mapping) else frame[name])
+
+            dtype = np.int16 if name in SMALL_CODE_COLUMNS else np.int32
+            columns[name] = np.concatenate(codes).astype(dtype)
+            vocabularies[name] = _vocabulary(list(lookup))
+
+        for name in names.difference(CODE_COLUMNS):
+            columns[name] = np.concatenate([x[name] for x in frames])
+
+        return cls(columns, vocabularies)
+
+    @classmethod
+    def from_csv(cls, csv_path, cache_dir=None):
+        """
+        Creates frame from CSV file in extended system data format.
+
+        Files ending in .gz are decompressed on the fly. Empty lines are
+        skipped. If cache_dir is given, frames are cached by file path,
+        size and modification time.
+        """
+        _stat = stat(csv_path)
+        cache_key = cls._cache_key(
+          'csv', abspath(csv_path), _stat.st_size, _stat.st_mtime
+        )
+
+        def _load():
+            _open = gzip.open if csv_path.endswith('.gz') else open
+            with _open(csv_path, 'rt', newline='') as csv_file:
+                return cls.from_rows(x for x in csv.reader(csv_file) if x)
+
+        return cls._cached(cache_dir, cache_key, _load)
+
+    @classmethod
+    def from_campaign(
+      cls, campaign, result_cls=None, cache_dir=None, **kwargs
+    ):
+        """
+        Creates frame from system data of given campaign.
+
+        Keyword arguments are passed on to result_cls.iter_system_data(),
+        with result_cls defaulting to DirectAssessmentResult. If cache_dir
+        is given, frames are cached by campaign, last result id and number
+        of completed results, so that new and retired results invalidate
+        cached frames.
+        """
+        if result_cls is None:
+            # pylint: disable=import-outside-toplevel
+            from EvalData.models import DirectAssessmentResult
+            result_cls = DirectAssessmentResult
+
+        state = result_cls.objects.filter(
+          task__campaign=campaign
+        ).aggregate(
+          last_id=Max('id'), completed=Count('id', filter=Q(completed=True))
+        )
+        cache_key = cls._cache_key(
+          result_cls.__name__, campaign.id, state['last_id'],
+          state['completed'], sorted(kwargs.items()),
+        )
+
+        def _load():
+            return cls.from_rows(
+              result_cls.iter_system_data(campaign.id, **kwargs)
+            )
+
+        return cls._cached(cache_dir, cache_key, _load)
+
+    @staticmethod
+    def _cache_key(*values):
+        _key = repr((RESULT_FRAME_FORMAT_VERSION,) + values)
+        return md5(_key.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _cached(cls, cache_dir, cache_key, load):
+        if cache_dir is None:
+            return load()
+
+        cache_path = join(cache_dir, '{0}.npz'.format(cache_key))
+        if exists(cache_path):
+            LOGGER.debug('Loading result frame from %s', cache_path)
+            return cls.load(cache_path)
+
+        frame = load()
+        makedirs(cache_dir, exist_ok=True)
+        frame.save(cache_path)
+        return frame
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads frame from .npz file written by save().
+        """
+        columns = {}
+        vocabularies = {}
+        with np.load(path, allow_pickle=False) as data:
+            for name in data.files:
+                if name.endswith('_names'):
+                    vocabularies[name[:-len('_names')]] = data[name]
+                else:
+                    columns[name] = data[name]
+
+        return cls(columns, vocabularies)
+
+    def save(self, path, compressed=False):
+        """
+        Saves frame to .npz file, compressed if requested. The file is
+        replaced atomically.
+        """
+        arrays = dict(self.columns)
+        for name, vocabulary in self.vocabularies.items():
+            arrays['{0}_names'.format(name)] = vocabulary
+
+        _save = np.savez_compressed if compressed else np.savez
+        temp_path = '{0}.tmp'.format(path)
+        with open(temp_path, 'wb') as output_file:
+            _save(output_file, **arrays)
+        replace(temp_path, path)
+
+    def decode(self, column, codes=None):
+        """
+        Returns values for codes of given column, or all rows if None.
+        """
+        if codes is None:
+            codes = self.columns[column]
+        return self.vocabularies[column][codes]
+
+    def take(self, indices):
+        """
+        Returns frame with given rows, sharing vocabularies with this frame.
+        """
+        return ResultFrame(
+          {name: column[indices] for name, column in self.columns.items()},
+          self.vocabularies,
+        )
+
+    def filter(self, mask):
+        """
+        Returns frame with rows for which mask is True.
+        """
+        return self.take(np.nonzero(mask)[0])
+
+    def exclude_users(self, user_ids):
+        """
+        Returns frame without rows for given user IDs, ignoring case.
+        """
+        user_ids = set(x.lower() for x in user_ids)
+        if not user_ids:
+            return self
+
+        excluded = np.array(
+          [str(x).lower() in user_ids for x in self.vocabularies['users']],
+          dtype=bool,
+        )
+        return self.filter(~excluded[self.columns['users']])
+
+    def select_types(self, item_types, ignore_case=False):
+        """
+        Returns frame with rows of given item types only.
+        """
+        if ignore_case:
+            item_types = set(x.upper() for x in item_types)
+            selected = [x.upper() in item_types for x in self.vocabularies['types']]
+        else:
+            selected = [x in item_types for x in self.vocabularies['types']]
+
+        selected = np.array(selected, dtype=bool)
+        return self.filter(selected[self.columns['types']])
+
+    def expand_systems(self):
+        """
+        Returns frame with one row per system for rows with multiple system
+        IDs joined by '+', matching expand_multi_sys for system data.
+        Expanded rows follow each other in the order of the system IDs.
+        """
+        lookup = {}
+        parts = [
+          [lookup.setdefault(x, len(lookup)) for x in str(name).split('+')]
+          for name in self.vocabularies['systems'].tolist()
+        ]
+        part_counts = np.array([len(x) for x in parts], dtype=np.int64)
+        part_codes = np.array([x for y in parts for x in y], dtype=np.int32)
+        part_starts = np.cumsum(part_counts) - part_counts
+
+        systems = self.columns['systems']
+        repeats = part_counts[systems]
+        rows = np.repeat(np.arange(len(systems)), repeats)
+        offsets = np.arange(len(rows)) - np.repeat(
+          np.cumsum(repeats) - repeats, repeats
+        )
+
+        frame = self.take(rows)
+        frame.vocabularies = dict(self.vocabularies)
+        frame.vocabularies['systems'] = _vocabulary(list(lookup))
+        frame.columns['systems'] = part_codes[
+          np.repeat(part_starts[systems], repeats) + offsets
+        ]
+        return frame
+
+    def group_by(self, *columns):
+        """
+        Returns (keys, groups) for rows grouped by given code columns.
+
+        Keys is a list of decoded key tuples in order of first occurrence,
+        groups contains the key index for each row.
+        """
+        if not len(self):
+            return [], np.zeros(0, dtype=np.int64)
+
+        stacked = np.stack([self.columns[x] for x in columns], axis=1)
+        unique, first, inverse = np.unique(
+          stacked, axis=0, return_index=True, return_inverse=True
+        )
+
+        order = np.argsort(first, kind='stable')
+        ranks = np.empty_like(order)
+        ranks[order] = np.arange(len(order))
+
+        unique = unique[order]
+        decoded = [
+          self.decode(name, unique[:, index]).tolist()
+          for index, name in enumerate(columns)
+        ]
+        return list(zip(*decoded)), ranks[inverse.reshape(-1)]
+
+    def split(self, *columns):
+        """
+        Returns ordered mapping key => frame for rows grouped by given
+        code columns. Keys are ordered by first occurrence.
+        """
+        keys, groups = self.group_by(*columns)
+        order = np.argsort(groups, kind='stable')
+        bounds = np.searchsorted(groups[order], np.arange(len(keys) + 1))
+
+        return OrderedDict(
+          (key, self.take(order[bounds[index]:bounds[index + 1]]))
+          for index, key in enumerate(keys)
+        )
+
+    def iter_rows(self):
+        """
+        Returns iterator over system data rows of user, system and segment
+        ID, item type, source and target language and score.
+        """
+        decoded = [self.decode(name).tolist() for name in CODE_COLUMNS]
+        return zip(*decoded, self.columns['scores'].tolist())
+
+
+class ResultSnapshot():
+    """
+    Append-only on-disk snapshot of the completed results of a campaign.
+
+    Snapshots are directories of compressed result frame chunks. Each
+    update only reads results with ids larger than the last snapshot id
+    minus SNAPSHOT_ID_WINDOW, skips results contained in the snapshot and
+    writes the others to a new chunk, so existing chunks are never
+    rewritten.
+    Chunks hold extended system data and result ids for all item types
+    and annotators. Updates also replace the list of inactive annotators.
+
+    Results retired after they have been written remain in the snapshot,
+    which has to be deleted and recreated to drop them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def for_campaign(cls, campaign_name, snapshot_dir):
+        """
+        Returns snapshot of given campaign inside snapshot_dir.
+        """
+        return cls(join(snapshot_dir, campaign_name))
+
+    def chunk_names(self):
+        """
+        Returns file names of all chunks, ordered by result id.
+        """
+        if not exists(self.path):
+            return []
+
+        return sorted(x for x in listdir(self.path) if x.endswith('.npz'))
+
+    def _chunk_ranges(self):
+        """
+        Returns (first id, last id, file name) tuples for all chunks.
+        """
+        chunk_ranges = []
+        for chunk_name in self.chunk_names():
+            first_id, last_id = chunk_name[:-len('.npz')].split('-')
+            chunk_ranges.append((int(first_id), int(last_id), chunk_name))
+        return chunk_ranges
+
+    def last_id(self):
+        """
+        Returns largest result id contained in snapshot, or 0 if empty.
+        """
+        return max((x[1] for x in self._chunk_ranges()), default=0)
+
+    def _ids_since(self, min_id):
+        """
+        Returns array of result ids larger than min_id in the snapshot.
+        """
+        ids = [np.zeros(0, dtype='q')]
+        for _, last_id, chunk_name in self._chunk_ranges():
+            if last_id > min_id:
+                with np.load(
+                  join(self.path, chunk_name), allow_pickle=False
+                ) as data:
+                    ids.append(data['ids'])
+
+        ids = np.concatenate(ids)
+        return ids[ids > min_id]
+
+    def update(self, campaign, result_cls=None):
+        """
+        Appends chunk with results created since the last update.
+
+        Returns number of appended results.
+        """
+        if result_cls is None:
+            # pylint: disable=import-outside-toplevel
+            from EvalData.models import DirectAssessmentResult
+            result_cls = DirectAssessmentResult
+
+        # Results committed late may have ids below the last snapshot id.
+        min_id = max(self.last_id() - SNAPSHOT_ID_WINDOW, 0)
+        rows = result_cls.iter_system_data(
+          campaign.id, extended_csv=True, expand_multi_sys=False,
+          include_inactive=True, min_id=min_id, add_result_id=True
+        )
+        frame = ResultFrame.from_rows(rows, extra_columns=SNAPSHOT_COLUMNS)
+        frame = frame.filter(~np.isin(frame['ids'], self._ids_since(min_id)))
+
+        makedirs(self.path, exist_ok=True)
+        inactive = result_cls.objects.filter(
+          task__campaign=campaign, createdBy__is_active=False
+        ).values_list('createdBy__username', flat=True).distinct()
+
+        temp_path = join(self.path, '{0}.tmp'.format(SNAPSHOT_ANNOTATORS_NAME))
+        with open(temp_path, 'wb') as output_file:
+            np.save(output_file, np.array(sorted(inactive), dtype=str))
+        replace(temp_path, join(self.path, SNAPSHOT_ANNOTATORS_NAME))
+
+        if not len(frame):
+            return 0
+
+        chunk_name = SNAPSHOT_CHUNK_NAME.format(
+          int(frame['ids'].min()), int(frame['ids'].max())
+        )
+        # Chunks are written to a temporary file and replaced atomically,
+        # so interrupted updates never leave truncated chunks behind.
+        frame.save(join(self.path, chunk_name), compressed=True)
+
+        LOGGER.info(
+          'Appended %d results to snapshot %s', len(frame), self.path
+        )
+        return len(frame)
+
+    def load(
+      self, item_types=('TGT', 'CHK'), expand_multi_sys=True,
+      include_inactive=False
+    ):
+        """
+        Returns result frame with all snapshot chunks, selected like
+        DirectAssessmentResult.iter_system_data() selects results.
+
+        Annotator status is taken from the last update.
+        """
+        frame = ResultFrame.concat(
+          ResultFrame.load(join(self.path, x)) for x in self.chunk_names()
+        )
+
+        annotators_path = join(self.path, SNAPSHOT_ANNOTATORS_NAME)
+        if not include_inactive and exists(annotators_path):
+            inactive = np.load(annotators_path, allow_pickle=False)
+            frame = frame.filter(~np.isin(
+              frame.decode('users').astype(str), inactive
+            ))
+
+        frame = frame.select_types(item_types)
+        if expand_multi_sys:
+            frame = frame.expand_systems()
+
+        return frame
@@ -1,315 +1,1144 @@
-from django.contrib.auth.models import User
-from django.core.exceptions import ValidationError
-from django.test import TestCase
-
-from Campaign.models import Campaign
-from EvalData.models import (
-    Market,
-    Metadata,
-    ObjectID,
-    TaskAgenda,
-    TextSegment,
-)
-
-
-class TaskAgendaTests(TestCase):
-    @classmethod
-    def setUpClass(cls):
-        """
-        Create valid User and Campaign instances to test TaskAgenda with.
-        """
-        super(TaskAgendaTests, cls).setUpClass()
-
-        cls.valid_user = User()
-        cls.valid_user.username = 'dummy-user'
-        cls.valid_user.save()
-
-        cls.valid_campaign = Campaign()
-        cls.valid_campaign.createdBy = cls.valid_user
-        cls.valid_campaign.save()
-
-    def test_cannot_complete_non_existing_task(self):
-        agenda = TaskAgenda.objects.create(
-            user=self.valid_user, campaign=self.valid_campaign
-        )
-
-        non_existing_task = 'does-not-exist'
-        expected_message = (
-            'Invalid task {0!r} not ObjectID '
-            'instance'.format(non_existing_task)
-        )
-        with self.assertRaisesMessage(ValueError, expected_message):
-            agenda.complete_open_task(non_existing_task)
-
-    def test_completed_task_moved_correctly(self):
-        """
-        Completing an open task moves it from _open_tasks to _completed_tasks.
-        """
-        agenda = TaskAgenda.objects.create(
-            user=self.valid_user, campaign=self.valid_campaign
-        )
-
-        dummy_task = ObjectID.objects.create(
-            typeName='DirectAssessmentTask', primaryID='123'
-        )
-        agenda._open_tasks.add(dummy_task)
-
-        agenda.complete_open_task(dummy_task)
-        self.assertFalse(dummy_task in agenda._open_tasks.all())
-        self.assertTrue(dummy_task in agenda._completed_tasks.all())
-
-
-class MarketTests(TestCase):
-    def test_cannot_exceed_max_length_for_source_language_code(self):
-        pass
-
-    def test_cannot_exceed_max_length_for_target_language_code(self):
-        pass
-
-    def test_cannot_exceed_max_length_for_domain_name(self):
-        pass
-
-    def test_cannot_recreate_existing_market(self):
-        pass
-
-    def test_cannot_modify_market_id(self):
-        pass
-
-
-class MetadataTests(TestCase):
-    @classmethod
-    def setUpClass(cls):
-        """
-        Create valid Market instance to test Metadata with.
-        """
-        super(MetadataTests, cls).setUpClass()
-
-        cls.valid_user = User()
-        cls.valid_user.username = 'dummy-user'
-        cls.valid_user.save()
-
-        cls.valid_market = Market()
-        cls.valid_market.sourceLanguageCode = "en-US"
-        cls.valid_market.targetLanguageCode = "de-DE"
-        cls.valid_market.domainName = "TEST"
-        cls.valid_market.createdBy = cls.valid_user
-        cls.valid_market.save()
-
-        cls.createdBy = cls.valid_user
-
-    def test_cannot_exceed_maxlength_for_corpus_name(self):
-        pass
-
-    def test_cannot_exceed_maxlength_for_version_info(self):
-        pass
-
-    def test_cannot_exceed_maxlength_for_source(self):
-        pass
-
-    def test_cannot_not_set_market(self):
-        pass
-
-
-class TextSegmentTests(TestCase):
-    @classmethod
-    def setUpClass(cls):
-        """
-        Create valid Market and Metadata instances to test TextSegment with.
-        """
-        super(TextSegmentTests, cls).setUpClass()
-
-        cls.valid_user = User()
-        cls.valid_user.username = 'dummy-user'
-        cls.valid_user.save()
-
-        cls.valid_market = Market()
-        cls.valid_market.sourceLanguageCode = "en-US"
-        cls.valid_market.targetLanguageCode = "de-DE"
-        cls.valid_market.domainName = "TEST"
-        cls.valid_market.createdBy = cls.valid_user
-        cls.valid_market.save()
-
-        cls.valid_metadata = Metadata()
-        cls.valid_metadata.market = cls.valid_market
-        cls.valid_metadata.corpusName = "TEST"
-        cls.valid_metadata.versionInfo = "1.0"
-        cls.valid_metadata.source = "MANUAL"
-        cls.valid_metadata.createdBy = cls.valid_user
-        cls.valid_metadata.save()
-
-        cls.valid_textsegment = TextSegment()
-        cls.valid_textsegment.itemID = 1
-        cls.valid_textsegment.itemType = 'SRC'
-        cls.valid_textsegment.segmentID = 'SomeID'
-        cls.valid_textsegment.segmentText = 'This is a test sentence.'
-        cls.valid_textsegment.metadata = TextSegmentTests.valid_metadata
-        cls.valid_textsegment.createdBy = TextSegmentTests.valid_user
-        cls.valid_textsegment.save()
-
-    def test_valid_instance_has_createdby(self):
-        """
-        Test that valid instance has createdBy set.
-        """
-        self.assertTrue(
-            hasattr(TextSegmentTests.valid_textsegment, 'createdBy')
-        )
-
-    def test_valid_instance_has_datecreated(self):
-        """
-        Test that valid instance has dateCreated set.
-        """
-        self.assertTrue(
-            hasattr(TextSegmentTests.valid_textsegment, 'dateCreated')
-        )
-
-    def test_cannot_use_negative_integer_as_id(self):
-        """
-        sentenceID is a PositiveIntegerField and hence should
-        never accept negative integer values.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.itemID = -1
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_use_zero_integer_as_id(self):
-        """
-        sentenceID is a PositiveIntegerField so 0 is technically
-        a legal value. Our IDs are 1-based, so we want to reject
-        any zero-based IDs.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.itemID = 0
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_use_non_integer_as_id(self):
-        """
-        sentenceID is a PositiveIntegerField and hence should
-        never accept non integer typed data.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.itemID = '1'
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_use_non_string_as_text(self):
-        """
-        sentenceText is a CharField and hence should never accept
-        non string typed data.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.segmentText = 123
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_use_empty_string_as_text(self):
-        """
-        sentenceText is a CharField and hence should never accept
-        an empty string as value.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.segmentText = ''
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_use_too_long_string_as_text(self):
-        """
-        sentenceText is a CharField and hence should never accept
-        a string longer than .models.MAX_SEGMENTTEXT_LENGTH as value.
-        """
-        from EvalData.models import MAX_SEGMENTTEXT_LENGTH
-
-        _too_long_string = 'a' * (MAX_SEGMENTTEXT_LENGTH + 1)
-
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.segmentText = _too_long_string
-        self.assertEqual(len(_too_long_string), MAX_SEGMENTTEXT_LENGTH + 1)
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_not_set_itemid(self):
-        """
-        itemID cannot be left blank.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.itemID = None
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_not_set_segmenttext(self):
-        """
-        segmentText cannot be left blank.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.segmentText = None
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_can_set_unicode_text(self):
-        """
-        sentenceText should accept Unicode text.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.segmentText = 'This is ä test contäining ümläütß.'
-        self.assertEqual(test_obj.is_valid(), True)
-
-    def test_can_set_correct_length_unicode_text(self):
-        """
-        sentenceText should accept up to max_length Unicode characters.
-        """
-        from EvalData.models import MAX_SEGMENTTEXT_LENGTH
-
-        _correct_length_string = '\u0394' * MAX_SEGMENTTEXT_LENGTH
-
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.segmentText = _correct_length_string
-        self.assertEqual(test_obj.is_valid(), True)
-
-    def test_cannot_not_set_metadata(self):
-        """
-        metadata cannot be left blank.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.metadata = None
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_not_set_itemtype(self):
-        """
-        itemType cannot be left blank.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.itemtype = None
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_not_set_segmentid(self):
-        """
-        segmentID cannot be left blank.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.segmentID = None
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_set_wrong_itemtype(self):
-        """
-        itemType cannot be set to unknown value.
-        """
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.itemType = 'FOO'
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_cannot_set_too_long_itemtype(self):
-        """
-        itemType cannot be set to too long value.
-        """
-        from EvalData.models import MAX_SEGMENTID_LENGTH
-
-        _too_long_bad_itemtype = 'F' * (MAX_SEGMENTID_LENGTH + 1)
-
-        test_obj = TextSegmentTests.valid_textsegment
-        test_obj.itemType = _too_long_bad_itemtype
-        self.assertEqual(test_obj.is_valid(), False)
-
-    def test_can_set_correct_itemtype(self):
-        """
-        itemType can be set to known values.
-        """
-        from EvalData.models import SET_ITEMTYPE_CHOICES
-
-        test_obj = TextSegmentTests.valid_textsegment
-
-        for itemtype in SET_ITEMTYPE_CHOICES:
-            test_obj.itemType = itemtype[0]
-            self.assertEqual(test_obj.is_valid(), True)
+from io import BytesIO, StringIO
+from json import dumps
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from zipfile import ZipFile
+
+import numpy as np
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from Campaign.models import Campaign, CampaignData, TrustedUser
+from EvalData.models import (
+    DirectAssessmentDocumentResult,
+    DirectAssessmentDocumentTask,
+    DirectAssessmentResult,
+    DirectAssessmentTask,
+    Market,
+    Metadata,
+    ObjectID,
+    PairwiseAssessmentTask,
+    SystemScoreAggregate,
+    TaskAgenda,
+    TextPair,
+    TextPairWithContext,
+    TextSegment,
+    TextSegmentWithTwoTargets,
+)
+from EvalData.models.base_models import iter_json_array
+from EvalData.result_frames import ResultFrame, ResultSnapshot
+
+
+class TaskAgendaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create valid User and Campaign instances to test TaskAgenda with.
+        """
+        super(TaskAgendaTests, cls).setUpClass()
+
+        cls.valid_user = User()
+        cls.valid_user.username = 'dummy-user'
+        cls.valid_user.save()
+
+        cls.valid_campaign = Campaign()
+        cls.valid_campaign.createdBy = cls.valid_user
+        cls.valid_campaign.save()
+
+    def test_cannot_complete_non_existing_task(self):
+        agenda = TaskAgenda.objects.create(
+            user=self.valid_user, campaign=self.valid_campaign
+        )
+
+        non_existing_task = 'does-not-exist'
+        expected_message = (
+            'Invalid task {0!r} not ObjectID '
+            'instance'.format(non_existing_task)
+        )
+        with self.assertRaisesMessage(ValueError, expected_message):
+            agenda.complete_open_task(non_existing_task)
+
+    def test_completed_task_moved_correctly(self):
+        """
+        Completing an open task moves it from _open_tasks to _completed_tasks.
+        """
+        agenda = TaskAgenda.objects.create(
+            user=self.valid_user, campaign=self.valid_campaign
+        )
+
+        dummy_task = ObjectID.objects.create(
+            typeName='DirectAssessmentTask', primaryID='123'
+        )
+        agenda._open_tasks.add(dummy_task)
+
+        agenda.complete_open_task(dummy_task)
+        self.assertFalse(dummy_task in agenda._open_tasks.all())
+        self.assertTrue(dummy_task in agenda._completed_tasks.all())
+
+
+class MarketTests(TestCase):
+    def test_cannot_exceed_max_length_for_source_language_code(self):
+        pass
+
+    def test_cannot_exceed_max_length_for_target_language_code(self):
+        pass
+
+    def test_cannot_exceed_max_length_for_domain_name(self):
+        pass
+
+    def test_cannot_recreate_existing_market(self):
+        pass
+
+    def test_cannot_modify_market_id(self):
+        pass
+
+
+class MetadataTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create valid Market instance to test Metadata with.
+        """
+        super(MetadataTests, cls).setUpClass()
+
+        cls.valid_user = User()
+        cls.valid_user.username = 'dummy-user'
+        cls.valid_user.save()
+
+        cls.valid_market = Market()
+        cls.valid_market.sourceLanguageCode = "en-US"
+        cls.valid_market.targetLanguageCode = "de-DE"
+        cls.valid_market.domainName = "TEST"
+        cls.valid_market.createdBy = cls.valid_user
+        cls.valid_market.save()
+
+        cls.createdBy = cls.valid_user
+
+    def test_cannot_exceed_maxlength_for_corpus_name(self):
+        pass
+
+    def test_cannot_exceed_maxlength_for_version_info(self):
+        pass
+
+    def test_cannot_exceed_maxlength_for_source(self):
+        pass
+
+    def test_cannot_not_set_market(self):
+        pass
+
+
+class TextSegmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create valid Market and Metadata instances to test TextSegment with.
+        """
+        super(TextSegmentTests, cls).setUpClass()
+
+        cls.valid_user = User()
+        cls.valid_user.username = 'dummy-user'
+        cls.valid_user.save()
+
+        cls.valid_market = Market()
+        cls.valid_market.sourceLanguageCode = "en-US"
+        cls.valid_market.targetLanguageCode = "de-DE"
+        cls.valid_market.domainName = "TEST"
+        cls.valid_market.createdBy = cls.valid_user
+        cls.valid_market.save()
+
+        cls.valid_metadata = Metadata()
+        cls.valid_metadata.market = cls.valid_market
+        cls.valid_metadata.corpusName = "TEST"
+        cls.valid_metadata.versionInfo = "1.0"
+        cls.valid_metadata.source = "MANUAL"
+        cls.valid_metadata.createdBy = cls.valid_user
+        cls.valid_metadata.save()
+
+        cls.valid_textsegment = TextSegment()
+        cls.valid_textsegment.itemID = 1
+        cls.valid_textsegment.itemType = 'SRC'
+        cls.valid_textsegment.segmentID = 'SomeID'
+        cls.valid_textsegment.segmentText = 'This is a test sentence.'
+        cls.valid_textsegment.metadata = TextSegmentTests.valid_metadata
+        cls.valid_textsegment.createdBy = TextSegmentTests.valid_user
+        cls.valid_textsegment.save()
+
+    def test_valid_instance_has_createdby(self):
+        """
+        Test that valid instance has createdBy set.
+        """
+        self.assertTrue(
+            hasattr(TextSegmentTests.valid_textsegment, 'createdBy')
+        )
+
+    def test_valid_instance_has_datecreated(self):
+        """
+        Test that valid instance has dateCreated set.
+        """
+        self.assertTrue(
+            hasattr(TextSegmentTests.valid_textsegment, 'dateCreated')
+        )
+
+    def test_cannot_use_negative_integer_as_id(self):
+        """
+        sentenceID is a PositiveIntegerField and hence should
+        never accept negative integer values.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.itemID = -1
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_use_zero_integer_as_id(self):
+        """
+        sentenceID is a PositiveIntegerField so 0 is technically
+        a legal value. Our IDs are 1-based, so we want to reject
+        any zero-based IDs.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.itemID = 0
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_use_non_integer_as_id(self):
+        """
+        sentenceID is a PositiveIntegerField and hence should
+        never accept non integer typed data.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.itemID = '1'
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_use_non_string_as_text(self):
+        """
+        sentenceText is a CharField and hence should never accept
+        non string typed data.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.segmentText = 123
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_use_empty_string_as_text(self):
+        """
+        sentenceText is a CharField and hence should never accept
+        an empty string as value.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.segmentText = ''
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_use_too_long_string_as_text(self):
+        """
+        sentenceText is a CharField and hence should never accept
+        a string longer than .models.MAX_SEGMENTTEXT_LENGTH as value.
+        """
+        from EvalData.models import MAX_SEGMENTTEXT_LENGTH
+
+        _too_long_string = 'a' * (MAX_SEGMENTTEXT_LENGTH + 1)
+
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.segmentText = _too_long_string
+        self.assertEqual(len(_too_long_string), MAX_SEGMENTTEXT_LENGTH + 1)
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_not_set_itemid(self):
+        """
+        itemID cannot be left blank.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.itemID = None
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_not_set_segmenttext(self):
+        """
+        segmentText cannot be left blank.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.segmentText = None
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_can_set_unicode_text(self):
+        """
+        sentenceText should accept Unicode text.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.segmentText = 'This is ä test contäining ümläütß.'
+        self.assertEqual(test_obj.is_valid(), True)
+
+    def test_can_set_correct_length_unicode_text(self):
+        """
+        sentenceText should accept up to max_length Unicode characters.
+        """
+        from EvalData.models import MAX_SEGMENTTEXT_LENGTH
+
+        _correct_length_string = '\u0394' * MAX_SEGMENTTEXT_LENGTH
+
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.segmentText = _correct_length_string
+        self.assertEqual(test_obj.is_valid(), True)
+
+    def test_cannot_not_set_metadata(self):
+        """
+        metadata cannot be left blank.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.metadata = None
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_not_set_itemtype(self):
+        """
+        itemType cannot be left blank.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.itemtype = None
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_not_set_segmentid(self):
+        """
+        segmentID cannot be left blank.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.segmentID = None
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_set_wrong_itemtype(self):
+        """
+        itemType cannot be set to unknown value.
+        """
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.itemType = 'FOO'
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_cannot_set_too_long_itemtype(self):
+        """
+        itemType cannot be set to too long value.
+        """
+        from EvalData.models import MAX_SEGMENTID_LENGTH
+
+        _too_long_bad_itemtype = 'F' * (MAX_SEGMENTID_LENGTH + 1)
+
+        test_obj = TextSegmentTests.valid_textsegment
+        test_obj.itemType = _too_long_bad_itemtype
+        self.assertEqual(test_obj.is_valid(), False)
+
+    def test_can_set_correct_itemtype(self):
+        """
+        itemType can be set to known values.
+        """
+        from EvalData.models import SET_ITEMTYPE_CHOICES
+
+        test_obj = TextSegmentTests.valid_textsegment
+
+        for itemtype in SET_ITEMTYPE_CHOICES:
+            test_obj.itemType = itemtype[0]
+            self.assertEqual(test_obj.is_valid(), True)
+
+
+class DirectAssessmentTaskTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create valid Campaign, DirectAssessmentTask and TextPair instances.
+        """
+        super(DirectAssessmentTaskTests, cls).setUpClass()
+
+        cls.valid_user = User.objects.create(username='dummy-user')
+
+        cls.valid_campaign = Campaign.objects.create(
+            campaignName='TestCampaign', createdBy=cls.valid_user
+        )
+
+        market = Market.objects.create(
+            sourceLanguageCode='eng',
+            targetLanguageCode='deu',
+            domainName='TEST',
+            createdBy=cls.valid_user,
+        )
+        metadata = Metadata.objects.create(
+            market=market,
+            corpusName='TEST',
+            versionInfo='1.0',
+            source='MANUAL',
+            createdBy=cls.valid_user,
+        )
+        cls.batch_data = CampaignData.objects.create(
+            dataFile='batch.json',
+            market=market,
+            metadata=metadata,
+            createdBy=cls.valid_user,
+        )
+
+        cls.valid_task = DirectAssessmentTask.objects.create(
+            campaign=cls.valid_campaign,
+            requiredAnnotations=1,
+            batchNo=1,
+            createdBy=cls.valid_user,
+        )
+
+        cls.items = []
+        for item_id, item_type in enumerate(('BAD', 'TGT', 'REF', 'TGT'), 1):
+            item = TextPair.objects.create(
+                sourceID='src',
+                sourceText='Source text',
+                targetID='sys',
+                targetText='Target text',
+                itemID=item_id,
+                itemType=item_type,
+                metadata=metadata,
+                createdBy=cls.valid_user,
+            )
+            cls.items.append(item)
+        cls.valid_task.items.add(*cls.items)
+
+    def setUp(self):
+        cache.clear()
+
+    def _annotate(self, item, user=None, score=50):
+        return DirectAssessmentResult.objects.create(
+            score=score,
+            start_time=0.0,
+            end_time=1.0,
+            item=item,
+            task=self.valid_task,
+            createdBy=user or self.valid_user,
+            activated=False,
+            completed=True,
+        )
+
+    def test_next_item_skips_completed_items(self):
+        """
+        The next item is the first item without a completed result.
+        """
+        self._annotate(self.items[0])
+        self._annotate(self.items[2])
+
+        next_item, completed_items = self.valid_task.next_item_for_user(
+            self.valid_user, return_completed_items=True
+        )
+        self.assertEqual(next_item, self.items[1])
+        self.assertEqual(completed_items, 1)
+        self.assertEqual(
+            self.valid_task.completed_items_for_user(self.valid_user), 2
+        )
+
+    def test_next_item_for_trusted_user_skips_non_target_items(self):
+        """
+        Trusted users only annotate TGT items.
+        """
+        TrustedUser.objects.create(
+            user=self.valid_user, campaign=self.valid_campaign
+        )
+        self._annotate(self.items[1])
+
+        next_item, completed_items = self.valid_task.next_item_for_user(
+            self.valid_user, return_completed_items=True
+        )
+        self.assertEqual(next_item, self.items[3])
+        self.assertEqual(completed_items, 3)
+
+    def test_next_item_ignores_results_by_other_users(self):
+        """
+        Results created by other users do not affect the next item.
+        """
+        other_user = User.objects.create(username='other-user')
+        self._annotate(self.items[0], user=other_user)
+
+        next_item = self.valid_task.next_item_for_user(self.valid_user)
+        self.assertEqual(next_item, self.items[0])
+
+    def test_next_item_uses_progress_cursor(self):
+        """
+        Once the progress cursor exists, the next item is resolved by
+        looking up the cursor and the item only.
+        """
+        for item in self.items[:3]:
+            self._annotate(item)
+        self.valid_task.update_progress_for_user(self.valid_user)
+
+        with self.assertNumQueries(2):
+            next_item = self.valid_task.next_item_for_user(self.valid_user)
+        self.assertEqual(next_item, self.items[3])
+
+    def test_progress_cursor_is_updated_for_new_results(self):
+        """
+        Updating progress after saving a result advances the cursor.
+        """
+        progress = self.valid_task.get_progress_for_user(self.valid_user)
+        self.assertEqual(progress.nextItemID, self.items[0].id)
+
+        self._annotate(self.items[0])
+        self._annotate(self.items[1])
+        progress = self.valid_task.update_progress_for_user(self.valid_user)
+        self.assertEqual(progress.nextItemID, self.items[2].id)
+        self.assertEqual(progress.nextItemPosition, 2)
+        self.assertEqual(progress.completedItems, 2)
+        self.assertEqual(progress.completedTargets, 1)
+        self.assertEqual(
+            DirectAssessmentResult.get_hit_status_for_user(self.valid_user),
+            (0, 1),
+        )
+
+    def test_object_ids_resolve_to_task_instances(self):
+        """
+        ObjectIDs resolve to task instances in input order, using a single
+        query per task type; unknown types and missing ids resolve to None.
+        """
+        object_ids = [
+            # Bindings are created when tasks are inserted.
+            ObjectID.objects.get(
+                typeName='DirectAssessmentTask',
+                primaryID=str(self.valid_task.id),
+            ),
+            ObjectID(typeName='NoSuchTask', primaryID='1'),
+            ObjectID(typeName='DirectAssessmentTask', primaryID='-1'),
+            ObjectID(typeName='DirectAssessmentTask', primaryID='999999'),
+        ]
+
+        with self.assertNumQueries(1):
+            instances = ObjectID.get_object_instances(object_ids)
+            self.assertEqual(instances[0].campaign, self.valid_campaign)
+        self.assertEqual(instances, [self.valid_task, None, None, None])
+        self.assertEqual(object_ids[0].get_object_instance(), self.valid_task)
+
+    def test_result_statistics_for_user(self):
+        """
+        Per-user statistics are computed by aggregate queries.
+        """
+        self._annotate(self.items[0])
+        self._annotate(self.items[1])
+        self._annotate(self.items[1])
+
+        with self.assertNumQueries(1):
+            completed = DirectAssessmentResult.get_completed_for_user(
+                self.valid_user
+            )
+        self.assertEqual(completed, 2)
+        self.assertEqual(
+            DirectAssessmentResult.get_completed_for_user(
+                self.valid_user, unique_only=False
+            ),
+            3,
+        )
+
+        with self.assertNumQueries(1):
+            duration = DirectAssessmentResult.get_time_for_user(
+                self.valid_user
+            )
+        self.assertEqual(duration.total_seconds(), 3.0)
+
+        self.assertEqual(
+            DirectAssessmentResult.completed_results_for_user_and_campaign(
+                self.valid_user, self.valid_campaign
+            ),
+            2,
+        )
+
+        # HIT status counts target results of all tasks, including tasks
+        # without progress cursors.
+        other_task = DirectAssessmentTask.objects.create(
+            campaign=self.valid_campaign,
+            requiredAnnotations=1,
+            batchNo=2,
+            createdBy=self.valid_user,
+        )
+        other_task.items.add(self.items[3])
+        DirectAssessmentResult.objects.create(
+            score=50,
+            start_time=0.0,
+            end_time=1.0,
+            item=self.items[3],
+            task=other_task,
+            createdBy=self.valid_user,
+            activated=False,
+            completed=True,
+        )
+        self.valid_task.update_progress_for_user(self.valid_user)
+
+        with self.assertNumQueries(1):
+            hit_status = DirectAssessmentResult.get_hit_status_for_user(
+                self.valid_user
+            )
+        self.assertEqual(hit_status, (0, 2))
+
+    def test_assign_next_free_task_claims_task_once(self):
+        """
+        Free tasks are claimed until required annotations are reached.
+        """
+        self.valid_task.activated = True
+        self.valid_task.save()
+
+        self.assertEqual(
+            DirectAssessmentTask.assign_next_free_task_for_language(
+                'deu', self.valid_campaign, self.valid_user
+            ),
+            self.valid_task,
+        )
+        self.assertEqual(
+            list(self.valid_task.assignedTo.all()), [self.valid_user]
+        )
+
+        other_user = User.objects.create(username='other-user')
+        self.assertIsNone(
+            DirectAssessmentTask.assign_next_free_task_for_language(
+                'deu', self.valid_campaign, other_user
+            )
+        )
+        self.assertIsNone(
+            DirectAssessmentTask.get_next_free_task_for_language(
+                'eng', self.valid_campaign, other_user
+            )
+        )
+
+    def test_results_csv_rows_use_annotator_lookup(self):
+        """
+        CSV rows are built from a values query and a single annotator
+        lookup, excluding language code groups.
+        """
+        self.valid_user.groups.add(
+            Group.objects.create(name='deu'),
+            Group.objects.create(name='TestTeam'),
+        )
+        self._annotate(self.items[1])
+        self._annotate(self.items[0])
+
+        with self.assertNumQueries(2):
+            rows = list(DirectAssessmentResult.iter_results_as_csv_rows())
+
+        self.assertEqual(
+            rows[0], [x for x, _ in DirectAssessmentResult.DUMP_COLUMNS]
+        )
+        self.assertEqual(
+            rows[1],
+            [
+                self.valid_task.id, 'sys', 'dummy-user', '', 'TestTeam', 2,
+                50, 0.0, 1.0, 1.0, 'TGT', 'TestCampaign',
+            ],
+        )
+        self.assertEqual([x[5] for x in rows[1:]], [2, 1])
+
+    def test_csv_rows_are_filtered_by_market(self):
+        """
+        Per-market CSV rows include annotator details without per-row
+        user lookups.
+        """
+        self._annotate(self.items[0])
+        self._annotate(self.items[1])
+
+        with self.assertNumQueries(1):
+            rows = list(
+                DirectAssessmentResult.iter_csv_rows('eng', 'deu', 'TEST')
+            )
+        self.assertEqual(
+            rows,
+            [
+                ('sys', 'dummy-user', '', 1, 50, 1.0, 'BAD'),
+                ('sys', 'dummy-user', '', 2, 50, 1.0, 'TGT'),
+            ],
+        )
+        self.assertEqual(
+            DirectAssessmentResult.get_csv('eng', 'deu', 'OTHER'), {}
+        )
+
+    def test_bulk_create_tasks_creates_items_and_relations(self):
+        """
+        Tasks are created with their items, relations and ObjectIDs.
+        """
+        batch_tasks = []
+        for batch_no in (2, 3):
+            items = [
+                TextPair(
+                    sourceID='src',
+                    sourceText='Source text',
+                    targetID='sys',
+                    targetText='Target text',
+                    itemID=item_id,
+                    itemType='TGT',
+                    createdBy=self.valid_user,
+                )
+                for item_id in (1, 2)
+            ]
+            task_json = {'batchNo': batch_no, 'requiredAnnotations': 1}
+            batch_tasks.append((task_json, items))
+
+        new_tasks = DirectAssessmentTask.bulk_create_tasks(
+            self.valid_campaign, self.valid_user, self.batch_data, batch_tasks
+        )
+
+        self.assertEqual([x.batchNo for x in new_tasks], [2, 3])
+        for new_task, (_, items) in zip(new_tasks, batch_tasks):
+            new_task.refresh_from_db()
+            self.assertEqual(new_task.batchData, self.batch_data)
+            self.assertEqual(
+                list(new_task.items.order_by('id')),
+                sorted(items, key=lambda x: x.id),
+            )
+            self.assertEqual(
+                new_task._str_name, new_task._generate_str_name()
+            )
+            self.assertTrue(
+                ObjectID.objects.filter(
+                    typeName='DirectAssessmentTask',
+                    primaryID=str(new_task.id),
+                ).exists()
+            )
+
+    def _create_batch_data(self, batch_name, batch_json):
+        media_root = mkdtemp()
+        self.addCleanup(rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        batch_data = CampaignData(
+            market=self.batch_data.market,
+            metadata=self.batch_data.metadata,
+            createdBy=self.valid_user,
+        )
+        batch_data.dataFile.save(batch_name, ContentFile(batch_json))
+        return batch_data
+
+    def test_import_from_json_streams_zip_members(self):
+        """
+        Tasks from all JSON files in a ZIP archive are imported.
+        """
+        batch_json = dumps([
+            {
+                'task': {'batchNo': batch_no, 'requiredAnnotations': 1},
+                'items': [
+                    {
+                        'sourceID': 'src',
+                        'sourceText': 'Source text',
+                        'targetID': 'sys',
+                        'targetText': 'Target text',
+                        'itemID': item_id,
+                        'itemType': 'TGT',
+                    }
+                    for item_id in range(1, 101)
+                ],
+            }
+            for batch_no in (2, 3)
+        ])
+        batch_zip = BytesIO()
+        with ZipFile(batch_zip, 'w') as zip_file:
+            zip_file.writestr('batch1.json', batch_json)
+            zip_file.writestr('batch2.json', batch_json)
+
+        batch_data = self._create_batch_data(
+            'batch.zip', batch_zip.getvalue()
+        )
+        DirectAssessmentTask.import_from_json(
+            self.valid_campaign, self.valid_user, batch_data, -1
+        )
+
+        new_tasks = DirectAssessmentTask.objects.filter(batchData=batch_data)
+        self.assertEqual(
+            sorted(new_tasks.values_list('batchNo', flat=True)), [2, 2, 3, 3]
+        )
+        self.assertEqual(new_tasks.first().items.count(), 100)
+
+    def test_result_frame_is_cached_by_last_result(self):
+        """
+        Result frames are loaded from disk until results change.
+        """
+        cache_dir = mkdtemp()
+        self.addCleanup(rmtree, cache_dir)
+
+        self._annotate(self.items[1])
+        self._annotate(self.items[3], score=80)
+
+        frame = ResultFrame.from_campaign(
+            self.valid_campaign, cache_dir=cache_dir, extended_csv=True
+        )
+        self.assertEqual(frame['scores'].dtype, np.int8)
+        self.assertEqual(frame['start_times'].dtype, np.float64)
+        self.assertEqual(
+            list(frame.iter_rows()),
+            [
+                ('dummy-user', 'sys', 2, 'TGT', 'eng', 'deu', 50),
+                ('dummy-user', 'sys', 4, 'TGT', 'eng', 'deu', 80),
+            ],
+        )
+
+        with self.assertNumQueries(1):
+            cached = ResultFrame.from_campaign(
+                self.valid_campaign, cache_dir=cache_dir, extended_csv=True
+            )
+        self.assertEqual(list(cached.iter_rows()), list(frame.iter_rows()))
+
+        self._annotate(self.items[0])
+        frame = ResultFrame.from_campaign(
+            self.valid_campaign, cache_dir=cache_dir, extended_csv=True
+        )
+        self.assertEqual(list(frame.split('types')), [('TGT',), ('BAD',)])
+
+    def test_result_snapshot_appends_new_results(self):
+        """
+        Snapshot updates only append results created since the last update.
+        """
+        snapshot_dir = mkdtemp()
+        self.addCleanup(rmtree, snapshot_dir)
+        snapshot = ResultSnapshot.for_campaign(
+            self.valid_campaign.campaignName, snapshot_dir
+        )
+
+        self.items[1].targetID = 'sysA+sysB'
+        self.items[1].save()
+        self._annotate(self.items[1])
+        self._annotate(self.items[0], score=10)
+        self.assertEqual(snapshot.update(self.valid_campaign), 2)
+        self.assertEqual(snapshot.update(self.valid_campaign), 0)
+
+        other_user = User.objects.create(username='other-user')
+        result = self._annotate(self.items[3], user=other_user, score=80)
+        self.assertEqual(snapshot.update(self.valid_campaign), 1)
+        self.assertEqual(len(snapshot.chunk_names()), 2)
+        self.assertEqual(snapshot.last_id(), result.id)
+
+        other_user.is_active = False
+        other_user.save()
+        self.assertEqual(snapshot.update(self.valid_campaign), 0)
+
+        campaign_id = self.valid_campaign.id
+        self.assertEqual(
+            list(snapshot.load().iter_rows()),
+            DirectAssessmentResult.get_system_data(campaign_id),
+        )
+        self.assertEqual(
+            list(snapshot.load(
+                item_types=('TGT', 'CHK', 'BAD', 'REF'),
+                expand_multi_sys=False, include_inactive=True,
+            ).iter_rows()),
+            [
+                x[:7] for x in DirectAssessmentResult.get_system_data(
+                    campaign_id, extended_csv=True, expand_multi_sys=False,
+                    include_inactive=True,
+                )
+            ],
+        )
+
+    def test_result_snapshot_appends_late_results(self):
+        """
+        Snapshot updates append results committed after results with
+        larger ids, and ignore files left by interrupted updates.
+        """
+        snapshot_dir = mkdtemp()
+        self.addCleanup(rmtree, snapshot_dir)
+        snapshot = ResultSnapshot.for_campaign(
+            self.valid_campaign.campaignName, snapshot_dir
+        )
+
+        late_result = self._annotate(self.items[1])
+        late_id = late_result.id
+        late_result.delete()
+        self._annotate(self.items[3])
+        self.assertEqual(snapshot.update(self.valid_campaign), 1)
+
+        # Simulates a result with a lower id committed after the update.
+        DirectAssessmentResult.objects.create(
+            id=late_id,
+            score=50,
+            start_time=0.0,
+            end_time=1.0,
+            item=self.items[1],
+            task=self.valid_task,
+            createdBy=self.valid_user,
+            activated=False,
+            completed=True,
+        )
+        temp_path = join(snapshot.path, '0000000001-0000000002.npz.tmp')
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(b'truncated')
+
+        self.assertEqual(snapshot.update(self.valid_campaign), 1)
+        self.assertEqual(snapshot.update(self.valid_campaign), 0)
+        self.assertEqual(
+            sorted(snapshot.load()['ids']),
+            sorted(DirectAssessmentResult.objects.values_list('id', flat=True)),
+        )
+
+    def test_json_array_is_parsed_incrementally(self):
+        """
+        Array elements are parsed across chunk boundaries.
+        """
+        values = [{'text': 'ü' * 10}, [1, 2], 12345, None]
+        json_file = BytesIO(dumps(values, indent=1).encode('utf-8'))
+        self.assertEqual(
+            list(iter_json_array(json_file, chunk_size=3)), values
+        )
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array(BytesIO(b'[{"a": 1}, {"b": '), chunk_size=3))
+
+    def test_state_changes_do_not_query_object_ids(self):
+        """
+        Saving existing instances only updates the row; querysets change
+        states in bulk.
+        """
+        with self.assertNumQueries(1):
+            self.valid_task.complete()
+        self.assertEqual(
+            self.valid_task._str_name, self.valid_task._generate_str_name()
+        )
+
+        result = self._annotate(self.items[0])
+        self._annotate(self.items[1])
+        self.assertFalse(
+            ObjectID.objects.filter(typeName='DirectAssessmentResult')
+        )
+
+        with self.assertNumQueries(1):
+            DirectAssessmentResult.objects.filter(
+                createdBy=self.valid_user
+            ).retire(modifiedBy=self.valid_user)
+
+        result.refresh_from_db()
+        self.assertTrue(result.retired)
+        self.assertFalse(result.completed)
+        self.assertIsNotNone(result.dateRetired)
+        self.assertEqual(result.modifiedBy, self.valid_user)
+
+    def test_reset_taskagenda_moves_results_to_shadow_copy(self):
+        """
+        Resetting an agenda retires all results for a shadow user and
+        reopens completed tasks.
+        """
+        agenda = TaskAgenda.objects.create(
+            user=self.valid_user, campaign=self.valid_campaign
+        )
+        task_id = ObjectID.objects.get(
+            typeName='DirectAssessmentTask', primaryID=str(self.valid_task.id)
+        )
+        agenda._completed_tasks.add(task_id)
+        for item in self.items:
+            self._annotate(item)
+
+        _ret, _msg, _ = agenda.reset_taskagenda()
+        self.assertTrue(_ret, _msg)
+
+        shadow_copy = User.objects.get(username='dummy-user-01')
+        self.assertFalse(shadow_copy.is_active)
+        self.assertEqual(
+            DirectAssessmentResult.objects.filter(
+                createdBy=shadow_copy, modifiedBy=shadow_copy, retired=True
+            ).count(),
+            4,
+        )
+        self.assertEqual(list(agenda._open_tasks.all()), [task_id])
+        self.assertFalse(agenda._completed_tasks.exists())
+        self.assertFalse(SystemScoreAggregate.objects.exists())
+
+    def test_progress_cursor_follows_trusted_user_status(self):
+        """
+        Adding or removing trusted users resets their progress cursors.
+        """
+        progress = self.valid_task.get_progress_for_user(self.valid_user)
+        self.assertEqual(progress.nextItemID, self.items[0].id)
+
+        trusted_user = TrustedUser.objects.create(
+            user=self.valid_user, campaign=self.valid_campaign
+        )
+        next_item = self.valid_task.next_item_for_user(self.valid_user)
+        self.assertEqual(next_item, self.items[1])
+
+        self._annotate(self.items[1])
+        self.valid_task.update_progress_for_user(self.valid_user)
+        next_item = self.valid_task.next_item_for_user(self.valid_user)
+        self.assertEqual(next_item, self.items[3])
+
+        trusted_user.delete()
+        next_item = self.valid_task.next_item_for_user(self.valid_user)
+        self.assertEqual(next_item, self.items[0])
+
+    def test_progress_cursor_ignores_cached_trusted_users(self):
+        """
+        Progress cursors are computed from trusted users in the database,
+        not from cached trusted users which may be stale.
+        """
+        self.assertFalse(self.valid_task.is_trusted_user(self.valid_user))
+
+        # Bulk inserts send no signals, like changes in another process.
+        TrustedUser.objects.bulk_create([
+            TrustedUser(user=self.valid_user, campaign=self.valid_campaign)
+        ])
+        self.assertFalse(self.valid_task.is_trusted_user(self.valid_user))
+
+        progress = self.valid_task.update_progress_for_user(self.valid_user)
+        self.assertEqual(progress.nextItemID, self.items[1].id)
+
+    def test_system_score_totals_are_updated_incrementally(self):
+        """
+        Completed target scores are added to totals on save and removed
+        again when results are retired.
+        """
+        other_user = User.objects.create(username='other-user')
+        for item, user, score in (
+            (self.items[0], self.valid_user, 10),
+            (self.items[1], self.valid_user, 40),
+            (self.items[3], self.valid_user, 80),
+            (self.items[1], other_user, 70),
+        ):
+            self._annotate(item, user=user, score=score)
+
+        totals = SystemScoreAggregate.objects.get(user=self.valid_user)
+        self.assertEqual(
+            (totals.count, totals.scoreSum, totals.scoreSquaresSum),
+            (2, 120, 8000),
+        )
+
+        result = self._annotate(self.items[3], user=other_user, score=50)
+        totals = SystemScoreAggregate.objects.get(user=other_user)
+        self.assertEqual((totals.count, totals.scoreSum), (2, 120))
+
+        scores = SystemScoreAggregate.get_system_scores(self.valid_campaign)
+        self.assertEqual(list(scores), [('eng', 'deu')])
+        system_id, count, raw_score, z_score = scores[('eng', 'deu')][0]
+        self.assertEqual((system_id, count, raw_score), ('sys', 4, 60.0))
+        self.assertAlmostEqual(z_score, 0.0)
+
+        result.retire()
+        totals = SystemScoreAggregate.objects.get(user=other_user)
+        self.assertEqual((totals.count, totals.scoreSum), (1, 70))
+
+    def test_system_score_totals_ignore_unchanged_results(self):
+        """
+        Saving results without changing scores or states, or converting
+        them to strings, does not recompute totals.
+        """
+        self._annotate(self.items[1], score=10)
+        DirectAssessmentResult.objects.update(_str_name='')
+
+        result = DirectAssessmentResult.objects.get()
+        self.assertEqual(str(result), result._generate_str_name())
+        self.assertFalse(
+            DirectAssessmentResult.objects.exclude(_str_name='').exists()
+        )
+
+        with self.assertNumQueries(1):
+            result.end_time = 2.0
+            result.save()
+
+        result.score = 30
+        result.save()
+        totals = SystemScoreAggregate.objects.get()
+        self.assertEqual((totals.count, totals.scoreSum), (1, 30))
+
+    def test_document_blocks_are_looked_up_in_bulk(self):
+        """
+        Document blocks are precomputed on import; block items, results
+        and statistics are looked up using a fixed number of queries.
+        """
+        items = [
+            TextPairWithContext(
+                sourceID='src',
+                sourceText='Source text',
+                targetID='sys',
+                targetText='Target text',
+                itemID=item_id,
+                itemType='TGT',
+                documentID=document_id,
+                isCompleteDocument=is_complete,
+                createdBy=self.valid_user,
+            )
+            for item_id, document_id, is_complete in (
+                (1, 'doc1', False), (2, 'doc1', False), (3, 'doc1', True),
+                (4, 'doc2', False), (5, 'doc2', False), (6, 'doc2', False),
+                (7, 'doc2', True),
+            )
+        ]
+        task_json = {'batchNo': 1, 'requiredAnnotations': 1}
+        task, = DirectAssessmentDocumentTask.bulk_create_tasks(
+            self.valid_campaign, self.valid_user, self.batch_data,
+            [(task_json, items)],
+        )
+
+        task = DirectAssessmentDocumentTask.objects.get(pk=task.pk)
+        self.assertEqual(task.get_document_blocks(), [items[2].id, items[6].id])
+
+        for item, score in zip(items[:5], (10, 20, 30, 40, 50)):
+            DirectAssessmentDocumentResult.objects.create(
+                score=score,
+                start_time=0.0,
+                end_time=1.0,
+                item=item,
+                task=task,
+                createdBy=self.valid_user,
+                activated=False,
+                completed=True,
+            )
+        task.update_progress_for_user(self.valid_user)
+
+        with self.assertNumQueries(4):
+            (
+                next_item, completed_items, completed_blocks,
+                completed_items_in_block, block_items, block_results,
+                total_blocks,
+            ) = task.next_document_for_user(self.valid_user)
+
+        self.assertEqual(next_item, items[5])
+        self.assertEqual(block_items, items[3:])
+        self.assertEqual(
+            [x.score if x else None for x in block_results],
+            [40, 50, None, None],
+        )
+        self.assertEqual(
+            (completed_items, completed_blocks, completed_items_in_block,
+             total_blocks),
+            (5, 1, 2, 2),
+        )
+
+        # Changing task items resets document blocks.
+        task.items.remove(items[6])
+        task.refresh_from_db()
+        self.assertIsNone(task.documentBlocks)
+        self.assertEqual(task.get_document_blocks(), [items[2].id])
+
+    def test_target_diffs_are_stored_on_save(self):
+        """
+        Target diffs are computed on save and precomputed for items which
+        were saved before diffs were stored.
+        """
+        item = TextSegmentWithTwoTargets.objects.create(
+            segmentID='src',
+            segmentText='Source text',
+            target1ID='sys1',
+            target1Text='a b c d e',
+            target2ID='sys2',
+            target2Text='a B c e f',
+            itemID=1,
+            itemType='TGT',
+            metadata=self.batch_data.metadata,
+            createdBy=self.valid_user,
+        )
+        expected = (
+            'a <span class="diff diff-sub">b</span> c '
+            '<span class="diff diff-del">d</span> e',
+            'a <span class="diff diff-sub">B</span> c e '
+            '<span class="diff diff-ins">f</span>',
+        )
+
+        item = TextSegmentWithTwoTargets.objects.get(pk=item.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(item.target_texts_with_diffs(), expected)
+
+        TextSegmentWithTwoTargets.objects.filter(pk=item.pk).update(
+            target1Diff=None, target2Diff=None
+        )
+        task = PairwiseAssessmentTask.objects.create(
+            campaign=self.valid_campaign,
+            requiredAnnotations=1,
+            batchNo=1,
+            createdBy=self.valid_user,
+        )
+        task.items.add(item)
+
+        out = StringIO()
+        call_command(
+            'PrecomputeTargetDiffs', campaign='TestCampaign', stdout=out
+        )
+        self.assertIn('Precomputed diffs for 1 items', out.getvalue())
+
+        item = TextSegmentWithTwoTargets.objects.get(pk=item.pk)
+        self.assertEqual((item.target1Diff, item.target2Diff), expected)
@@ -3,7 +3,209 @@ Appraise evaluation framework
 
 See LICENSE for usage details
 """
-# pylint: disable=unused-import
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 
-# Deliberately left empty.
+from Campaign.models import Campaign
+from EvalData.models import (
+    DirectAssessmentResult,
+    DirectAssessmentTask,
+    Market,
+    Metadata,
+    ObjectID,
+    SystemScoreAggregate,
+    TaskAgenda,
+    TextPair,
+)
+
+
+class DirectAssessmentViewTests(TestCase):
+    '''Tests direct assessment annotation view.'''
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create(username='annotator')
+        campaign = Campaign.objects.create(
+            campaignName='TestCampaign', createdBy=self.user
+        )
+
+        market = Market.objects.create(
+            sourceLanguageCode='eng',
+            targetLanguageCode='deu',
+            domainName='TEST',
+            createdBy=self.user,
+        )
+        metadata = Metadata.objects.create(
+            market=market,
+            corpusName='TEST',
+            versionInfo='1.0',
+            source='MANUAL',
+            createdBy=self.user,
+        )
+
+        self.tasks = []
+        agenda = TaskAgenda.objects.create(user=self.user, campaign=campaign)
+        for batch_no in range(1, 4):
+            task = DirectAssessmentTask.objects.create(
+                campaign=campaign,
+                requiredAnnotations=1,
+                batchNo=batch_no,
+                createdBy=self.user,
+            )
+            task.items.add(*[
+                TextPair.objects.create(
+                    sourceID='src',
+                    sourceText='Source text',
+                    targetID='sys',
+                    targetText='Target text {0}'.format(item_id),
+                    itemID=item_id,
+                    itemType='TGT',
+                    metadata=metadata,
+                    createdBy=self.user,
+                )
+                for item_id in range(1, 4)
+            ])
+            agenda._open_tasks.add(ObjectID.objects.get(
+                typeName='DirectAssessmentTask', primaryID=task.id
+            ))
+            self.tasks.append(task)
+
+        self.client.force_login(self.user)
+
+        # Creates progress cursors for all tasks.
+        self.client.get('/direct-assessment/')
+
+    def _post(self, item, score=75):
+        return self.client.post('/direct-assessment/', {
+            'score': score,
+            'item_id': item.itemID,
+            'task_id': item.id,
+            'start_timestamp': '1.0',
+            'end_timestamp': '2.5',
+        })
+
+    def _submit(self, items, scores):
+        results = [
+            {
+                'score': score,
+                'item_id': item.itemID,
+                'task_id': item.id,
+                'start_timestamp': 1.0,
+                'end_timestamp': 2.5,
+            }
+            for item, score in zip(items, scores)
+        ]
+        return self.client.post(
+            '/direct-assessment/submit/',
+            json.dumps({'results': results}),
+            content_type='application/json',
+        )
+
+    def test_renders_next_item_of_last_open_task(self):
+        '''Verifies that the resolved task and item are rendered.'''
+        with self.assertNumQueries(7):
+            response = self.client.get('/direct-assessment/')
+
+        task = self.tasks[-1]
+        item = task.items.order_by('id').first()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['datask_id'], task.id)
+        self.assertEqual(response.context['task_id'], item.id)
+        self.assertEqual(response.context['source_language'], 'English')
+        self.assertEqual(response.context['items_left_in_block'], 10)
+
+    def test_saves_result_and_advances(self):
+        '''Verifies that results are only saved for the current item.'''
+        items = list(self.tasks[-1].items.order_by('id'))
+
+        response = self._post(items[1])
+        self.assertEqual(response.context['task_id'], items[0].id)
+        self.assertFalse(DirectAssessmentResult.objects.exists())
+
+        response = self._post(items[0])
+        self.assertEqual(response.context['task_id'], items[1].id)
+        self.assertEqual(response.context['items_left_in_block'], 9)
+
+        result = DirectAssessmentResult.objects.get()
+        self.assertEqual(result.item, items[0])
+        self.assertEqual(result.score, 75)
+        self.assertEqual(result.end_time - result.start_time, 1.5)
+
+        # Completed tasks are moved out of the agenda.
+        self._post(items[1])
+        response = self._post(items[2])
+        self.assertRedirects(
+            response, '/dashboard/', fetch_redirect_response=False
+        )
+
+        response = self.client.get('/direct-assessment/')
+        self.assertEqual(response.context['datask_id'], self.tasks[1].id)
+        self.assertEqual(
+            TaskAgenda.objects.get()._open_tasks.count(), 2
+        )
+
+    def test_submits_batch_of_results(self):
+        '''Verifies that batches are only saved for the next items.'''
+        items = list(self.tasks[-1].items.order_by('id'))
+
+        response = self._submit(items[1:], [50, 60])
+        self.assertEqual(response.json()['saved'], 0)
+        self.assertTrue(response.json()['error_msg'])
+        self.assertFalse(DirectAssessmentResult.objects.exists())
+
+        response = self._submit(items[:2], [50, 60])
+        self.assertEqual(response.json()['saved'], 2)
+        self.assertEqual(response.json()['next_item']['task_id'], items[2].id)
+        self.assertEqual(
+            response.json()['next_item']['candidate_text'], 'Target text 3'
+        )
+
+        self.assertEqual(
+            sorted(DirectAssessmentResult.objects.values_list('score', flat=True)),
+            [50, 60],
+        )
+        self.assertEqual(
+            self.tasks[-1].get_progress_for_user(self.user).nextItemID,
+            items[2].id,
+        )
+
+        totals = SystemScoreAggregate.objects.get()
+        self.assertEqual((totals.count, totals.scoreSum), (2, 110))
+
+        response = self.client.post(
+            '/direct-assessment/submit/', 'null',
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_system_scores_do_not_depend_on_stored_dates(self):
+        '''Verifies totals when stored dates differ from submitted ones.'''
+        items = list(self.tasks[-1].items.order_by('id'))
+        bulk_create = DirectAssessmentResult.objects.bulk_create
+
+        # Simulates databases storing DATETIME values without microseconds.
+        def _bulk_create(objs, **kwargs):
+            bulk_create(objs, **kwargs)
+            DirectAssessmentResult.objects.update(
+                dateCompleted=objs[0].dateCompleted.replace(microsecond=0)
+                - timedelta(seconds=1)
+            )
+            return objs
+
+        with patch.object(
+            DirectAssessmentResult.objects, 'bulk_create', _bulk_create
+        ):
+            response = self._submit(items[:2], [50, 60])
+        self.assertEqual(response.json()['saved'], 2)
+
+        totals = SystemScoreAggregate.objects.get()
+        self.assertEqual(
+            (totals.count, totals.scoreSum, totals.scoreSquaresSum),
+            (2, 110, 6100),
+        )
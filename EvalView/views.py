@@ -4,2063 +4,1249 @@ Appraise evaluation framework
 See LICENSE for usage details
 """
 from datetime import datetime
+import json
 
 # pylint: disable=import-error
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import redirect, render
 from django.utils.timezone import utc
 from django.http import JsonResponse
+from django.views.decorators.http import require_POST
 
 from Appraise.settings import BASE_CONTEXT
 from Appraise.utils import _get_logger
 from Campaign.models import Campaign
+from Dashboard.models import LANGUAGE_CODES_AND_NAMES
 from EvalData.models import (
     DataAssessmentTask,
-    DataAssessmentResult,
     DirectAssessmentTask,
-    DirectAssessmentResult,
     DirectAssessmentContextTask,
-    DirectAssessmentContextResult,
     DirectAssessmentDocumentTask,
-    DirectAssessmentDocumentResult,
     MultiModalAssessmentTask,
-    MultiModalAssessmentResult,
+    ObjectID,
     PairwiseAssessmentTask,
-    PairwiseAssessmentResult,
+    SystemScoreAggregate,
     TaskAgenda,
+    TaskProgress,
 )
+from EvalData.models.base_models import BULK_CREATE_BATCH_SIZE
 
 LOGGER = _get_logger(name=__name__)
 
+# Campaigns using specific labels and priming questions in direct
+# assessment views.
+REFERENCE_CAMPAIGNS = tuple('HumanEvalFY19{0}'.format(x) for x in ('7B',))
+ADEQUACY_CAMPAIGNS = tuple(
+    'HumanEvalFY19{0}'.format(x) for x in ('51', '57', '63')
+)
+FLUENCY_CAMPAIGNS = tuple(
+    'HumanEvalFY19{0}'.format(x) for x in ('52', '58', '64')
+)
 
 
-# pylint: disable=C0103,C0330
-@login_required
-def direct_assessment(request, code=None, campaign_name=None):
+def _get_language_names(item):
     """
-    Direct assessment annotation view.
+    Returns (source_language, target_language) names for the market of
+    given item, or None for unknown languages.
     """
-    t1 = datetime.now()
+    tokens = str(item.metadata.market).split('_')
+    if len(tokens) != 3:
+        return (None, None)
 
-    campaign = None
-    if campaign_name:
-        campaign = Campaign.objects.filter(campaignName=campaign_name)
-        if not campaign.exists():
-            _msg = (
-                'No campaign named "%s" exists, redirecting to dashboard'
-            )
-            LOGGER.info(_msg, campaign_name)
-            return redirect('dashboard')
+    return tuple(LANGUAGE_CODES_AND_NAMES.get(x) for x in tokens[:2])
 
-        campaign = campaign[0]
 
-    LOGGER.info(
-        'Rendering direct assessment view for user "%s".',
-        request.user.username or "Anonymous",
-    )
+def _parse_submitted_results(body):
+    """
+    Returns list of result entries from given JSON request body.
 
-    current_task = None
+    Entries are dictionaries of string values, like POST data of annotation
+    forms. Raises ValueError for malformed payloads or entries missing item
+    ID, task ID or timestamps.
+    """
+    try:
+        payload = json.loads(body.decode('utf-8'))
+        entries = payload['results']
 
-    # Try to identify TaskAgenda for current user.
-    agendas = TaskAgenda.objects.filter(user=request.user)
+    except (KeyError, TypeError, UnicodeDecodeError) as exc:
+        raise ValueError(str(exc))
 
-    if campaign:
-        agendas = agendas.filter(campaign=campaign)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError('No results submitted')
 
-    for agenda in agendas:
-        LOGGER.info('Identified work agenda %s', agenda)
+    results = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError('Invalid result entry {0!r}'.format(entry))
 
-        tasks_to_complete = []
-        for serialized_open_task in agenda.serialized_open_tasks():
-            open_task = serialized_open_task.get_object_instance()
+        data = {
+            key: str(value)
+            for key, value in entry.items()
+            if value is not None
+        }
+        for key in ('item_id', 'task_id', 'start_timestamp', 'end_timestamp'):
+            if not data.get(key):
+                raise ValueError('Result entry without {0}'.format(key))
 
-            # Skip tasks which are not available anymore
-            if open_task is None:
-                continue
+        # Validates numeric values before any result is saved.
+        int(data['item_id'])
+        int(data['task_id'])
+        float(data['start_timestamp'])
+        float(data['end_timestamp'])
 
-            if open_task.next_item_for_user(request.user) is not None:
-                current_task = open_task
-                if not campaign:
-                    campaign = agenda.campaign
-            else:
-                tasks_to_complete.append(serialized_open_task)
+        results.append(data)
 
-        modified = False
-        for task in tasks_to_complete:
-            modified = agenda.complete_open_task(task) or modified
+    return results
 
-        if modified:
-            agenda.save()
 
-    if not current_task and agendas.count() > 0:
-        LOGGER.info('Work agendas completed, redirecting to dashboard')
-        LOGGER.info('- code=%s, campaign=%s', code, campaign)
-        return redirect('dashboard')
+class AnnotationView():
+    """
+    Request pipeline shared by all annotation views.
 
-    # If language code has been given, find a free task and assign to user.
-    if not current_task:
-        current_task = DirectAssessmentTask.get_task_for_user(
-            user=request.user
-        )
+    Campaign, task and next item of the current user are resolved once per
+    request. POST requests are validated against the resolved item and
+    saved for it; the resolution is reused for rendering unless a result
+    has been saved. Sub classes define task class, template and active
+    page, and implement get_result_fields() and get_context().
 
-    if not current_task:
-        if code is None or campaign is None:
-            LOGGER.info(
-                'No current task detected, redirecting to dashboard'
-            )
-            LOGGER.info('- code=%s, campaign=%s', code, campaign)
-            return redirect('dashboard')
+    Results for several items can also be submitted at once as JSON, see
+    dispatch_submit(); the response contains only the next item payload.
+    """
+
+    task_cls = None
+    template_name = None
+    active_page = None
+    view_name = None
+
+    def __init__(self, request, code=None, campaign_name=None):
+        self.request = request
+        self.user = request.user
+        self.code = code
+        self.campaign_name = campaign_name
+
+        self.campaign = None
+        self.current_task = None
+        self.current_item = None
+        self.completed_items = 0
+        self.result_saved = False
+        self.error_msg = ''
+
+    @classmethod
+    def as_view(cls):
+        """
+        Returns login protected view function for this annotation view.
+        """
+        # pylint: disable=C0111
+        @login_required
+        def view(request, code=None, campaign_name=None):
+            return cls(request, code, campaign_name).dispatch()
+
+        view.__doc__ = cls.__doc__
+        return view
+
+    @classmethod
+    def as_submit_view(cls):
+        """
+        Returns login protected JSON result submission view function.
+        """
+        # pylint: disable=C0111
+        @login_required
+        @require_POST
+        def view(request, code=None, campaign_name=None):
+            return cls(request, code, campaign_name).dispatch_submit()
+
+        view.__doc__ = cls.dispatch_submit.__doc__
+        return view
+
+    def dispatch(self):
+        """
+        Processes request and returns response.
+        """
+        t1 = datetime.now()
 
         LOGGER.info(
-            'Identifying next task for code "%s", campaign="%s"',
-            code,
-            campaign,
-        )
-        next_task = DirectAssessmentTask.get_next_free_task_for_language(
-            code, campaign, request.user
+            'Rendering %s view for user "%s".',
+            self.view_name,
+            self.user.username or "Anonymous",
         )
 
-        if next_task is None:
-            LOGGER.info('No next task detected, redirecting to dashboard')
+        if not self.resolve_task():
             return redirect('dashboard')
 
-        next_task.assignedTo.add(request.user)
-        next_task.save()
+        t2 = datetime.now()
+        if self.request.method == "POST":
+            self.handle_post()
 
-        current_task = next_task
-
-    if current_task:
-        if not campaign:
-            campaign = current_task.campaign
-
-        elif campaign.campaignName != current_task.campaign.campaignName:
-            _msg = (
-                'Incompatible campaign given, using item campaign instead!'
-            )
-            LOGGER.info(_msg)
-            campaign = current_task.campaign
-
-    t2 = datetime.now()
-    if request.method == "POST":
-        score = request.POST.get('score', None)
-        item_id = request.POST.get('item_id', None)
-        task_id = request.POST.get('task_id', None)
-        start_timestamp = request.POST.get('start_timestamp', None)
-        end_timestamp = request.POST.get('end_timestamp', None)
-        LOGGER.info('score=%s, item_id=%s', score, item_id)
-        if score and item_id and start_timestamp and end_timestamp:
-            duration = float(end_timestamp) - float(start_timestamp)
-            LOGGER.debug(float(start_timestamp))
-            LOGGER.debug(float(end_timestamp))
-            LOGGER.info(
-                'start=%s, end=%s, duration=%s',
-                start_timestamp,
-                end_timestamp,
-                duration,
-            )
-
-            current_item = current_task.next_item_for_user(request.user)
-            if current_item.itemID != int(
-                item_id
-            ) or current_item.id != int(task_id):
-                _msg = 'Item ID %s does not match item %s, will not save!'
-                LOGGER.debug(_msg, item_id, current_item.itemID)
-
-            else:
-                utc_now = datetime.utcnow().replace(tzinfo=utc)
-
-                # pylint: disable=E1101
-                DirectAssessmentResult.objects.create(
-                    score=score,
-                    start_time=float(start_timestamp),
-                    end_time=float(end_timestamp),
-                    item=current_item,
-                    task=current_task,
-                    createdBy=request.user,
-                    activated=False,
-                    completed=True,
-                    dateCompleted=utc_now,
-                )
-
-    t3 = datetime.now()
-
-    current_item, completed_items = current_task.next_item_for_user(
-        request.user, return_completed_items=True
-    )
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
-
-    # completed_items_check = current_task.completed_items_for_user(
-    #     request.user)
-    completed_blocks = int(completed_items / 10)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
-
-    current_task = None
-
-    # Try to identify TaskAgenda for current user.
-    agendas = TaskAgenda.objects.filter(user=request.user)
-
-    if campaign:
-        agendas = agendas.filter(campaign=campaign)
-
-    for agenda in agendas:
-        LOGGER.info('Identified work agenda %s', agenda)
-
-        tasks_to_complete = []
-        for serialized_open_task in agenda.serialized_open_tasks():
-            open_task = serialized_open_task.get_object_instance()
-
-            # Skip tasks which are not available anymore
-            if open_task is None:
-                continue
-
-            if open_task.next_item_for_user(request.user) is not None:
-                current_task = open_task
-                if not campaign:
-                    campaign = agenda.campaign
-            else:
-                tasks_to_complete.append(serialized_open_task)
-
-        modified = False
-        for task in tasks_to_complete:
-            modified = agenda.complete_open_task(task) or modified
+        t3 = datetime.now()
+        if not self.resolve_item():
+            LOGGER.info('No current item detected, redirecting to dashboard')
+            return redirect('dashboard')
 
-        if modified:
-            agenda.save()
+        context = self.get_base_context()
+        context.update(self.get_context())
 
-    if not current_task and agendas.count() > 0:
-        LOGGER.info('Work agendas completed, redirecting to dashboard')
-        LOGGER.info('- code=%s, campaign=%s', code, campaign)
-        return redirect('dashboard')
+        t4 = datetime.now()
+        context['debug_times'] = (t2 - t1, t3 - t2, t4 - t3, t4 - t1)
+        context.update(BASE_CONTEXT)
 
-    # If language code has been given, find a free task and assign to user.
-    if not current_task:
-        current_task = DirectAssessmentContextTask.get_task_for_user(
-            user=request.user
-        )
+        return self.render(context)
 
-    if not current_task:
-        if code is None or campaign is None:
-            LOGGER.info(
-                'No current task detected, redirecting to dashboard'
-            )
-            LOGGER.info('- code=%s, campaign=%s', code, campaign)
-            return redirect('dashboard')
+    def dispatch_submit(self):
+        """
+        Saves results submitted as JSON and returns next item as JSON.
 
+        The request body contains {"results": [...]} with one entry per
+        item, using the same keys as POST data of the annotation form. All
+        results are validated against the current task and saved together,
+        or not at all. The response contains the number of saved results,
+        an error message and the next item payload, which is None if the
+        user has no items left.
+        """
         LOGGER.info(
-            'Identifying next task for code "%s", campaign="%s"',
-            code,
-            campaign,
+            'Submitting %s results for user "%s".',
+            self.view_name,
+            self.user.username or "Anonymous",
         )
-        next_task = DirectAssessmentContextTask.get_next_free_task_for_language(
-            code, campaign, request.user
-        )
-
-        if next_task is None:
-            LOGGER.info('No next task detected, redirecting to dashboard')
-            return redirect('dashboard')
 
-        next_task.assignedTo.add(request.user)
-        next_task.save()
+        try:
+            entries = _parse_submitted_results(self.request.body)
 
-        current_task = next_task
-
-    if current_task:
-        if not campaign:
-            campaign = current_task.campaign
-
-        elif campaign.campaignName != current_task.campaign.campaignName:
-            _msg = (
-                'Incompatible campaign given, using item campaign instead!'
+        except ValueError as exc:
+            LOGGER.info('Invalid results submitted: %s', exc)
+            return JsonResponse(
+                {'saved': 0, 'error_msg': 'Invalid results submitted.'},
+                status=400,
             )
-            LOGGER.info(_msg)
-            campaign = current_task.campaign
-
-    t2 = datetime.now()
-    if request.method == "POST":
-        score = request.POST.get('score', None)
-        item_id = request.POST.get('item_id', None)
-        task_id = request.POST.get('task_id', None)
-        document_id = request.POST.get('document_id', None)
-        start_timestamp = request.POST.get('start_timestamp', None)
-        end_timestamp = request.POST.get('end_timestamp', None)
-        LOGGER.info('score=%s, item_id=%s', score, item_id)
-        if score and item_id and start_timestamp and end_timestamp:
-            duration = float(end_timestamp) - float(start_timestamp)
-            LOGGER.debug(float(start_timestamp))
-            LOGGER.debug(float(end_timestamp))
-            LOGGER.info(
-                'start=%s, end=%s, duration=%s',
-                start_timestamp,
-                end_timestamp,
-                duration,
-            )
-
-            current_item = current_task.next_item_for_user(request.user)
-            if (
-                current_item.itemID != int(item_id)
-                or current_item.id != int(task_id)
-                or current_item.documentID != document_id
-            ):
-                _msg = 'Item ID %s does not match item %s, will not save!'
-                LOGGER.debug(_msg, item_id, current_item.itemID)
 
-            else:
-                utc_now = datetime.utcnow().replace(tzinfo=utc)
-
-                # pylint: disable=E1101
-                DirectAssessmentContextResult.objects.create(
-                    score=score,
-                    start_time=float(start_timestamp),
-                    end_time=float(end_timestamp),
-                    item=current_item,
-                    task=current_task,
-                    createdBy=request.user,
-                    activated=False,
-                    completed=True,
-                    dateCompleted=utc_now,
+        saved = 0
+        next_item = None
+        if self.resolve_task():
+            saved = self.submit_results(entries)
+
+            if self.resolve_item():
+                next_item = self.get_base_context()
+                next_item.update(self.get_item_payload())
+
+        return JsonResponse({
+            'saved': saved,
+            'error_msg': self.error_msg,
+            'next_item': next_item,
+        })
+
+    def resolve_task(self):
+        """
+        Identifies campaign, current task and next item for the user.
+
+        Returns False if the user should be redirected to the dashboard.
+        """
+        if self.campaign_name:
+            self.campaign = Campaign.get_campaign_by_name(self.campaign_name)
+
+            if self.campaign is None:
+                _msg = (
+                    'No campaign named "%s" exists, redirecting to dashboard'
                 )
+                LOGGER.info(_msg, self.campaign_name)
+                return False
 
-    t3 = datetime.now()
-
-    current_item, completed_items = current_task.next_item_for_user(
-        request.user, return_completed_items=True
-    )
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
-
-    # completed_items_check = current_task.completed_items_for_user(
-    #     request.user)
-    completed_blocks = int(completed_items / 10)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
-
-    source_language = current_task.marketSourceLanguage()
-    target_language = current_task.marketTargetLanguage()
-
-    t4 = datetime.now()
-
-    # Define priming question
-    #
-    # Default:
-    #   How accurately does the above candidate text convey the original
-    #   semantics of the source text? Slider ranges from
-    #   <em>Not at all</em> (left) to <em>Perfectly</em> (right).
-    #
-    # We currently allow specific overrides, based on campaign name.
-    reference_label = 'Source text'
-    candidate_label = 'Candidate translation'
-    priming_question_text = (
-        'How accurately does the above candidate text convey the original '
-        'semantics of the source text? Slider ranges from '
-        '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
-    )
-
-    _reference_campaigns = ('HumanEvalFY19{0}'.format(x) for x in ('7B',))
-
-    _adequacy_campaigns = (
-        'HumanEvalFY19{0}'.format(x) for x in ('51', '57', '63')
-    )
-
-    _fluency_campaigns = (
-        'HumanEvalFY19{0}'.format(x) for x in ('52', '58', '64')
-    )
-
-    if campaign.campaignName in _reference_campaigns:
-        reference_label = 'Reference text'
-        candidate_label = 'Candidate translation'
-        priming_question_text = (
-            'How accurately does the above candidate text convey the original '
-            'semantics of the reference text? Slider ranges from '
-            '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
-        )
+        # Try to identify TaskAgenda for current user.
+        agendas = TaskAgenda.objects.filter(user=self.user)
 
-    elif campaign.campaignName in _adequacy_campaigns:
-        reference_label = 'Candidate A'
-        candidate_label = 'Candidate B'
-        priming_question_text = (
-            'How accurately does candidate text B convey the original '
-            'semantics of candidate text A? Slider ranges from '
-            '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
-        )
+        if self.campaign:
+            agendas = agendas.filter(campaign=self.campaign)
 
-    elif campaign.campaignName in _fluency_campaigns:
-        reference_label = 'Candidate A'
-        candidate_label = 'Candidate B'
-        priming_question_text = (
-            'Which of the two candidate texts is more fluent? Slider marks '
-            'preference for <em>Candidate A</em> (left), no difference '
-            '(middle) or preference for <em>Candidate B</em> (right).'
-        )
+        agendas = list(agendas.prefetch_related('_open_tasks'))
+        self.current_task = self.get_agenda_task(agendas)
 
-    context = {
-        'active_page': 'direct-assessment',
-        'reference_label': reference_label,
-        'reference_text': current_item.sourceText,
-        'candidate_label': candidate_label,
-        'candidate_text': current_item.targetText,
-        'priming_question_text': priming_question_text,
-        'item_id': current_item.itemID,
-        'task_id': current_item.id,
-        'completed_blocks': completed_blocks,
-        'items_left_in_block': 10
-        - (completed_items - completed_blocks * 10),
-        'source_language': source_language,
-        'target_language': target_language,
-        'debug_times': (t2 - t1, t3 - t2, t4 - t3, t4 - t1),
-        'template_debug': 'debug' in request.GET,
-        'campaign': campaign.campaignName,
-        'datask_id': current_task.id,
-        'trusted_user': current_task.is_trusted_user(request.user),
-    }
-    context.update(BASE_CONTEXT)
-
-    return render(
-        request, 'EvalView/direct-assessment-context.html', context
-    )
-
-
-# pylint: disable=C0103,C0330
-@login_required
-def direct_assessment_document(request, code=None, campaign_name=None):
-    """
-    Direct assessment document annotation view.
-    """
-    t1 = datetime.now()
+        if not self.current_task and agendas:
+            LOGGER.info('Work agendas completed, redirecting to dashboard')
+            LOGGER.info('- code=%s, campaign=%s', self.code, self.campaign)
+            return False
 
-    campaign = None
-    if campaign_name:
-        campaign = Campaign.objects.filter(campaignName=campaign_name)
-        if not campaign.exists():
-            _msg = (
-                'No campaign named "%s" exists, redirecting to dashboard'
+        # If language code has been given, find a free task and assign to user.
+        if not self.current_task:
+            self.current_task = self.task_cls.get_task_for_user(
+                user=self.user
             )
-            LOGGER.info(_msg, campaign_name)
-            return redirect('dashboard')
-
-        campaign = campaign[0]
-
-    LOGGER.info(
-        'Rendering direct assessment document view for user "%s".',
-        request.user.username or "Anonymous",
-    )
-
-    current_task = None
-
-    # Try to identify TaskAgenda for current user.
-    agendas = TaskAgenda.objects.filter(user=request.user)
-
-    if campaign:
-        agendas = agendas.filter(campaign=campaign)
-
-    for agenda in agendas:
-        LOGGER.info('Identified work agenda %s', agenda)
 
-        tasks_to_complete = []
-        for serialized_open_task in agenda.serialized_open_tasks():
-            open_task = serialized_open_task.get_object_instance()
-
-            # Skip tasks which are not available anymore
-            if open_task is None:
-                continue
-
-            if open_task.next_item_for_user(request.user) is not None:
-                current_task = open_task
-                if not campaign:
-                    campaign = agenda.campaign
-            else:
-                tasks_to_complete.append(serialized_open_task)
-
-        modified = False
-        for task in tasks_to_complete:
-            modified = agenda.complete_open_task(task) or modified
-
-        if modified:
-            agenda.save()
-
-    if not current_task and agendas.count() > 0:
-        LOGGER.info('Work agendas completed, redirecting to dashboard')
-        LOGGER.info('- code=%s, campaign=%s', code, campaign)
-        return redirect('dashboard')
-
-    # If language code has been given, find a free task and assign to user.
-    if not current_task:
-        current_task = DirectAssessmentDocumentTask.get_task_for_user(
-            user=request.user
-        )
+        if not self.current_task:
+            if self.code is None or self.campaign is None:
+                LOGGER.info(
+                    'No current task detected, redirecting to dashboard'
+                )
+                LOGGER.info(
+                    '- code=%s, campaign=%s', self.code, self.campaign
+                )
+                return False
 
-    if not current_task:
-        if code is None or campaign is None:
             LOGGER.info(
-                'No current task detected, redirecting to dashboard'
+                'Identifying next task for code "%s", campaign="%s"',
+                self.code,
+                self.campaign,
+            )
+            next_task = self.task_cls.assign_next_free_task_for_language(
+                self.code, self.campaign, self.user
             )
-            LOGGER.info('- code=%s, campaign=%s', code, campaign)
-            return redirect('dashboard')
-
-        LOGGER.info(
-            'Identifying next task for code "%s", campaign="%s"',
-            code,
-            campaign,
-        )
-        next_task = DirectAssessmentDocumentTask.get_next_free_task_for_language(
-            code, campaign, request.user
-        )
 
-        if next_task is None:
-            LOGGER.info('No next task detected, redirecting to dashboard')
-            return redirect('dashboard')
+            if next_task is None:
+                LOGGER.info('No next task detected, redirecting to dashboard')
+                return False
 
-        next_task.assignedTo.add(request.user)
-        next_task.save()
+            next_task.save()
 
-        current_task = next_task
+            self.current_task = next_task
 
-    if current_task:
-        if not campaign:
-            campaign = current_task.campaign
+        if not self.campaign:
+            self.campaign = self.current_task.campaign
 
-        elif campaign.campaignName != current_task.campaign.campaignName:
+        elif self.campaign.id != self.current_task.campaign_id:
             _msg = (
                 'Incompatible campaign given, using item campaign instead!'
             )
             LOGGER.info(_msg)
-            campaign = current_task.campaign
+            self.campaign = self.current_task.campaign
 
-    # Handling POST requests differs from the original direct_assessment/
-    # direct_assessment_context view, but the input is the same: a score for the
-    # single submitted item
-    t2 = datetime.now()
-    ajax = False
-    item_saved = False
-    error_msg = ''
-    if request.method == "POST":
-        score = request.POST.get('score', None)
-        item_id = request.POST.get('item_id', None)
-        task_id = request.POST.get('task_id', None)
-        document_id = request.POST.get('document_id', None)
-        start_timestamp = request.POST.get('start_timestamp', None)
-        end_timestamp = request.POST.get('end_timestamp', None)
-        ajax = bool(request.POST.get('ajax', None) == 'True')
-
-        LOGGER.info('score=%s, item_id=%s', score, item_id)
-        print('Got request score={0}, item_id={1}, ajax={2}'.format(score, item_id, ajax))
-
-        # If all required information was provided in the POST request
-        if score and item_id and start_timestamp and end_timestamp:
-            duration = float(end_timestamp) - float(start_timestamp)
-            LOGGER.debug(float(start_timestamp))
-            LOGGER.debug(float(end_timestamp))
-            LOGGER.info(
-                'start=%s, end=%s, duration=%s',
-                start_timestamp,
-                end_timestamp,
-                duration,
-            )
-
-            # Get all items from the document that the submitted item belongs
-            # to, and all already collected scores for this document
-            current_item, block_items, block_results = current_task.next_document_for_user(
-                request.user, return_statistics=False)
-
-            # An item from the right document was submitted
-            if current_item.documentID == document_id:
-                # This is the item that we expected to be annotated first,
-                # which means that there is no score for the current item, so
-                # create new score
-                if current_item.itemID == int(item_id) \
-                        and current_item.id == int(task_id):
-
-                    utc_now = datetime.utcnow().replace(tzinfo=utc)
-                    # pylint: disable=E1101
-                    DirectAssessmentDocumentResult.objects.create(
-                        score=score,
-                        start_time=float(start_timestamp),
-                        end_time=float(end_timestamp),
-                        item=current_item,
-                        task=current_task,
-                        createdBy=request.user,
-                        activated=False,
-                        completed=True,
-                        dateCompleted=utc_now,
-                    )
-                    print('Item {} (itemID={}) saved'.format(task_id, item_id))
-                    item_saved = True
-
-                # It is not the current item, so check if the result for it
-                # exists
-                else:
-                    # Check if there is a score result for the submitted item
-                    # TODO: this could be a single query, would it be better or
-                    # more effective?
-                    current_result = None
-                    for result in block_results:
-                        if not result:
-                            continue
-                        if result.item.itemID == int(item_id) and result.item.id == int(task_id):
-                            current_result = result
-                            break
-
-                    # If already scored, update the result
-                    # TODO: consider adding new score, not updating the
-                    # previous one
-                    if current_result:
-                        prev_score = current_result.score
-                        current_result.score = score
-                        current_result.start_time=float(start_timestamp)
-                        current_result.end_time=float(end_timestamp)
-                        utc_now = datetime.utcnow().replace(tzinfo=utc)
-                        current_result.dateCompleted=utc_now
-                        current_result.save()
-                        _msg = 'Item {} (itemID={}) updated {}->{}' \
-                            .format(task_id, item_id, prev_score, score)
-                        LOGGER.debug(_msg)
-                        print(_msg)
-                        item_saved = True
-
-                    # If not yet scored, check if the submitted item is from
-                    # the expected document. Note that document ID is **not**
-                    # sufficient, because there can be multiple documents with
-                    # the same ID in the task.
-                    else:
-                        found_item = False
-                        for item in block_items:
-                            if item.itemID == int(item_id) and item.id == int(task_id):
-                                found_item = item
-                                break
-
-                        # The submitted item is from the same document as the
-                        # first unannotated item. It is fine, so save it
-                        if found_item:
-                            utc_now = datetime.utcnow().replace(tzinfo=utc)
-                            # pylint: disable=E1101
-                            DirectAssessmentDocumentResult.objects.create(
-                                score=score,
-                                start_time=float(start_timestamp),
-                                end_time=float(end_timestamp),
-                                item=found_item,
-                                task=current_task,
-                                createdBy=request.user,
-                                activated=False,
-                                completed=True,
-                                dateCompleted=utc_now,
-                            )
-                            _msg = 'Item {} (itemID={}) saved, although it was not the next item' \
-                                .format(task_id, item_id)
-                            LOGGER.debug(_msg)
-                            print(_msg)
-                            item_saved = True
-
-                        else:
-                            error_msg = (
-                                'We did not expect this item to be submitted. '
-                                'If you used backward/forward buttons in your browser, '
-                                'please reload the page and try again.'
-                            )
-
-                            _msg = 'Item ID {} does not match item {}, will not save!' \
-                                .format(item_id, current_item.itemID)
-                            LOGGER.debug(_msg)
-                            print(_msg)
-
-            # An item from a wrong document was submitted
-            else:
-                print(
-                    'Different document IDs: {} != {}, will not save!' \
-                    .format(current_item.documentID, document_id)
-                )
-
-                error_msg = (
-                    'We did not expect an item from this document to be submitted. '
-                    'If you used backward/forward buttons in your browser, '
-                    'please reload the page and try again.'
-                )
-
-    t3 = datetime.now()
-
-    # Get all items from the document that the first unannotated item in the
-    # task belongs to, and collect some additional statistics
-    (
-        current_item,
-        completed_items,
-        completed_blocks,
-        completed_items_in_block,
-        block_items,
-        block_results,
-        total_blocks,
-    ) = current_task.next_document_for_user(request.user)
-
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
-
-    # Get item scores from the latest corresponding results
-    block_scores = []
-    for item, result in zip(block_items, block_results):
-        item_scores = {
-            'completed': bool(result and result.score > -1),
-            'current_item': bool(item.id == current_item.id),
-            'score': result.score if result else -1,
-        }
-        block_scores.append(item_scores)
-
-    # completed_items_check = current_task.completed_items_for_user(
-    #     request.user)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
-
-    source_language = current_task.marketSourceLanguage()
-    target_language = current_task.marketTargetLanguage()
-
-    t4 = datetime.now()
-
-    reference_label = 'Source text'
-    candidate_label = 'Candidate translation'
-
-    priming_question_texts = [
-        'Below you see a document with {0} sentences in {1} '
-        'and their corresponding candidate translations in {2}. '
-        'Score each candidate translation in the document context, answering the question: ' \
-            .format(len(block_items), source_language, target_language),
-
-        'How accurately does the candidate text (right column, in bold) convey '
-        'the original semantics of the source text (left column) in the document context? ',
-
-        'You may revisit already scored sentences and update their scores at any time '
-        'by clicking at a source text.'
-    ]
-    document_question_texts = [
-        'Please score the document translation above answering the question '
-        '(you can score the entire document only after scoring all previous sentences):',
-
-        'How accurately does the <strong>entire</strong> candidate document in '
-        '{0} (right column) convey '
-        'the original semantics of the source document in {1} (left column)? '.format(target_language, source_language)
-    ]
-
-    # A part of context used in responses to both Ajax and standard POST
-    # requests
-    context = {
-        'active_page': 'direct-assessment-document',
-        'item_id': current_item.itemID,
-        'task_id': current_item.id,
-        'document_id': current_item.documentID,
-        'completed_blocks': completed_blocks,
-        'total_blocks': total_blocks,
-        'items_left_in_block': len(block_items) - completed_items_in_block,
-        'source_language': source_language,
-        'target_language': target_language,
-        'debug_times': (t2 - t1, t3 - t2, t4 - t3, t4 - t1),
-        'template_debug': 'debug' in request.GET,
-        'campaign': campaign.campaignName,
-        'datask_id': current_task.id,
-        'trusted_user': current_task.is_trusted_user(request.user),
-    }
-
-    if ajax:
-        ajax_context = { 'saved': item_saved, 'error_msg': error_msg }
-        context.update(ajax_context)
-        context.update(BASE_CONTEXT)
-        return JsonResponse(context)  # Sent response to the Ajax POST request
-
-    page_context = {
-        'items': zip(block_items, block_scores),
-        'reference_label': reference_label,
-        'candidate_label': candidate_label,
-        'priming_question_texts': priming_question_texts,
-        'document_question_texts': document_question_texts,
-    }
-    context.update(page_context)
-    context.update(BASE_CONTEXT)
-
-    return render(
-        request, 'EvalView/direct-assessment-document.html', context
-    )
-
-
-# pylint: disable=C0103,C0330
-@login_required
-def direct_assessment_context(request, code=None, campaign_name=None):
-    """
-    Direct assessment context annotation view.
-    """
-    t1 = datetime.now()
-
-    campaign = None
-    if campaign_name:
-        campaign = Campaign.objects.filter(campaignName=campaign_name)
-        if not campaign.exists():
-            _msg = (
-                'No campaign named "%s" exists, redirecting to dashboard'
+        self.current_item, self.completed_items = \
+            self.current_task.next_item_for_user(
+                self.user, return_completed_items=True
             )
-            LOGGER.info(_msg, campaign_name)
-            return redirect('dashboard')
-
-        campaign = campaign[0]
-
-    LOGGER.info(
-        'Rendering direct assessment context view for user "%s".',
-        request.user.username or "Anonymous",
-    )
-
-    current_task = None
-
-    # Try to identify TaskAgenda for current user.
-    agendas = TaskAgenda.objects.filter(user=request.user)
-
-    if campaign:
-        agendas = agendas.filter(campaign=campaign)
-
-    for agenda in agendas:
-        LOGGER.info('Identified work agenda %s', agenda)
+        return True
+
+    def get_agenda_task(self, agendas):
+        """
+        Returns the last open task with items left for the user, or None.
+
+        Open tasks without items left are moved to completed tasks. Tasks
+        of all agendas are resolved at once and checked using their
+        prefetched progress cursors.
+        """
+        agenda_tasks = [
+            (agenda, serialized_open_task)
+            for agenda in agendas
+            for serialized_open_task in agenda.serialized_open_tasks()
+        ]
+        open_tasks = ObjectID.get_object_instances(
+            x for _, x in agenda_tasks
+        )
+        TaskProgress.prefetch_for_user(self.user, open_tasks)
 
-        tasks_to_complete = []
-        for serialized_open_task in agenda.serialized_open_tasks():
-            open_task = serialized_open_task.get_object_instance()
+        current_task = None
+        modified_agendas = []
+        for (agenda, serialized_open_task), open_task in zip(
+            agenda_tasks, open_tasks
+        ):
 
             # Skip tasks which are not available anymore
             if open_task is None:
                 continue
 
-            if open_task.next_item_for_user(request.user) is not None:
+            if open_task.has_next_item_for_user(self.user):
                 current_task = open_task
-                if not campaign:
-                    campaign = agenda.campaign
-            else:
-                tasks_to_complete.append(serialized_open_task)
 
-        modified = False
-        for task in tasks_to_complete:
-            modified = agenda.complete_open_task(task) or modified
+            elif agenda.complete_open_task(serialized_open_task):
+                if agenda not in modified_agendas:
+                    modified_agendas.append(agenda)
 
-        if modified:
+        for agenda in modified_agendas:
+            LOGGER.info('Completed open tasks in work agenda %s', agenda.id)
             agenda.save()
 
-    if not current_task and agendas.count() > 0:
-        LOGGER.info('Work agendas completed, redirecting to dashboard')
-        LOGGER.info('- code=%s, campaign=%s', code, campaign)
-        return redirect('dashboard')
+        return current_task
 
-    # If language code has been given, find a free task and assign to user.
-    if not current_task:
-        current_task = DirectAssessmentContextTask.get_task_for_user(
-            user=request.user
-        )
-
-    if not current_task:
-        if code is None or campaign is None:
-            LOGGER.info(
-                'No current task detected, redirecting to dashboard'
-            )
-            LOGGER.info('- code=%s, campaign=%s', code, campaign)
-            return redirect('dashboard')
+    def resolve_item(self):
+        """
+        Identifies next item after handling POST data.
 
-        LOGGER.info(
-            'Identifying next task for code "%s", campaign="%s"',
-            code,
-            campaign,
-        )
-        next_task = DirectAssessmentContextTask.get_next_free_task_for_language(
-            code, campaign, request.user
-        )
-
-        if next_task is None:
-            LOGGER.info('No next task detected, redirecting to dashboard')
-            return redirect('dashboard')
+        Returns False if no item is left for the user.
+        """
+        if self.result_saved:
+            self.current_item, self.completed_items = \
+                self.current_task.next_item_for_user(
+                    self.user, return_completed_items=True
+                )
 
-        next_task.assignedTo.add(request.user)
-        next_task.save()
+        return self.current_item is not None
 
-        current_task = next_task
+    def handle_post(self):
+        """
+        Saves result for the current item if POST data is complete and
+        matches the current item.
+        """
+        item_id = self.request.POST.get('item_id', None)
+        task_id = self.request.POST.get('task_id', None)
+        start_timestamp = self.request.POST.get('start_timestamp', None)
+        end_timestamp = self.request.POST.get('end_timestamp', None)
 
-    if current_task:
-        if not campaign:
-            campaign = current_task.campaign
+        result_fields = self.get_result_fields(self.request.POST)
+        LOGGER.info('result=%s, item_id=%s', result_fields, item_id)
 
-        elif campaign.campaignName != current_task.campaign.campaignName:
-            _msg = (
-                'Incompatible campaign given, using item campaign instead!'
-            )
-            LOGGER.info(_msg)
-            campaign = current_task.campaign
-
-    t2 = datetime.now()
-    if request.method == "POST":
-        score = request.POST.get('score', None)
-        item_id = request.POST.get('item_id', None)
-        task_id = request.POST.get('task_id', None)
-        document_id = request.POST.get('document_id', None)
-        start_timestamp = request.POST.get('start_timestamp', None)
-        end_timestamp = request.POST.get('end_timestamp', None)
-        LOGGER.info('score=%s, item_id=%s', score, item_id)
-        if score and item_id and start_timestamp and end_timestamp:
-            duration = float(end_timestamp) - float(start_timestamp)
-            LOGGER.debug(float(start_timestamp))
-            LOGGER.debug(float(end_timestamp))
-            LOGGER.info(
-                'start=%s, end=%s, duration=%s',
-                start_timestamp,
-                end_timestamp,
-                duration,
-            )
+        if not result_fields or self.current_item is None:
+            return
 
-            current_item = current_task.next_item_for_user(request.user)
-            if (
-                current_item.itemID != int(item_id)
-                or current_item.id != int(task_id)
-                or current_item.documentID != document_id
-            ):
-                _msg = 'Item ID %s does not match item %s, will not save!'
-                LOGGER.debug(_msg, item_id, current_item.itemID)
+        if not (item_id and task_id and start_timestamp and end_timestamp):
+            return
 
-            else:
-                utc_now = datetime.utcnow().replace(tzinfo=utc)
-
-                # pylint: disable=E1101
-                DirectAssessmentContextResult.objects.create(
-                    score=score,
-                    start_time=float(start_timestamp),
-                    end_time=float(end_timestamp),
-                    item=current_item,
-                    task=current_task,
-                    createdBy=request.user,
-                    activated=False,
-                    completed=True,
-                    dateCompleted=utc_now,
-                )
-
-    t3 = datetime.now()
-
-    current_item, completed_items = current_task.next_item_for_user(
-        request.user, return_completed_items=True
-    )
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
-
-    # completed_items_check = current_task.completed_items_for_user(
-    #     request.user)
-    completed_blocks = int(completed_items / 10)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
-
-    source_language = current_task.marketSourceLanguage()
-    target_language = current_task.marketTargetLanguage()
-
-    t4 = datetime.now()
-
-    # Define priming question
-    #
-    # Default:
-    #   How accurately does the above candidate text convey the original
-    #   semantics of the source text? Slider ranges from
-    #   <em>Not at all</em> (left) to <em>Perfectly</em> (right).
-    #
-    # We currently allow specific overrides, based on campaign name.
-    reference_label = 'Source text'
-    candidate_label = 'Candidate translation'
-    priming_question_text = (
-        'How accurately does the above candidate text convey the original '
-        'semantics of the source text? Slider ranges from '
-        '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
-    )
-
-    if current_item.isCompleteDocument:
-        priming_question_text = (
-            'How accurately does the above candidate document convey the '
-            'original semantics of the source document? Slider ranges from '
-            '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
+        duration = float(end_timestamp) - float(start_timestamp)
+        LOGGER.info(
+            'start=%s, end=%s, duration=%s',
+            start_timestamp,
+            end_timestamp,
+            duration,
         )
 
-    _reference_campaigns = ('HumanEvalFY19{0}'.format(x) for x in ('7B',))
-
-    _adequacy_campaigns = (
-        'HumanEvalFY19{0}'.format(x) for x in ('51', '57', '63')
-    )
-
-    _fluency_campaigns = (
-        'HumanEvalFY19{0}'.format(x) for x in ('52', '58', '64')
-    )
-
-    if campaign.campaignName in _reference_campaigns:
-        reference_label = 'Reference text'
-        candidate_label = 'Candidate translation'
-        priming_question_text = (
-            'How accurately does the above candidate text convey the original '
-            'semantics of the reference text? Slider ranges from '
-            '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
-        )
+        if not self.is_current_item(self.request.POST):
+            _msg = 'Item ID %s does not match item %s, will not save!'
+            LOGGER.debug(_msg, item_id, self.current_item.itemID)
+            return
 
-    elif campaign.campaignName in _adequacy_campaigns:
-        reference_label = 'Candidate A'
-        candidate_label = 'Candidate B'
-        priming_question_text = (
-            'How accurately does candidate text B convey the original '
-            'semantics of candidate text A? Slider ranges from '
-            '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
+        self.save_result(
+            self.current_item, result_fields, start_timestamp, end_timestamp
         )
 
-    elif campaign.campaignName in _fluency_campaigns:
-        reference_label = 'Candidate A'
-        candidate_label = 'Candidate B'
-        priming_question_text = (
-            'Which of the two candidate texts is more fluent? Slider marks '
-            'preference for <em>Candidate A</em> (left), no difference '
-            '(middle) or preference for <em>Candidate B</em> (right).'
-        )
+    def submit_results(self, entries):
+        """
+        Saves results for given submitted entries if all of them are
+        complete and match the items expected next.
+
+        Returns number of saved results.
+        """
+        submitted = []
+        for data in entries:
+            result_fields = self.get_result_fields(data)
+            if not result_fields:
+                self.error_msg = 'Incomplete results submitted.'
+                return 0
+
+            submitted.append(
+                (result_fields, data['start_timestamp'], data['end_timestamp'])
+            )
 
-    context = {
-        'active_page': 'direct-assessment',
-        'reference_label': reference_label,
-        'reference_text': current_item.sourceText,
-        'reference_context_left': None, #current_item.sourceContextLeft,
-        'reference_context_right': None, #current_item.sourceContextRight,
-        'candidate_label': candidate_label,
-        'candidate_text': current_item.targetText,
-        'candidate_context_left': None, #current_item.targetContextLeft,
-        'candidate_context_right': None, #current_item.targetContextRight,
-        'priming_question_text': priming_question_text,
-        'item_id': current_item.itemID,
-        'task_id': current_item.id,
-        'document_id': current_item.documentID,
-        'isCompleteDocument': current_item.isCompleteDocument,
-        'completed_blocks': completed_blocks,
-        'items_left_in_block': 10
-        - (completed_items - completed_blocks * 10),
-        'source_language': source_language,
-        'target_language': target_language,
-        'debug_times': (t2 - t1, t3 - t2, t4 - t3, t4 - t1),
-        'template_debug': 'debug' in request.GET,
-        'campaign': campaign.campaignName,
-        'datask_id': current_task.id,
-        'trusted_user': current_task.is_trusted_user(request.user),
-    }
-    context.update(BASE_CONTEXT)
-
-    return render(
-        request, 'EvalView/direct-assessment-context.html', context
-    )
-
-
-# pylint: disable=C0103,C0330
-@login_required
-def direct_assessment_document(request, code=None, campaign_name=None):
-    """
-    Direct assessment document annotation view.
-    """
-    t1 = datetime.now()
+        items = None
+        if self.current_item is not None:
+            items = self.match_submitted_items(entries)
 
-    campaign = None
-    if campaign_name:
-        campaign = Campaign.objects.filter(campaignName=campaign_name)
-        if not campaign.exists():
-            _msg = (
-                'No campaign named "%s" exists, redirecting to dashboard'
+        if items is None:
+            self.error_msg = (
+                'We did not expect these items to be submitted. '
+                'If you used backward/forward buttons in your browser, '
+                'please reload the page and try again.'
             )
-            LOGGER.info(_msg, campaign_name)
-            return redirect('dashboard')
+            LOGGER.debug('Submitted items do not match, will not save!')
+            return 0
+
+        self.save_results([
+            (item, result_fields, start_timestamp, end_timestamp)
+            for item, (result_fields, start_timestamp, end_timestamp)
+            in zip(items, submitted)
+        ])
+        return len(items)
+
+    def get_result_fields(self, data):
+        """
+        Returns type specific result fields from POST data, or None if
+        required values are missing.
+        """
+        raise NotImplementedError
+
+    def is_current_item(self, data):
+        """
+        Checks if POST data has been submitted for the current item.
+        """
+        return self.is_submitted_item(self.current_item, data)
+
+    # pylint: disable=no-self-use
+    def is_submitted_item(self, item, data):
+        """
+        Checks if POST data has been submitted for given item.
+        """
+        return item.itemID == int(data['item_id']) \
+            and item.id == int(data['task_id'])
+
+    def match_submitted_items(self, entries):
+        """
+        Returns items for given submitted entries, or None if these are not
+        the next items of the current task for the user, in order.
+
+        Items are validated using a single status query for the task.
+        """
+        trusted_user = self.current_task.is_trusted_user(self.user)
+        next_ids = [
+            item_id
+            for item_id, item_type, is_completed
+            in self.current_task.get_item_status_for_user(self.user)
+            if not is_completed and (
+                not trusted_user
+                or self.current_task.is_trusted_item_type(item_type)
+            )
+        ]
+
+        submitted_ids = [int(data['task_id']) for data in entries]
+        if submitted_ids != next_ids[:len(submitted_ids)]:
+            return None
+
+        items = self.current_task.items.in_bulk(submitted_ids)
+        items = [items[item_id] for item_id in submitted_ids]
+        for item, data in zip(items, entries):
+            if not self.is_submitted_item(item, data):
+                return None
+
+        return items
+
+    def save_result(self, item, result_fields, start_timestamp, end_timestamp):
+        """
+        Creates completed result for given item and updates progress.
+        """
+        self.save_results(
+            [(item, result_fields, start_timestamp, end_timestamp)]
+        )
 
-        campaign = campaign[0]
+    def save_results(self, submitted):
+        """
+        Creates completed results for given (item, result_fields,
+        start_timestamp, end_timestamp) tuples and updates progress.
+
+        Results are inserted in bulk, which does not send model signals.
+        System score totals are hence updated explicitly; cached dashboard
+        totals are invalidated by the progress update.
+        """
+        if not submitted:
+            return
+
+        utc_now = datetime.utcnow().replace(tzinfo=utc)
+        result_cls = self.current_task.get_result_class()
+
+        results = [
+            result_cls(
+                start_time=float(start_timestamp),
+                end_time=float(end_timestamp),
+                item=item,
+                task=self.current_task,
+                createdBy=self.user,
+                activated=False,
+                completed=True,
+                dateCompleted=utc_now,
+                **result_fields
+            )
+            for item, result_fields, start_timestamp, end_timestamp
+            in submitted
+        ]
+
+        # pylint: disable=E1101
+        with transaction.atomic():
+            result_cls.objects.bulk_create(
+                results, batch_size=BULK_CREATE_BATCH_SIZE
+            )
 
-    LOGGER.info(
-        'Rendering direct assessment document view for user "%s".',
-        request.user.username or "Anonymous",
-    )
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
+            # Not all databases return primary keys for bulk inserts, so
+            # totals are computed from the results in memory otherwise.
+            if all(x.pk is not None for x in results):
+                SystemScoreAggregate.add_results(
+                    result_cls,
+                    result_cls.objects.filter(pk__in=[x.pk for x in results]),
+                )
 
-    # completed_items_check = current_task.completed_items_for_user(
-    #     request.user)
-    completed_blocks = int(completed_items / 10)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
+            else:
+                SystemScoreAggregate.add_result_instances(result_cls, results)
 
-    current_task = None
+            self.current_task.update_progress_for_user(self.user)
 
-    # Try to identify TaskAgenda for current user.
-    agendas = TaskAgenda.objects.filter(user=request.user)
+        self.result_saved = True
 
-    if campaign:
-        agendas = agendas.filter(campaign=campaign)
+    def get_base_context(self):
+        """
+        Returns context shared by all annotation views.
+        """
+        source_language, target_language = _get_language_names(
+            self.current_item
+        )
 
-    for agenda in agendas:
-        LOGGER.info('Identified work agenda %s', agenda)
+        context = {
+            'active_page': self.active_page,
+            'item_id': self.current_item.itemID,
+            'task_id': self.current_item.id,
+            'source_language': source_language,
+            'target_language': target_language,
+            'template_debug': 'debug' in self.request.GET,
+            'campaign': self.campaign.campaignName,
+            'datask_id': self.current_task.id,
+            'trusted_user': self.current_task.is_trusted_user(self.user),
+        }
+        context.update(self.get_progress_context())
+        return context
+
+    def get_progress_context(self):
+        """
+        Returns block progress context for blocks of ten items.
+        """
+        completed_blocks = int(self.completed_items / 10)
+        _msg = 'completed_items=%s, completed_blocks=%s'
+        LOGGER.info(_msg, self.completed_items, completed_blocks)
+
+        return {
+            'completed_blocks': completed_blocks,
+            'items_left_in_block': 10
+            - (self.completed_items - completed_blocks * 10),
+        }
 
-        tasks_to_complete = []
-        for serialized_open_task in agenda.serialized_open_tasks():
-            open_task = serialized_open_task.get_object_instance()
+    def get_context(self):
+        """
+        Returns type specific template context for the current item.
+        """
+        raise NotImplementedError
 
-            # Skip tasks which are not available anymore
-            if open_task is None:
-                continue
-
-            if open_task.next_item_for_user(request.user) is not None:
-                current_task = open_task
-                if not campaign:
-                    campaign = agenda.campaign
-            else:
-                tasks_to_complete.append(serialized_open_task)
+    def get_item_payload(self):
+        """
+        Returns JSON serializable item context for submission responses.
+        """
+        return self.get_context()
 
-        modified = False
-        for task in tasks_to_complete:
-            modified = agenda.complete_open_task(task) or modified
+    def render(self, context):
+        """
+        Returns response for given template context.
+        """
+        return render(self.request, self.template_name, context)
 
-        if modified:
-            agenda.save()
 
-    if not current_task and agendas.count() > 0:
-        LOGGER.info('Work agendas completed, redirecting to dashboard')
-        LOGGER.info('- code=%s, campaign=%s', code, campaign)
-        return redirect('dashboard')
+class DirectAssessmentView(AnnotationView):
+    """
+    Direct assessment annotation view.
+    """
 
-    # If language code has been given, find a free task and assign to user.
-    if not current_task:
-        current_task = DirectAssessmentDocumentTask.get_task_for_user(
-            user=request.user
+    task_cls = DirectAssessmentTask
+    template_name = 'EvalView/direct-assessment.html'
+    active_page = 'direct-assessment'
+    view_name = 'direct assessment'
+
+    # pylint: disable=no-self-use
+    def get_result_fields(self, data):
+        score = data.get('score', None)
+        return {'score': score} if score else None
+
+    def get_priming_question_text(self):
+        """
+        Returns default priming question for the current item.
+        """
+        return (
+            'How accurately does the above candidate text convey the original '
+            'semantics of the source text? Slider ranges from '
+            '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
         )
 
-    if not current_task:
-        if code is None or campaign is None:
-            LOGGER.info(
-                'No current task detected, redirecting to dashboard'
+    def get_context(self):
+        # Define priming question
+        #
+        # Default:
+        #   How accurately does the above candidate text convey the original
+        #   semantics of the source text? Slider ranges from
+        #   <em>Not at all</em> (left) to <em>Perfectly</em> (right).
+        #
+        # We currently allow specific overrides, based on campaign name.
+        reference_label = 'Source text'
+        candidate_label = 'Candidate translation'
+        priming_question_text = self.get_priming_question_text()
+
+        if self.campaign.campaignName in REFERENCE_CAMPAIGNS:
+            reference_label = 'Reference text'
+            candidate_label = 'Candidate translation'
+            priming_question_text = (
+                'How accurately does the above candidate text convey the original '
+                'semantics of the reference text? Slider ranges from '
+                '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
             )
-            LOGGER.info('- code=%s, campaign=%s', code, campaign)
-            return redirect('dashboard')
-
-        LOGGER.info(
-            'Identifying next task for code "%s", campaign="%s"',
-            code,
-            campaign,
-        )
-        next_task = DirectAssessmentDocumentTask.get_next_free_task_for_language(
-            code, campaign, request.user
-        )
-
-        if next_task is None:
-            LOGGER.info('No next task detected, redirecting to dashboard')
-            return redirect('dashboard')
-
-        next_task.assignedTo.add(request.user)
-        next_task.save()
-
-        current_task = next_task
 
-    if current_task:
-        if not campaign:
-            campaign = current_task.campaign
-
-        elif campaign.campaignName != current_task.campaign.campaignName:
-            _msg = (
-                'Incompatible campaign given, using item campaign instead!'
+        elif self.campaign.campaignName in ADEQUACY_CAMPAIGNS:
+            reference_label = 'Candidate A'
+            candidate_label = 'Candidate B'
+            priming_question_text = (
+                'How accurately does candidate text B convey the original '
+                'semantics of candidate text A? Slider ranges from '
+                '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
             )
-            LOGGER.info(_msg)
-            campaign = current_task.campaign
 
-    # Handling POST requests differs from the original direct_assessment/
-    # direct_assessment_context view, but the input is the same: a score for the
-    # single submitted item
-    t2 = datetime.now()
-    ajax = False
-    item_saved = False
-    error_msg = ''
-    if request.method == "POST":
-        score = request.POST.get('score', None)
-        item_id = request.POST.get('item_id', None)
-        task_id = request.POST.get('task_id', None)
-        document_id = request.POST.get('document_id', None)
-        start_timestamp = request.POST.get('start_timestamp', None)
-        end_timestamp = request.POST.get('end_timestamp', None)
-        ajax = bool(request.POST.get('ajax', None) == 'True')
-
-        LOGGER.info('score=%s, item_id=%s', score, item_id)
-        print('Got request score={0}, item_id={1}, ajax={2}'.format(score, item_id, ajax))
-
-        # If all required information was provided in the POST request
-        if score and item_id and start_timestamp and end_timestamp:
-            duration = float(end_timestamp) - float(start_timestamp)
-            LOGGER.debug(float(start_timestamp))
-            LOGGER.debug(float(end_timestamp))
-            LOGGER.info(
-                'start=%s, end=%s, duration=%s',
-                start_timestamp,
-                end_timestamp,
-                duration,
+        elif self.campaign.campaignName in FLUENCY_CAMPAIGNS:
+            reference_label = 'Candidate A'
+            candidate_label = 'Candidate B'
+            priming_question_text = (
+                'Which of the two candidate texts is more fluent? Slider marks '
+                'preference for <em>Candidate A</em> (left), no difference '
+                '(middle) or preference for <em>Candidate B</em> (right).'
             )
 
-            # Get all items from the document that the submitted item belongs
-            # to, and all already collected scores for this document
-            current_item, block_items, block_results = current_task.next_document_for_user(
-                request.user, return_statistics=False)
-
-            # An item from the right document was submitted
-            if current_item.documentID == document_id:
-                # This is the item that we expected to be annotated first,
-                # which means that there is no score for the current item, so
-                # create new score
-                if current_item.itemID == int(item_id) \
-                        and current_item.id == int(task_id):
-
-                    utc_now = datetime.utcnow().replace(tzinfo=utc)
-                    # pylint: disable=E1101
-                    DirectAssessmentDocumentResult.objects.create(
-                        score=score,
-                        start_time=float(start_timestamp),
-                        end_time=float(end_timestamp),
-                        item=current_item,
-                        task=current_task,
-                        createdBy=request.user,
-                        activated=False,
-                        completed=True,
-                        dateCompleted=utc_now,
-                    )
-                    print('Item {} (itemID={}) saved'.format(task_id, item_id))
-                    item_saved = True
-
-                # It is not the current item, so check if the result for it
-                # exists
-                else:
-                    # Check if there is a score result for the submitted item
-                    # TODO: this could be a single query, would it be better or
-                    # more effective?
-                    current_result = None
-                    for result in block_results:
-                        if not result:
-                            continue
-                        if result.item.itemID == int(item_id) and result.item.id == int(task_id):
-                            current_result = result
-                            break
-
-                    # If already scored, update the result
-                    # TODO: consider adding new score, not updating the
-                    # previous one
-                    if current_result:
-                        prev_score = current_result.score
-                        current_result.score = score
-                        current_result.start_time=float(start_timestamp)
-                        current_result.end_time=float(end_timestamp)
-                        utc_now = datetime.utcnow().replace(tzinfo=utc)
-                        current_result.dateCompleted=utc_now
-                        current_result.save()
-                        _msg = 'Item {} (itemID={}) updated {}->{}' \
-                            .format(task_id, item_id, prev_score, score)
-                        LOGGER.debug(_msg)
-                        print(_msg)
-                        item_saved = True
-
-                    # If not yet scored, check if the submitted item is from
-                    # the expected document. Note that document ID is **not**
-                    # sufficient, because there can be multiple documents with
-                    # the same ID in the task.
-                    else:
-                        found_item = False
-                        for item in block_items:
-                            if item.itemID == int(item_id) and item.id == int(task_id):
-                                found_item = item
-                                break
-
-                        # The submitted item is from the same document as the
-                        # first unannotated item. It is fine, so save it
-                        if found_item:
-                            utc_now = datetime.utcnow().replace(tzinfo=utc)
-                            # pylint: disable=E1101
-                            DirectAssessmentDocumentResult.objects.create(
-                                score=score,
-                                start_time=float(start_timestamp),
-                                end_time=float(end_timestamp),
-                                item=found_item,
-                                task=current_task,
-                                createdBy=request.user,
-                                activated=False,
-                                completed=True,
-                                dateCompleted=utc_now,
-                            )
-                            _msg = 'Item {} (itemID={}) saved, although it was not the next item' \
-                                .format(task_id, item_id)
-                            LOGGER.debug(_msg)
-                            print(_msg)
-                            item_saved = True
-
-                        else:
-                            error_msg = (
-                                'We did not expect this item to be submitted. '
-                                'If you used backward/forward buttons in your browser, '
-                                'please reload the page and try again.'
-                            )
-
-                            _msg = 'Item ID {} does not match item {}, will not save!' \
-                                .format(item_id, current_item.itemID)
-                            LOGGER.debug(_msg)
-                            print(_msg)
-
-            # An item from a wrong document was submitted
-            else:
-                print(
-                    'Different document IDs: {} != {}, will not save!' \
-                    .format(current_item.documentID, document_id)
-                )
+        return {
+            'reference_label': reference_label,
+            'reference_text': self.current_item.sourceText,
+            'candidate_label': candidate_label,
+            'candidate_text': self.current_item.targetText,
+            'priming_question_text': priming_question_text,
+        }
 
-                error_msg = (
-                    'We did not expect an item from this document to be submitted. '
-                    'If you used backward/forward buttons in your browser, '
-                    'please reload the page and try again.'
-                )
 
-    t3 = datetime.now()
-
-    # Get all items from the document that the first unannotated item in the
-    # task belongs to, and collect some additional statistics
-    (
-        current_item,
-        completed_items,
-        completed_blocks,
-        completed_items_in_block,
-        block_items,
-        block_results,
-        total_blocks,
-    ) = current_task.next_document_for_user(request.user)
-
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
-
-    # Get item scores from the latest corresponding results
-    block_scores = []
-    for item, result in zip(block_items, block_results):
-        item_scores = {
-            'completed': bool(result and result.score > -1),
-            'current_item': bool(item.id == current_item.id),
-            'score': result.score if result else -1,
-        }
-        block_scores.append(item_scores)
-
-    # completed_items_check = current_task.completed_items_for_user(
-    #     request.user)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
-
-    source_language = current_task.marketSourceLanguage()
-    target_language = current_task.marketTargetLanguage()
-
-    t4 = datetime.now()
-
-    reference_label = 'Source text'
-    candidate_label = 'Candidate translation'
-
-    priming_question_texts = [
-        'Below you see a document with {0} sentences in {1} '
-        'and their corresponding candidate translations in {2}. '
-        'Score each candidate translation in the document context, answering the question: ' \
-            .format(len(block_items), source_language, target_language),
-
-        'How accurately does the candidate text (right column, in bold) convey '
-        'the original semantics of the source text (left column) in the document context? ',
-
-        'You may revisit already scored sentences and update their scores at any time '
-        'by clicking at a source text.'
-    ]
-    document_question_texts = [
-        'Please score the document translation above answering the question '
-        '(you can score the entire document only after scoring all previous sentences):',
-
-        'How accurately does the <strong>entire</strong> candidate document in '
-        '{0} (right column) convey '
-        'the original semantics of the source document in {1} (left column)? '.format(target_language, source_language)
-    ]
-
-    # A part of context used in responses to both Ajax and standard POST
-    # requests
-    context = {
-        'active_page': 'direct-assessment-document',
-        'item_id': current_item.itemID,
-        'task_id': current_item.id,
-        'document_id': current_item.documentID,
-        'completed_blocks': completed_blocks,
-        'total_blocks': total_blocks,
-        'items_left_in_block': len(block_items) - completed_items_in_block,
-        'source_language': source_language,
-        'target_language': target_language,
-        'debug_times': (t2 - t1, t3 - t2, t4 - t3, t4 - t1),
-        'template_debug': 'debug' in request.GET,
-        'campaign': campaign.campaignName,
-        'datask_id': current_task.id,
-        'trusted_user': current_task.is_trusted_user(request.user),
-    }
-
-    if ajax:
-        ajax_context = { 'saved': item_saved, 'error_msg': error_msg }
-        context.update(ajax_context)
-        context.update(BASE_CONTEXT)
-        return JsonResponse(context)  # Sent response to the Ajax POST request
-
-    page_context = {
-        'items': zip(block_items, block_scores),
-        'reference_label': reference_label,
-        'candidate_label': candidate_label,
-        'priming_question_texts': priming_question_texts,
-        'document_question_texts': document_question_texts,
-    }
-    context.update(page_context)
-    context.update(BASE_CONTEXT)
-
-    return render(
-        request, 'EvalView/direct-assessment-document.html', context
-    )
-
-
-# pylint: disable=C0103,C0330
-@login_required
-def multimodal_assessment(request, code=None, campaign_name=None):
+class DirectAssessmentContextView(DirectAssessmentView):
     """
-    Multi modal assessment annotation view.
+    Direct assessment context annotation view.
     """
-    t1 = datetime.now()
 
-    campaign = None
-    if campaign_name:
-        campaign = Campaign.objects.filter(campaignName=campaign_name)
-        if not campaign.exists():
-            _msg = (
-                'No campaign named "%s" exists, redirecting to dashboard'
+    task_cls = DirectAssessmentContextTask
+    template_name = 'EvalView/direct-assessment-context.html'
+    view_name = 'direct assessment context'
+
+    def is_submitted_item(self, item, data):
+        return super(DirectAssessmentContextView, self).is_submitted_item(
+            item, data
+        ) and item.documentID == data.get('document_id', None)
+
+    def get_priming_question_text(self):
+        if self.current_item.isCompleteDocument:
+            return (
+                'How accurately does the above candidate document convey the '
+                'original semantics of the source document? Slider ranges from '
+                '<em>Not at all</em> (left) to <em>Perfectly</em> (right).'
             )
-            LOGGER.info(_msg, campaign_name)
-            return redirect('dashboard')
 
-        campaign = campaign[0]
+        return super(
+            DirectAssessmentContextView, self
+        ).get_priming_question_text()
 
-    LOGGER.info(
-        'Rendering multimodal assessment view for user "%s".',
-        request.user.username or "Anonymous",
-    )
+    def get_context(self):
+        context = super(DirectAssessmentContextView, self).get_context()
+        context.update({
+            'reference_context_left': None, #current_item.sourceContextLeft,
+            'reference_context_right': None, #current_item.sourceContextRight,
+            'candidate_context_left': None, #current_item.targetContextLeft,
+            'candidate_context_right': None, #current_item.targetContextRight,
+            'document_id': self.current_item.documentID,
+            'isCompleteDocument': self.current_item.isCompleteDocument,
+        })
+        return context
 
-    current_task = None
 
-    # Try to identify TaskAgenda for current user.
-    agendas = TaskAgenda.objects.filter(user=request.user)
+class DirectAssessmentDocumentView(AnnotationView):
+    """
+    Direct assessment document annotation view.
 
-    if campaign:
-        agendas = agendas.filter(campaign=campaign)
+    Items are annotated per document. Results for any item of the current
+    document may be submitted or updated, optionally using Ajax requests
+    which are answered with JSON responses.
+    """
 
-    for agenda in agendas:
-        modified = False
-        LOGGER.info('Identified work agenda %s', agenda)
+    task_cls = DirectAssessmentDocumentTask
+    template_name = 'EvalView/direct-assessment-document.html'
+    active_page = 'direct-assessment-document'
+    view_name = 'direct assessment document'
 
-        tasks_to_complete = []
-        for serialized_open_task in agenda.serialized_open_tasks():
-            open_task = serialized_open_task.get_object_instance()
+    def __init__(self, request, code=None, campaign_name=None):
+        super(DirectAssessmentDocumentView, self).__init__(
+            request, code, campaign_name
+        )
+        self.document = None
+        self.ajax = False
+
+    def get_document(self):
+        """
+        Returns next_document_for_user() statistics tuple for the user,
+        computing it only once unless a result has been saved.
+        """
+        if self.document is None:
+            self.document = self.current_task.next_document_for_user(
+                self.user
+            )
 
-            # Skip tasks which are not available anymore
-            if open_task is None:
-                continue
+        return self.document
 
-            if open_task.next_item_for_user(request.user) is not None:
-                current_task = open_task
-                if not campaign:
-                    campaign = agenda.campaign
-            else:
-                tasks_to_complete.append(serialized_open_task)
+    def resolve_item(self):
+        if self.result_saved:
+            self.document = None
 
-        for task in tasks_to_complete:
-            modified = agenda.complete_open_task(task) or modified
+        self.current_item = self.get_document()[0]
+        return self.current_item is not None
 
-        if modified:
-            agenda.save()
+    # pylint: disable=no-self-use
+    def get_result_fields(self, data):
+        score = data.get('score', None)
+        return {'score': score} if score else None
 
-    if not current_task and agendas.count() > 0:
-        LOGGER.info('Work agendas completed, redirecting to dashboard')
-        LOGGER.info('- code=%s, campaign=%s', code, campaign)
-        return redirect('dashboard')
+    # Handling POST requests differs from the original direct_assessment/
+    # direct_assessment_context view, but the input is the same: a score for the
+    # single submitted item
+    def handle_post(self):
+        score = self.request.POST.get('score', None)
+        item_id = self.request.POST.get('item_id', None)
+        task_id = self.request.POST.get('task_id', None)
+        document_id = self.request.POST.get('document_id', None)
+        start_timestamp = self.request.POST.get('start_timestamp', None)
+        end_timestamp = self.request.POST.get('end_timestamp', None)
+        self.ajax = bool(self.request.POST.get('ajax', None) == 'True')
 
-    # If language code has been given, find a free task and assign to user.
-    if not current_task:
-        current_task = MultiModalAssessmentTask.get_task_for_user(
-            user=request.user
+        LOGGER.info(
+            'score=%s, item_id=%s, ajax=%s', score, item_id, self.ajax
         )
 
-    if not current_task:
-        if code is None or campaign is None:
-            LOGGER.info(
-                'No current task detected, redirecting to dashboard'
-            )
-            LOGGER.info('- code=%s, campaign=%s', code, campaign)
-            return redirect('dashboard')
+        # If all required information was provided in the POST request
+        if not (score and item_id and task_id
+                and start_timestamp and end_timestamp):
+            return
 
-        _msg = 'Identifying next task for code "%s", campaign="%s"'
-        LOGGER.info(_msg, code, campaign)
-        next_task = MultiModalAssessmentTask.get_next_free_task_for_language(
-            code, campaign, request.user
+        duration = float(end_timestamp) - float(start_timestamp)
+        LOGGER.info(
+            'start=%s, end=%s, duration=%s',
+            start_timestamp,
+            end_timestamp,
+            duration,
         )
 
-        if next_task is None:
-            LOGGER.info('No next task detected, redirecting to dashboard')
-            return redirect('dashboard')
-
-        next_task.assignedTo.add(request.user)
-        next_task.save()
-
-        current_task = next_task
+        # Get all items from the document that the submitted item belongs
+        # to, and all already collected scores for this document
+        current_item, _, _, _, block_items, block_results, _ = \
+            self.get_document()
 
-    if current_task:
-        if not campaign:
-            campaign = current_task.campaign
+        if current_item is None:
+            return
 
-        elif campaign.campaignName != current_task.campaign.campaignName:
-            _msg = (
-                'Incompatible campaign given, using item campaign instead!'
+        # An item from a wrong document was submitted
+        if current_item.documentID != document_id:
+            LOGGER.debug(
+                'Different document IDs: %s != %s, will not save!',
+                current_item.documentID,
+                document_id,
             )
-            LOGGER.info(_msg)
-            campaign = current_task.campaign
-
-    t2 = datetime.now()
-    if request.method == "POST":
-        score = request.POST.get('score', None)
-        item_id = request.POST.get('item_id', None)
-        task_id = request.POST.get('task_id', None)
-        start_timestamp = request.POST.get('start_timestamp', None)
-        end_timestamp = request.POST.get('end_timestamp', None)
-        LOGGER.info('score=%s, item_id=%s', score, item_id)
-        if score and item_id and start_timestamp and end_timestamp:
-            duration = float(end_timestamp) - float(start_timestamp)
-            LOGGER.debug(float(start_timestamp))
-            LOGGER.debug(float(end_timestamp))
-            LOGGER.info(
-                'start=%s, end=%s, duration=%s',
-                start_timestamp,
-                end_timestamp,
-                duration,
-            )
-
-            current_item = current_task.next_item_for_user(request.user)
-            if current_item.itemID != int(
-                item_id
-            ) or current_item.id != int(task_id):
-                _msg = 'Item ID %s does not match  item %s, will not save!'
-                LOGGER.debug(_msg, item_id, current_item.itemID)
-
-            else:
-                utc_now = datetime.utcnow().replace(tzinfo=utc)
-
-                # pylint: disable=E1101
-                MultiModalAssessmentResult.objects.create(
-                    score=score,
-                    start_time=float(start_timestamp),
-                    end_time=float(end_timestamp),
-                    item=current_item,
-                    task=current_task,
-                    createdBy=request.user,
-                    activated=False,
-                    completed=True,
-                    dateCompleted=utc_now,
-                )
-
-    t3 = datetime.now()
-
-    current_item, completed_items = current_task.next_item_for_user(
-        request.user, return_completed_items=True
-    )
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
-
-    # completed_items_check = current_task.completed_items_for_user(
-    #     request.user)
-    completed_blocks = int(completed_items / 10)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
-
-    source_language = current_task.marketSourceLanguage()
-    target_language = current_task.marketTargetLanguage()
-
-    t4 = datetime.now()
-
-    context = {
-        'active_page': 'multimodal-assessment',
-        'reference_text': current_item.sourceText,
-        'candidate_text': current_item.targetText,
-        'image_url': current_item.imageURL,
-        'item_id': current_item.itemID,
-        'task_id': current_item.id,
-        'completed_blocks': completed_blocks,
-        'items_left_in_block': 10
-        - (completed_items - completed_blocks * 10),
-        'source_language': source_language,
-        'target_language': target_language,
-        'debug_times': (t2 - t1, t3 - t2, t4 - t3, t4 - t1),
-        'template_debug': 'debug' in request.GET,
-        'campaign': campaign.campaignName,
-        'datask_id': current_task.id,
-        'trusted_user': current_task.is_trusted_user(request.user),
-    }
-    context.update(BASE_CONTEXT)
-
-    return render(request, 'EvalView/multimodal-assessment.html', context)
-
-
-# pylint: disable=C0103,C0330
-@login_required
-def pairwise_assessment(request, code=None, campaign_name=None):
-    """
-    Pairwise direct assessment annotation view.
-    """
-    t1 = datetime.now()
 
-    campaign = None
-    if campaign_name:
-        campaign = Campaign.objects.filter(campaignName=campaign_name)
-        if not campaign.exists():
-            _msg = (
-                'No campaign named "%s" exists, redirecting to dashboard'
+            self.error_msg = (
+                'We did not expect an item from this document to be submitted. '
+                'If you used backward/forward buttons in your browser, '
+                'please reload the page and try again.'
             )
-            LOGGER.info(_msg, campaign_name)
-            return redirect('dashboard')
-
-        campaign = campaign[0]
-
-    LOGGER.info(
-        'Rendering pairwise direct assessment view for user "%s".',
-        request.user.username or "Anonymous",
-    )
-
-    current_task = None
-
-    # Try to identify TaskAgenda for current user.
-    agendas = TaskAgenda.objects.filter(user=request.user)
-
-    if campaign:
-        agendas = agendas.filter(campaign=campaign)
-
-    for agenda in agendas:
-        LOGGER.info('Identified work agenda %s', agenda)
-
-        tasks_to_complete = []
-        for serialized_open_task in agenda.serialized_open_tasks():
-            open_task = serialized_open_task.get_object_instance()
+            return
+
+        # This is the item that we expected to be annotated first, which
+        # means that there is no score for the current item, so create new
+        # score
+        if current_item.itemID == int(item_id) \
+                and current_item.id == int(task_id):
+            self.save_result(
+                current_item, {'score': score}, start_timestamp, end_timestamp
+            )
+            LOGGER.debug('Item %s (itemID=%s) saved', task_id, item_id)
+            return
 
-            # Skip tasks which are not available anymore
-            if open_task is None:
+        # It is not the current item, so check if the result for it exists
+        current_result = None
+        for result in block_results:
+            if not result:
                 continue
-
-            if open_task.next_item_for_user(request.user) is not None:
-                current_task = open_task
-                if not campaign:
-                    campaign = agenda.campaign
-            else:
-                tasks_to_complete.append(serialized_open_task)
-
-        modified = False
-        for task in tasks_to_complete:
-            modified = agenda.complete_open_task(task) or modified
-
-        if modified:
-            agenda.save()
-
-    if not current_task and agendas.count() > 0:
-        LOGGER.info('Work agendas completed, redirecting to dashboard')
-        LOGGER.info('- code=%s, campaign=%s', code, campaign)
-        return redirect('dashboard')
-
-    # If language code has been given, find a free task and assign to user.
-    if not current_task:
-        current_task = PairwiseAssessmentTask.get_task_for_user(
-            user=request.user
-        )
-
-    if not current_task:
-        if code is None or campaign is None:
-            LOGGER.info(
-                'No current task detected, redirecting to dashboard'
+            if result.item.itemID == int(item_id) \
+                    and result.item.id == int(task_id):
+                current_result = result
+                break
+
+        # If already scored, update the result
+        # TODO: consider adding new score, not updating the previous one
+        if current_result:
+            prev_score = current_result.score
+            current_result.score = score
+            current_result.start_time = float(start_timestamp)
+            current_result.end_time = float(end_timestamp)
+            utc_now = datetime.utcnow().replace(tzinfo=utc)
+            current_result.dateCompleted = utc_now
+            current_result.save()
+            LOGGER.debug(
+                'Item %s (itemID=%s) updated %s->%s',
+                task_id, item_id, prev_score, score,
             )
-            LOGGER.info('- code=%s, campaign=%s', code, campaign)
-            return redirect('dashboard')
+            self.result_saved = True
+            return
+
+        # If not yet scored, check if the submitted item is from the
+        # expected document. Note that document ID is **not** sufficient,
+        # because there can be multiple documents with the same ID in the
+        # task.
+        found_item = None
+        for item in block_items:
+            if item.itemID == int(item_id) and item.id == int(task_id):
+                found_item = item
+                break
+
+        # The submitted item is from the same document as the first
+        # unannotated item. It is fine, so save it
+        if found_item:
+            self.save_result(
+                found_item, {'score': score}, start_timestamp, end_timestamp
+            )
+            LOGGER.debug(
+                'Item %s (itemID=%s) saved, although it was not the next item',
+                task_id, item_id,
+            )
+            return
 
-        LOGGER.info(
-            'Identifying next task for code "%s", campaign="%s"',
-            code,
-            campaign,
+        self.error_msg = (
+            'We did not expect this item to be submitted. '
+            'If you used backward/forward buttons in your browser, '
+            'please reload the page and try again.'
         )
-        next_task = PairwiseAssessmentTask.get_next_free_task_for_language(
-            code, campaign, request.user
+        LOGGER.debug(
+            'Item ID %s does not match item %s, will not save!',
+            item_id, current_item.itemID,
         )
 
-        if next_task is None:
-            LOGGER.info('No next task detected, redirecting to dashboard')
-            return redirect('dashboard')
-
-        next_task.assignedTo.add(request.user)
-        next_task.save()
+    def match_submitted_items(self, entries):
+        """
+        Returns items for given submitted entries, or None if any of them
+        is not an item of the current document. Results for items which
+        have been annotated already are updated by save_results().
+        """
+        current_item, _, _, _, block_items, _, _ = self.get_document()
+
+        items = []
+        for data in entries:
+            if data.get('document_id', None) != current_item.documentID:
+                return None
+
+            found_item = None
+            for item in block_items:
+                if self.is_submitted_item(item, data):
+                    found_item = item
+                    break
+
+            if found_item is None or found_item in items:
+                return None
+
+            items.append(found_item)
+
+        return items
+
+    def save_results(self, submitted):
+        """
+        Updates existing results of the current document and creates
+        results for all other submitted items.
+
+        Updated results change existing totals, so system scores of the
+        user are recomputed for the campaign.
+        """
+        _, _, _, _, block_items, block_results, _ = self.get_document()
+        existing_results = {
+            item.id: result
+            for item, result in zip(block_items, block_results)
+            if result
+        }
 
-        current_task = next_task
+        utc_now = datetime.utcnow().replace(tzinfo=utc)
+        new_results = []
+        updated_results = []
+        for item, result_fields, start_timestamp, end_timestamp in submitted:
+            result = existing_results.get(item.id)
+            if result is None:
+                new_results.append(
+                    (item, result_fields, start_timestamp, end_timestamp)
+                )
+                continue
 
-    if current_task:
-        if not campaign:
-            campaign = current_task.campaign
+            result.score = result_fields['score']
+            result.start_time = float(start_timestamp)
+            result.end_time = float(end_timestamp)
+            result.dateCompleted = utc_now
+            result.dateModified = utc_now
+            updated_results.append(result)
+
+        # pylint: disable=E1101
+        with transaction.atomic():
+            if updated_results:
+                result_cls = self.current_task.get_result_class()
+                result_cls.objects.bulk_update(
+                    updated_results,
+                    ['score', 'start_time', 'end_time',
+                     'dateCompleted', 'dateModified'],
+                    batch_size=BULK_CREATE_BATCH_SIZE,
+                )
+                SystemScoreAggregate.rebuild(
+                    result_cls,
+                    campaign_ids=[self.current_task.campaign_id],
+                    user_ids=[self.user.id],
+                )
+                self.result_saved = True
 
-        elif campaign.campaignName != current_task.campaign.campaignName:
-            _msg = (
-                'Incompatible campaign given, using item campaign instead!'
-            )
-            LOGGER.info(_msg)
-            campaign = current_task.campaign
-
-    t2 = datetime.now()
-    if request.method == "POST":
-        score1 = request.POST.get('score', None)    # TODO: score -> score1
-        score2 = request.POST.get('score2', None)
-        item_id = request.POST.get('item_id', None)
-        task_id = request.POST.get('task_id', None)
-        start_timestamp = request.POST.get('start_timestamp', None)
-        end_timestamp = request.POST.get('end_timestamp', None)
-
-        print('score1={0}, score2={1}, item_id={2}'.format(score1, score2, item_id))
-        LOGGER.info('score1=%s, score2=%s, item_id=%s', score1, score2, item_id)
-
-        if score1 and item_id and start_timestamp and end_timestamp:
-            duration = float(end_timestamp) - float(start_timestamp)
-            LOGGER.debug(float(start_timestamp))
-            LOGGER.debug(float(end_timestamp))
-            LOGGER.info(
-                'start=%s, end=%s, duration=%s',
-                start_timestamp,
-                end_timestamp,
-                duration,
+            super(DirectAssessmentDocumentView, self).save_results(
+                new_results
             )
 
-            current_item = current_task.next_item_for_user(request.user)
-            if current_item.itemID != int(
-                item_id
-            ) or current_item.id != int(task_id):
-                _msg = 'Item ID %s does not match item %s, will not save!'
-                LOGGER.debug(_msg, item_id, current_item.itemID)
+    def get_progress_context(self):
+        (
+            _,
+            completed_items,
+            completed_blocks,
+            completed_items_in_block,
+            block_items,
+            _,
+            total_blocks,
+        ) = self.get_document()
+
+        _msg = 'completed_items=%s, completed_blocks=%s'
+        LOGGER.info(_msg, completed_items, completed_blocks)
+
+        return {
+            'document_id': self.current_item.documentID,
+            'completed_blocks': completed_blocks,
+            'total_blocks': total_blocks,
+            'items_left_in_block': len(block_items) - completed_items_in_block,
+        }
 
-            else:
-                utc_now = datetime.utcnow().replace(tzinfo=utc)
-
-                # pylint: disable=E1101
-                PairwiseAssessmentResult.objects.create(
-                    score1=score1,
-                    score2=score2,
-                    start_time=float(start_timestamp),
-                    end_time=float(end_timestamp),
-                    item=current_item,
-                    task=current_task,
-                    createdBy=request.user,
-                    activated=False,
-                    completed=True,
-                    dateCompleted=utc_now,
-                )
+    def get_context(self):
+        # A part of context used in responses to both Ajax and standard POST
+        # requests is added by get_base_context()
+        if self.ajax:
+            return {'saved': self.result_saved, 'error_msg': self.error_msg}
 
-    t3 = datetime.now()
-
-    current_item, completed_items = current_task.next_item_for_user(
-        request.user, return_completed_items=True
-    )
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
-
-    # completed_items_check = current_task.completed_items_for_user(
-    #     request.user)
-    completed_blocks = int(completed_items / 10)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
-
-    source_language = current_task.marketSourceLanguage()
-    target_language = current_task.marketTargetLanguage()
-
-    t4 = datetime.now()
-
-    # Define priming question
-    #
-    # Default:
-    #   How accurately does the above candidate text convey the original
-    #   semantics of the source text? Slider ranges from
-    #   <em>Not at all</em> (left) to <em>Perfectly</em> (right).
-    #
-    # We currently allow specific overrides, based on campaign name.
-    reference_label = 'Source text'
-    candidate1_label = 'Candidate translation (1)'
-    candidate2_label = 'Candidate translation (2)'
-
-    priming_question_text = (
-        'How accurately does each of the candidate text(s) below convey '
-        'the original semantics of the source text above?'
-    )
-
-    if current_item.has_context():
-        # Added 'bolded' to avoid confusion with context sentences that are
-        # displayed in a grey color.
-        priming_question_text = (
-            'How accurately does each of the candidate text(s) below convey '
-            'the original semantics of the bolded source text above?'
+        block_items = self.get_document()[4]
+        block_scores = self.get_block_scores()
+
+        source_language, target_language = _get_language_names(
+            self.current_item
         )
 
-    candidate1_text, candidate2_text = current_item.target_texts_with_diffs()
-
-    context = {
-        'active_page': 'pairwise-assessment',
-        'reference_label': reference_label,
-        'reference_text': current_item.segmentText,
-        'context_left': current_item.context_left(),
-        'context_right': current_item.context_right(),
-        'candidate_label': candidate1_label,
-        'candidate_text': candidate1_text,
-        'candidate2_label': candidate2_label,
-        'candidate2_text': candidate2_text,
-        'priming_question_text': priming_question_text,
-        'item_id': current_item.itemID,
-        'task_id': current_item.id,
-        'completed_blocks': completed_blocks,
-        'items_left_in_block': 10
-        - (completed_items - completed_blocks * 10),
-        'source_language': source_language,
-        'target_language': target_language,
-        'debug_times': (t2 - t1, t3 - t2, t4 - t3, t4 - t1),
-        'template_debug': 'debug' in request.GET,
-        'campaign': campaign.campaignName,
-        'datask_id': current_task.id,
-        'trusted_user': current_task.is_trusted_user(request.user),
-    }
-    context.update(BASE_CONTEXT)
-
-    return render(request, 'EvalView/pairwise-assessment.html', context)
-
-
-# pylint: disable=C0103,C0330
-@login_required
-def data_assessment(request, code=None, campaign_name=None):
-    """
-    Direct data assessment annotation view.
-    """
-    t1 = datetime.now()
+        priming_question_texts = [
+            'Below you see a document with {0} sentences in {1} '
+            'and their corresponding candidate translations in {2}. '
+            'Score each candidate translation in the document context, answering the question: ' \
+                .format(len(block_items), source_language, target_language),
+
+            'How accurately does the candidate text (right column, in bold) convey '
+            'the original semantics of the source text (left column) in the document context? ',
+
+            'You may revisit already scored sentences and update their scores at any time '
+            'by clicking at a source text.'
+        ]
+        document_question_texts = [
+            'Please score the document translation above answering the question '
+            '(you can score the entire document only after scoring all previous sentences):',
+
+            'How accurately does the <strong>entire</strong> candidate document in '
+            '{0} (right column) convey '
+            'the original semantics of the source document in {1} (left column)? '.format(target_language, source_language)
+        ]
+
+        return {
+            'items': zip(block_items, block_scores),
+            'reference_label': 'Source text',
+            'candidate_label': 'Candidate translation',
+            'priming_question_texts': priming_question_texts,
+            'document_question_texts': document_question_texts,
+        }
 
-    campaign = None
-    if campaign_name:
-        campaign = Campaign.objects.filter(campaignName=campaign_name)
-        if not campaign.exists():
-            _msg = (
-                'No campaign named "%s" exists, redirecting to dashboard'
-            )
-            LOGGER.info(_msg, campaign_name)
-            return redirect('dashboard')
+    def get_block_scores(self):
+        """
+        Returns item scores from the latest results of the current document.
+        """
+        _, _, _, _, block_items, block_results, _ = self.get_document()
 
-        campaign = campaign[0]
+        block_scores = []
+        for item, result in zip(block_items, block_results):
+            item_scores = {
+                'completed': bool(result and result.score > -1),
+                'current_item': bool(item.id == self.current_item.id),
+                'score': result.score if result else -1,
+            }
+            block_scores.append(item_scores)
 
-    LOGGER.info(
-        'Rendering direct assessment view for user "%s".',
-        request.user.username or "Anonymous",
-    )
+        return block_scores
 
-    current_task = None
+    def get_item_payload(self):
+        block_items = self.get_document()[4]
 
-    # Try to identify TaskAgenda for current user.
-    agendas = TaskAgenda.objects.filter(user=request.user)
+        items = []
+        for item, item_scores in zip(block_items, self.get_block_scores()):
+            item_scores.update({
+                'item_id': item.itemID,
+                'task_id': item.id,
+                'source_text': item.sourceText,
+                'target_text': item.targetText,
+                'is_complete_document': item.isCompleteDocument,
+            })
+            items.append(item_scores)
 
-    if campaign:
-        agendas = agendas.filter(campaign=campaign)
+        return {'items': items}
 
-    for agenda in agendas:
-        LOGGER.info('Identified work agenda %s', agenda)
+    def render(self, context):
+        if self.ajax:
+            return JsonResponse(context)  # Sent response to the Ajax POST request
 
-        tasks_to_complete = []
-        for serialized_open_task in agenda.serialized_open_tasks():
-            open_task = serialized_open_task.get_object_instance()
+        return super(DirectAssessmentDocumentView, self).render(context)
 
-            # Skip tasks which are not available anymore
-            if open_task is None:
-                continue
 
-            if open_task.next_item_for_user(request.user) is not None:
-                current_task = open_task
-                if not campaign:
-                    campaign = agenda.campaign
-            else:
-                tasks_to_complete.append(serialized_open_task)
+class MultiModalAssessmentView(AnnotationView):
+    """
+    Multi modal assessment annotation view.
+    """
 
-        modified = False
-        for task in tasks_to_complete:
-            modified = agenda.complete_open_task(task) or modified
+    task_cls = MultiModalAssessmentTask
+    template_name = 'EvalView/multimodal-assessment.html'
+    active_page = 'multimodal-assessment'
+    view_name = 'multimodal assessment'
+
+    # pylint: disable=no-self-use
+    def get_result_fields(self, data):
+        score = data.get('score', None)
+        return {'score': score} if score else None
+
+    def get_context(self):
+        return {
+            'reference_text': self.current_item.sourceText,
+            'candidate_text': self.current_item.targetText,
+            'image_url': self.current_item.imageURL,
+        }
 
-        if modified:
-            agenda.save()
 
-    if not current_task and agendas.count() > 0:
-        LOGGER.info('Work agendas completed, redirecting to dashboard')
-        LOGGER.info('- code=%s, campaign=%s', code, campaign)
-        return redirect('dashboard')
+class PairwiseAssessmentView(AnnotationView):
+    """
+    Pairwise direct assessment annotation view.
+    """
+
+    task_cls = PairwiseAssessmentTask
+    template_name = 'EvalView/pairwise-assessment.html'
+    active_page = 'pairwise-assessment'
+    view_name = 'pairwise direct assessment'
+
+    # pylint: disable=no-self-use
+    def get_result_fields(self, data):
+        score1 = data.get('score', None)    # TODO: score -> score1
+        score2 = data.get('score2', None)
+        if not score1:
+            return None
+
+        return {'score1': score1, 'score2': score2}
+
+    def get_context(self):
+        # Define priming question
+        #
+        # Default:
+        #   How accurately does the above candidate text convey the original
+        #   semantics of the source text? Slider ranges from
+        #   <em>Not at all</em> (left) to <em>Perfectly</em> (right).
+        #
+        # We currently allow specific overrides, based on campaign name.
+        reference_label = 'Source text'
+        candidate1_label = 'Candidate translation (1)'
+        candidate2_label = 'Candidate translation (2)'
 
-    # If language code has been given, find a free task and assign to user.
-    if not current_task:
-        current_task = DataAssessmentTask.get_task_for_user(
-            user=request.user
+        priming_question_text = (
+            'How accurately does each of the candidate text(s) below convey '
+            'the original semantics of the source text above?'
         )
 
-    if not current_task:
-        if code is None or campaign is None:
-            LOGGER.info(
-                'No current task detected, redirecting to dashboard'
+        if self.current_item.has_context():
+            # Added 'bolded' to avoid confusion with context sentences that are
+            # displayed in a grey color.
+            priming_question_text = (
+                'How accurately does each of the candidate text(s) below convey '
+                'the original semantics of the bolded source text above?'
             )
-            LOGGER.info('- code=%s, campaign=%s', code, campaign)
-            return redirect('dashboard')
 
-        LOGGER.info(
-            'Identifying next task for code "%s", campaign="%s"',
-            code,
-            campaign,
-        )
-        next_task = DataAssessmentTask.get_next_free_task_for_language(
-            code, campaign, request.user
-        )
+        candidate1_text, candidate2_text = \
+            self.current_item.target_texts_with_diffs()
+
+        return {
+            'reference_label': reference_label,
+            'reference_text': self.current_item.segmentText,
+            'context_left': self.current_item.context_left(),
+            'context_right': self.current_item.context_right(),
+            'candidate_label': candidate1_label,
+            'candidate_text': candidate1_text,
+            'candidate2_label': candidate2_label,
+            'candidate2_text': candidate2_text,
+            'priming_question_text': priming_question_text,
+        }
 
-        if next_task is None:
-            LOGGER.info('No next task detected, redirecting to dashboard')
-            return redirect('dashboard')
 
-        next_task.assignedTo.add(request.user)
-        next_task.save()
+class DataAssessmentView(AnnotationView):
+    """
+    Direct data assessment annotation view.
+    """
 
-        current_task = next_task
+    task_cls = DataAssessmentTask
+    template_name = 'EvalView/data-assessment.html'
+    active_page = 'data-assessment'
+    view_name = 'direct data assessment'
 
-    if current_task:
-        if not campaign:
-            campaign = current_task.campaign
+    # pylint: disable=no-self-use
+    def get_result_fields(self, data):
+        score = data.get('score', None)
+        rank = data.get('rank', None)
 
-        elif campaign.campaignName != current_task.campaign.campaignName:
-            _msg = (
-                'Incompatible campaign given, using item campaign instead!'
-            )
-            LOGGER.info(_msg)
-            campaign = current_task.campaign
+        if score is None:
+            LOGGER.info('No score provided, will not save!')
+            return None
 
-    t2 = datetime.now()
-    if request.method == "POST":
-        score = request.POST.get('score', None)
-        rank = request.POST.get('rank', None)          # TODO: add to the model
-        item_id = request.POST.get('item_id', None)
-        task_id = request.POST.get('task_id', None)
-        start_timestamp = request.POST.get('start_timestamp', None)
-        end_timestamp = request.POST.get('end_timestamp', None)
+        if rank is None:
+            LOGGER.info('No rank provided, will not save!')
+            return None
 
-        _msg='score={} rank={} item_id={}'.format(score, rank, item_id)
-        LOGGER.info(_msg)
-        print(_msg)
+        return {'score': score, 'rank': rank}
 
-        if score is None:
-            print('No score provided, will no save!')
-        elif rank is None:
-            print('No rank provided, will no save!')
-        elif item_id and start_timestamp and end_timestamp:
-            duration = float(end_timestamp) - float(start_timestamp)
-            LOGGER.debug(float(start_timestamp))
-            LOGGER.debug(float(end_timestamp))
-            LOGGER.info(
-                'start=%s, end=%s, duration=%s',
-                start_timestamp,
-                end_timestamp,
-                duration,
-            )
+    def get_context(self):
+        source_language, target_language = _get_language_names(
+            self.current_item
+        )
 
-            current_item = current_task.next_item_for_user(request.user)
-            if current_item.itemID != int(item_id) \
-                    or current_item.id != int(task_id):
-                _msg = 'Item ID %s does not match item %s, will not save!'
-                LOGGER.debug(_msg, item_id, current_item.itemID)
+        source_label = 'Source text'
+        target_label = 'Translation'
+        top_question_text = [
+            'You are presented a fragment of a document in {} and {}. ' \
+                .format(source_language, target_language),
+
+            'Please judge the quality of the translations (taking in to '
+            'account aspects like adequacy, fluency, writing ability, '
+            'orthography, style, misalignments, etc.) on a scale from '
+            'poor (left) to perfect (right).'
+        ]
+        score_question_text = [
+            'Question #1: '
+            'What is the quality of the translations, taking in to '
+            'account aspects like adequacy, fluency, writing ability, '
+            'orthography, style, misalignments, etc.?'
+        ]
+        rank_question_text = [
+            'Question #2: '
+            'Do you think any part of the translated text (left or right) '
+            'has been created by machine translation rather than written '
+            'by a human?'
+        ]
+
+        # There should be exactly 4 ranks, otherwise change 'col-sm-3' in the HTML view.
+        # Each tuple includes radio label and radio value.
+        ranks = [
+            ('Definitely machine-translated', 1),
+            ('Possibly machine-translated', 2),
+            ('Possibly human-written', 3),
+            ('Definitely human-written', 4),
+        ]
+
+        parallel_data = list(self.current_item.get_sentence_pairs())
+
+        return {
+            'source_label': source_label,
+            'target_label': target_label,
+            'parallel_data': parallel_data,
+            'top_question_text': top_question_text,
+            'score_question_text': score_question_text,
+            'rank_question_text': rank_question_text,
+            'ranks': ranks,
+            'document_domain': self.current_item.documentDomain,
+            'source_url': self.current_item.sourceURL,
+            'target_url': self.current_item.targetURL,
+            'show_debug': 'debug' in self.request.GET,
+        }
 
-            else:
-                utc_now = datetime.utcnow().replace(tzinfo=utc)
-
-                # pylint: disable=E1101
-                DataAssessmentResult.objects.create(
-                    score=score,
-                    rank=rank,
-                    start_time=float(start_timestamp),
-                    end_time=float(end_timestamp),
-                    item=current_item,
-                    task=current_task,
-                    createdBy=request.user,
-                    activated=False,
-                    completed=True,
-                    dateCompleted=utc_now,
-                )
 
-    t3 = datetime.now()
-
-    current_item, completed_items = current_task.next_item_for_user(
-        request.user, return_completed_items=True
-    )
-    if not current_item:
-        LOGGER.info('No current item detected, redirecting to dashboard')
-        return redirect('dashboard')
-
-    completed_blocks = int(completed_items / 10)
-    _msg = 'completed_items=%s, completed_blocks=%s'
-    LOGGER.info(_msg, completed_items, completed_blocks)
-
-    source_language = current_task.marketSourceLanguage()
-    target_language = current_task.marketTargetLanguage()
-
-    t4 = datetime.now()
-
-    source_label = 'Source text'
-    target_label = 'Translation'
-    top_question_text = [
-        'You are presented a fragment of a document in {} and {}. ' \
-            .format(source_language, target_language),
-
-        'Please judge the quality of the translations (taking in to '
-        'account aspects like adequacy, fluency, writing ability, '
-        'orthography, style, misalignments, etc.) on a scale from '
-        'poor (left) to perfect (right).'
-    ]
-    score_question_text = [
-        'Question #1: '
-        'What is the quality of the translations, taking in to '
-        'account aspects like adequacy, fluency, writing ability, '
-        'orthography, style, misalignments, etc.?'
-    ]
-    rank_question_text = [
-        'Question #2: '
-        'Do you think any part of the translated text (left or right) '
-        'has been created by machine translation rather than written '
-        'by a human?'
-    ]
-
-    # There should be exactly 4 ranks, otherwise change 'col-sm-3' in the HTML view.
-    # Each tuple includes radio label and radio value.
-    ranks = [
-        ('Definitely machine-translated', 1),
-        ('Possibly machine-translated', 2),
-        ('Possibly human-written', 3),
-        ('Definitely human-written', 4),
-    ]
-
-    parallel_data = list(current_item.get_sentence_pairs())
-
-    context = {
-        'active_page': 'data-assessment',
-        'source_label': source_label,
-        'target_label': target_label,
-        'parallel_data': parallel_data,
-        'top_question_text': top_question_text,
-        'score_question_text': score_question_text,
-        'rank_question_text': rank_question_text,
-        'ranks': ranks,
-        'item_id': current_item.itemID,
-        'task_id': current_item.id,
-        'document_domain': current_item.documentDomain,
-        'source_url': current_item.sourceURL,
-        'target_url': current_item.targetURL,
-        'completed_blocks': completed_blocks,
-        'items_left_in_block': 10 - (completed_items - completed_blocks * 10),
-        'source_language': source_language,
-        'target_language': target_language,
-        'debug_times': (t2 - t1, t3 - t2, t4 - t3, t4 - t1),
-        'show_debug': 'debug' in request.GET,
-        'campaign': campaign.campaignName,
-        'datask_id': current_task.id,
-        'trusted_user': current_task.is_trusted_user(request.user),
-    }
-    context.update(BASE_CONTEXT)
-
-    return render(request, 'EvalView/data-assessment.html', context)
+# pylint: disable=C0103
+direct_assessment = DirectAssessmentView.as_view()
+direct_assessment_context = DirectAssessmentContextView.as_view()
+direct_assessment_document = DirectAssessmentDocumentView.as_view()
+multimodal_assessment = MultiModalAssessmentView.as_view()
+pairwise_assessment = PairwiseAssessmentView.as_view()
+data_assessment = DataAssessmentView.as_view()
+
+direct_assessment_submit = DirectAssessmentView.as_submit_view()
+direct_assessment_context_submit = DirectAssessmentContextView.as_submit_view()
+direct_assessment_document_submit = \
+    DirectAssessmentDocumentView.as_submit_view()
+multimodal_assessment_submit = MultiModalAssessmentView.as_submit_view()
+pairwise_assessment_submit = PairwiseAssessmentView.as_submit_view()
+data_assessment_submit = DataAssessmentView.as_submit_view()